@@ -5,18 +5,3369 @@ from datetime import datetime, timedelta
 import re
 import csv
 import os
+import pathlib
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_pdf import PdfPages
 import numpy as np
 import pandas as pd
 from PIL import Image, ImageTk
 import seaborn as sns
-from collections import Counter
+from collections import Counter, OrderedDict
 import random
 import json
+import heapq
+import argparse
+import tempfile
+import shutil
+import time
+import hashlib
+import itertools
+import threading
+from difflib import SequenceMatcher
+import multiprocessing
+import queue
+import io
+import html
+import base64
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# --- Skill Inventory ---
+
+def parse_skills(text):
+    """Split a free-form comma-separated skills string into unique skill names"""
+    skills = []
+    seen = set()
+    for part in re.split(r'[,;\n]', text or ""):
+        name = re.sub(r'\s+', ' ', part).strip()
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            skills.append(name)
+    return skills
+
+
+def write_employee_skills(cursor, emp_id, names):
+    """Replace one employee's rows in employee_skills, adding unseen skills to the dictionary"""
+    cursor.execute("DELETE FROM employee_skills WHERE emp_id=?", (emp_id,))
+    cursor.executemany("INSERT OR IGNORE INTO skills (name, normalized_name) VALUES (?, ?)",
+                       [(name, name.lower()) for name in names])
+    cursor.executemany('''
+        INSERT OR IGNORE INTO employee_skills (emp_id, skill_id)
+        SELECT ?, skill_id FROM skills WHERE normalized_name=?
+    ''', [(emp_id, name.lower()) for name in names])
+
+
+class SkillIndex:
+    """In-memory inverted index from normalized skills to employee ids"""
+
+    def __init__(self):
+        self.postings = {}          # skill key -> set of emp_ids
+        self.employee_skills = {}   # emp_id -> set of skill keys
+        self.departments = {}       # emp_id -> department
+        self.display_names = {}     # skill key -> display name
+
+    def set_employee(self, emp_id, skills, department=None):
+        """Replace the indexed skills of one employee"""
+        self.remove_employee(emp_id)
+        keys = set()
+        for name in skills:
+            key = name.lower()
+            self.display_names.setdefault(key, name)
+            self.postings.setdefault(key, set()).add(emp_id)
+            keys.add(key)
+        self.employee_skills[emp_id] = keys
+        self.departments[emp_id] = department
+
+    def remove_employee(self, emp_id):
+        """Drop an employee from every posting list"""
+        for key in self.employee_skills.pop(emp_id, ()):
+            holders = self.postings.get(key)
+            if holders is not None:
+                holders.discard(emp_id)
+                if not holders:
+                    del self.postings[key]
+        self.departments.pop(emp_id, None)
+
+    def match_all(self, skills):
+        """Return employees holding every skill, intersecting smallest lists first"""
+        lists = sorted((self.postings.get(s.lower(), set()) for s in skills), key=len)
+        if not lists:
+            return set(self.employee_skills)
+        result = set(lists[0])
+        for holders in lists[1:]:
+            result &= holders
+            if not result:
+                break
+        return result
+
+    def match_any(self, skills):
+        """Return employees holding at least one of the skills"""
+        result = set()
+        for s in skills:
+            result |= self.postings.get(s.lower(), set())
+        return result
+
+    def query(self, expression):
+        """Evaluate a boolean skill query such as 'Docker AND AWS OR Python AND NOT SQL'"""
+        result = set()
+        for clause in re.split(r'\s+OR\s+|\|', expression, flags=re.IGNORECASE):
+            terms = [t.strip() for t in re.split(r'\s+AND\s+|,|&', clause, flags=re.IGNORECASE) if t.strip()]
+            required = [t for t in terms if not re.match(r'(NOT\s+|-)', t, re.IGNORECASE)]
+            excluded = [re.sub(r'^(NOT\s+|-)', '', t, flags=re.IGNORECASE).strip() for t in terms if t not in required]
+            if not required and not excluded:
+                continue
+            result |= self.match_all(required) - self.match_any(excluded)
+        return result
+
+    def closest_matches(self, required, k=10):
+        """Rank the top-K employees by coverage of a role's required skills"""
+        names = {s.lower(): s for s in required}
+        keys = set(names)
+        if not keys:
+            return []
+        counts = Counter()
+        for key in keys:
+            counts.update(self.postings.get(key, ()))
+        def score(item):
+            emp_id, matched = item
+            extra = len(self.employee_skills[emp_id]) - matched
+            return (matched / len(keys), -extra)
+        ranked = heapq.nlargest(k, counts.items(), key=score)
+        return [(emp_id, matched / len(keys),
+                 sorted(names[s] for s in keys - self.employee_skills[emp_id]))
+                for emp_id, matched in ranked]
+
+    def top_skills(self, n=15):
+        """Most widely held skills, as display names"""
+        keys = heapq.nlargest(n, self.postings, key=lambda s: len(self.postings[s]))
+        return [self.display_names[s] for s in keys]
+
+    def coverage_by_department(self, target_skills):
+        """Per department: headcount, covered target skills and missing target skills"""
+        members = {}
+        for emp_id, dept in self.departments.items():
+            members.setdefault(dept or "Unassigned", set()).add(emp_id)
+        coverage = {}
+        for dept, emp_ids in sorted(members.items()):
+            covered = [s for s in target_skills if self.postings.get(s.lower(), set()) & emp_ids]
+            missing = [s for s in target_skills if s not in covered]
+            coverage[dept] = (len(emp_ids), covered, missing)
+        return coverage
+
+
+# --- Compensation Analytics ---
+
+TENURE_BUCKETS = [(0, 1, '<1y'), (1, 3, '1-3y'), (3, 5, '3-5y'), (5, 10, '5-10y'), (10, None, '10y+')]
+
+
+def tenure_bucket(joining_date, today=None):
+    """Map a joining date to its tenure bucket label"""
+    try:
+        joined = datetime.strptime(str(joining_date)[:10], '%Y-%m-%d')
+    except ValueError:
+        return 'Unknown'
+    years = ((today or datetime.now()) - joined).days / 365.25
+    for low, high, label in TENURE_BUCKETS:
+        if years < low:
+            break
+        if high is None or years < high:
+            return label
+    return TENURE_BUCKETS[0][2]
+
+
+class QuantileSketch:
+    """Mergeable KLL-style quantile sketch with bounded memory"""
+
+    def __init__(self, k=200):
+        self.k = k
+        self.levels = [[]]
+        self.n = 0
+
+    def capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(self.k * (2 / 3) ** depth))
+
+    def update(self, value):
+        self.levels[0].append(value)
+        self.n += 1
+        self.compress()
+
+    def merge(self, other):
+        """Fold another sketch into this one"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for level, items in enumerate(other.levels):
+            self.levels[level].extend(items)
+        self.n += other.n
+        self.compress()
+        return self
+
+    def compress(self):
+        while sum(len(items) for items in self.levels) > sum(self.capacity(h) for h in range(len(self.levels))):
+            for level, items in enumerate(self.levels):
+                if len(items) >= self.capacity(level):
+                    if level + 1 == len(self.levels):
+                        self.levels.append([])
+                    items.sort()
+                    keep = [items.pop()] if len(items) % 2 else []
+                    self.levels[level + 1].extend(items[random.randint(0, 1)::2])
+                    self.levels[level] = keep
+                    break
+
+    def quantiles(self, fractions):
+        """Approximate values at the given fractions (0..1)"""
+        weighted = sorted((value, 2 ** level) for level, items in enumerate(self.levels) for value in items)
+        if not weighted:
+            return [None] * len(fractions)
+        total = sum(weight for _, weight in weighted)
+        results = []
+        for fraction in fractions:
+            target = fraction * total
+            cumulative = 0
+            for value, weight in weighted:
+                cumulative += weight
+                if cumulative >= target:
+                    break
+            results.append(value)
+        return results
+
+
+def exact_percentiles(values, percentiles):
+    """Exact linear-interpolated percentiles using np.partition instead of a full sort"""
+    arr = np.asarray(values, dtype=float)
+    if arr.size == 0:
+        return [None] * len(percentiles)
+    positions = np.array(percentiles, dtype=float) / 100 * (arr.size - 1)
+    low = np.floor(positions).astype(int)
+    high = np.ceil(positions).astype(int)
+    part = np.partition(arr, np.unique(np.concatenate([low, high])))
+    return [float(v) for v in part[low] + (part[high] - part[low]) * (positions - low)]
+
+
+class SalaryBandEngine:
+    """Per-segment salary sketches for department, position and tenure bucket"""
+
+    PERCENTILES = (10, 25, 50, 75, 90)
+
+    def __init__(self, k=200):
+        self.k = k
+        self.sketches = {}
+        self.dirty = set()
+        self.stale = False  # every segment, including ones not created yet, needs a rebuild
+
+    @staticmethod
+    def segments_for(department, position, joining_date):
+        return [('department', department), ('position', position), ('tenure', tenure_bucket(joining_date))]
+
+    def add(self, department, position, joining_date, salary):
+        """Fold one salary into every segment it belongs to"""
+        for segment in self.segments_for(department, position, joining_date):
+            self.sketches.setdefault(segment, QuantileSketch(self.k)).update(float(salary))
+
+    def invalidate(self, department, position, joining_date):
+        """Mark segments stale after an update or delete (sketches cannot un-count)"""
+        self.dirty.update(self.segments_for(department, position, joining_date))
+
+    def invalidate_all(self):
+        """Force a full rebuild, e.g. after a bulk update that may have moved rows into new segments"""
+        self.stale = True
+
+    def rebuild(self, rows, segments=None):
+        """Rebuild the given segments (or all) from (department, position, joining_date, salary) rows"""
+        targets = set(segments) if segments is not None else None
+        for segment in (targets if targets is not None else list(self.sketches)):
+            self.sketches.pop(segment, None)
+        for department, position, joining_date, salary in rows:
+            for segment in self.segments_for(department, position, joining_date):
+                if targets is None or segment in targets:
+                    self.sketches.setdefault(segment, QuantileSketch(self.k)).update(float(salary))
+        if targets is None:
+            self.dirty.clear()
+            self.stale = False
+        else:
+            self.dirty -= targets
+
+    def bands(self, dimension):
+        """P10/P25/P50/P75/P90 per segment value of one dimension"""
+        return {value: dict(zip(self.PERCENTILES, sketch.quantiles([p / 100 for p in self.PERCENTILES])))
+                for (dim, value), sketch in sorted(self.sketches.items(), key=lambda item: str(item[0][1]))
+                if dim == dimension and sketch.n}
+
+    def overall(self, dimension='department'):
+        """Company-wide band obtained by merging one dimension's sketches"""
+        merged = QuantileSketch(self.k)
+        for (dim, _), sketch in self.sketches.items():
+            if dim == dimension:
+                merged.merge(sketch)
+        return dict(zip(self.PERCENTILES, merged.quantiles([p / 100 for p in self.PERCENTILES])))
+
+
+# --- Anomaly Detection ---
+
+ANOMALY_THRESHOLD = 3.5     # modified z-score / distance at or above which an employee is flagged
+ANOMALY_MIN_PEERS = 5       # thinner segments are never scored
+MAD_SCALE = 0.6745          # MAD / 0.6745 estimates the standard deviation of normal data
+MEAN_AD_SCALE = 1.2533      # same for the mean absolute deviation, used when MAD is 0
+
+# Tenure in years computed by SQLite so segments can be formed without a per-row date parse
+TENURE_YEARS_SQL = "(julianday('now') - julianday({column})) / 365.25"
+
+
+def tenure_labels(years):
+    """Vectorized tenure_bucket over an array of tenure years (NaN -> 'Unknown')"""
+    years = np.asarray(years, dtype=float)
+    labels = np.array([label for _, _, label in TENURE_BUCKETS] + ['Unknown'], dtype=object)
+    index = np.digitize(np.nan_to_num(years), [low for low, _, _ in TENURE_BUCKETS[1:]])
+    index[np.isnan(years)] = len(TENURE_BUCKETS)
+    return labels[index]
+
+
+def group_medians(codes, values, groups):
+    """Median of values for every group code 0..groups-1 from one sort"""
+    counts = np.bincount(codes, minlength=groups)
+    starts = np.cumsum(counts) - counts
+    ordered = values[np.lexsort((values, codes))]
+    return (ordered[starts + (counts - 1) // 2] + ordered[starts + counts // 2]) / 2
+
+
+def robust_z(codes, values, groups):
+    """Modified z-scores of values against their group's median and MAD"""
+    deviation = values - group_medians(codes, values, groups)[codes]
+    spread = group_medians(codes, np.abs(deviation), groups) / MAD_SCALE
+    mean_ad = np.bincount(codes, np.abs(deviation), groups) / np.bincount(codes, minlength=groups) * MEAN_AD_SCALE
+    spread = np.where(spread > 0, spread, mean_ad)[codes]
+    return np.divide(deviation, spread, out=np.zeros_like(deviation), where=spread > 0)
+
+
+def anomaly_scores(codes, salary, rating, groups):
+    """Salary z, rating z and their robust Mahalanobis distance within each segment"""
+    salary_z = robust_z(codes, salary, groups)
+    rating_z = robust_z(codes, rating, groups)
+    counts = np.bincount(codes, minlength=groups)
+    # Pay/rating correlation per segment, on clipped z-scores so the outliers cannot set it
+    clipped = [np.clip(z, -3, 3) for z in (salary_z, rating_z)]
+    s, r = (z - (np.bincount(codes, z, groups) / counts)[codes] for z in clipped)
+    norm = np.sqrt(np.bincount(codes, s * s, groups) * np.bincount(codes, r * r, groups))
+    rho = np.clip(np.divide(np.bincount(codes, s * r, groups), norm, out=np.zeros(groups), where=norm > 0), -0.9, 0.9)[codes]
+    score = np.sqrt((salary_z ** 2 - 2 * rho * salary_z * rating_z + rating_z ** 2) / (1 - rho ** 2))
+    thin = counts[codes] < ANOMALY_MIN_PEERS
+    for array in (salary_z, rating_z, score):
+        array[thin] = 0
+    return salary_z, rating_z, score
+
+
+def anomaly_reason(salary_z, rating_z, score):
+    """Short explanation of why a score is at or above the threshold, else None"""
+    if score < ANOMALY_THRESHOLD:
+        return None
+    if abs(salary_z) >= ANOMALY_THRESHOLD:
+        return f"salary far {'above' if salary_z > 0 else 'below'} position/tenure peers"
+    if abs(rating_z) >= ANOMALY_THRESHOLD:
+        return f"rating far {'above' if rating_z > 0 else 'below'} position/tenure peers"
+    if (salary_z > 0) == (rating_z > 0):
+        return f"pay and rating both unusually {'high' if salary_z > 0 else 'low'}"
+    return f"{'high' if salary_z > 0 else 'low'} pay for a {'high' if rating_z > 0 else 'low'} rating"
+
+
+class AnomalyDetector:
+    """Persisted pay/rating anomaly scores per (position, tenure) segment, refreshed from the change journal"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def last_run(self):
+        """(change_id, date) of the last scoring pass, or (None, None)"""
+        row = self.connection.execute("SELECT change_id, date(computed_at, 'localtime') FROM anomaly_runs "
+                                      "ORDER BY run_id DESC LIMIT 1").fetchone()
+        return row or (None, None)
+
+    def touched_segments(self, since):
+        """Segment keys the journal says changed after change id since, or None if the journal was pruned past it"""
+        oldest = self.connection.execute("SELECT MIN(change_id) FROM employee_changes").fetchone()[0]
+        if oldest is not None and oldest > since + 1:
+            return None
+        # UNION rather than LEFT JOIN so the employees view is searched by key, not materialized
+        pairs = self.connection.execute(f'''
+            SELECT old_position, {TENURE_YEARS_SQL.format(column='old_joining_date')}
+            FROM employee_changes WHERE change_id > ? AND old_position IS NOT NULL
+            UNION ALL
+            SELECT position, {TENURE_YEARS_SQL.format(column='joining_date')}
+            FROM employees WHERE position IS NOT NULL
+              AND emp_id IN (SELECT emp_id FROM employee_changes WHERE change_id > ?)
+        ''', (since, since)).fetchall()
+        if not pairs:
+            return set()
+        positions, years = zip(*pairs)
+        return {f"{position}|{label}" for position, label in zip(positions, tenure_labels(
+            [np.nan if y is None else y for y in years]))}
+
+    def refresh(self, full=False):
+        """Rescore stale segments in one vectorized pass; returns {emp_id: score} for every employee rescored"""
+        latest = self.connection.execute("SELECT COALESCE(MAX(change_id), 0) FROM employee_changes").fetchone()[0]
+        since, day = self.last_run()
+        # Tenure buckets drift with the calendar, so the first pass of each day rescores everything
+        if full or since is None or day != datetime.now().strftime('%Y-%m-%d'):
+            targets = None
+        else:
+            if since >= latest:
+                return {}
+            targets = self.touched_segments(since)
+        sql = f"SELECT emp_id, position, {TENURE_YEARS_SQL.format(column='joining_date')}, salary, performance_rating FROM employees"
+        params = ()
+        if targets is not None:
+            sql += " WHERE position IN (SELECT value FROM json_each(?))"
+            params = (json.dumps(sorted({key.rsplit('|', 1)[0] for key in targets})),)
+        rows = self.connection.execute(sql, params).fetchall()
+
+        if rows:
+            emp_ids, positions, years, salary, rating = (np.array(column, dtype=object) for column in zip(*rows))
+            segments = np.array([f"{p}|{label}" for p, label in zip(positions, tenure_labels(
+                np.array(years, dtype=float)))], dtype=object)
+            if targets is not None:
+                keep = np.isin(segments, list(targets))
+                emp_ids, segments, salary, rating = emp_ids[keep], segments[keep], salary[keep], rating[keep]
+        else:
+            emp_ids = segments = salary = rating = np.array([], dtype=object)
+        keys, codes = np.unique(segments.astype(str), return_inverse=True)
+        salary_z, rating_z, score = anomaly_scores(codes.ravel(), np.nan_to_num(salary.astype(float)),
+                                                   np.nan_to_num(rating.astype(float)), len(keys))
+
+        cursor = self.connection.cursor()
+        if targets is None:
+            cursor.execute("DELETE FROM employee_anomalies")
+        else:
+            cursor.execute("DELETE FROM employee_anomalies WHERE segment IN (SELECT value FROM json_each(?))",
+                           (json.dumps(sorted(targets)),))
+        cursor.executemany('''
+            INSERT OR REPLACE INTO employee_anomalies (emp_id, segment, salary_z, rating_z, score, reason)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', [(int(emp_id), segment, float(sz), float(rz), float(sc), anomaly_reason(sz, rz, sc))
+              for emp_id, segment, sz, rz, sc in zip(emp_ids, segments, salary_z, rating_z, score)])
+        cursor.execute("INSERT INTO anomaly_runs (change_id, segments, full_pass) VALUES (?, ?, ?)",
+                       (latest, len(keys), targets is None))
+        self.connection.commit()
+        return {int(emp_id): float(sc) for emp_id, sc in zip(emp_ids, score)}
+
+    def scores(self):
+        return dict(self.connection.execute("SELECT emp_id, score FROM employee_anomalies"))
+
+    def flagged(self, limit=None):
+        """Flagged employees, highest score first: (emp_id, name, position, segment, salary, rating, score, reason)"""
+        return self.connection.execute('''
+            SELECT a.emp_id, e.name, e.position, a.segment, e.salary, e.performance_rating, a.score, a.reason
+            FROM employee_anomalies a JOIN employees e ON e.emp_id = a.emp_id
+            WHERE a.score >= ? ORDER BY a.score DESC LIMIT ?
+        ''', (ANOMALY_THRESHOLD, -1 if limit is None else limit)).fetchall()
+
+
+# --- Cohort Retention ---
+
+COHORT_STATUSES = ('Active', 'On Leave', 'Terminated', 'Inactive')
+COHORT_HEATMAP_COHORTS = 24     # most recent hiring months shown in the Analytics heatmap
+COHORT_HEATMAP_MONTHS = 36      # months since joining shown per cohort
+
+# Months since year 0, so month differences are plain subtraction
+MONTH_INDEX_SQL = "(CAST(strftime('%Y', {column}) AS INTEGER) * 12 + CAST(strftime('%m', {column}) AS INTEGER) - 1)"
+
+# Dated status changes; the joining date counts as the first 'Active' entry
+STATUS_HISTORY_SQL = [
+    '''
+    CREATE TABLE IF NOT EXISTS employee_status_history (
+        history_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        emp_id INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        changed_at DATE NOT NULL
+    )
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS employees_status_insert AFTER INSERT ON employees
+    BEGIN
+        INSERT INTO employee_status_history (emp_id, status, changed_at) VALUES (NEW.emp_id, 'Active', NEW.joining_date);
+        INSERT INTO employee_status_history (emp_id, status, changed_at)
+        SELECT NEW.emp_id, NEW.status, date('now') WHERE NEW.status != 'Active';
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS employees_status_update AFTER UPDATE OF status ON employees
+    WHEN OLD.status IS NOT NEW.status
+    BEGIN
+        INSERT INTO employee_status_history (emp_id, status, changed_at) VALUES (NEW.emp_id, NEW.status, date('now'));
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS employees_status_delete AFTER DELETE ON employees
+    BEGIN
+        DELETE FROM employee_status_history WHERE emp_id = OLD.emp_id;
+    END
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS cohort_rollup (
+        cohort TEXT NOT NULL,
+        month_offset INTEGER NOT NULL,
+        active INTEGER NOT NULL,
+        on_leave INTEGER NOT NULL,
+        terminated INTEGER NOT NULL,
+        inactive INTEGER NOT NULL,
+        rating_sum REAL NOT NULL,
+        PRIMARY KEY (cohort, month_offset)
+    ) WITHOUT ROWID
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS cohort_runs (
+        run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        change_id INTEGER NOT NULL,
+        month TEXT NOT NULL,
+        cohorts INTEGER NOT NULL,
+        computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+]
+
+
+def month_label(index):
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def cohort_rollup_rows(rows, current_month):
+    """cohort_rollup rows from (emp_id, join_month, change_month, status, rating) history rows in employee/time order"""
+    if not rows:
+        return []
+    emp_ids, joined, changed, statuses, ratings = zip(*rows)
+    emp_ids = np.array(emp_ids)
+    joined = np.array(joined, dtype=int)
+    changed = np.maximum(np.array(changed, dtype=int), joined)
+    codes = np.array([COHORT_STATUSES.index(s) if s in COHORT_STATUSES else -1 for s in statuses])
+    ratings = np.nan_to_num(np.array(ratings, dtype=float))
+    # Each entry holds until the employee's next entry; the last one holds through the current month
+    has_next = np.append(emp_ids[1:] == emp_ids[:-1], False)
+    until = np.where(has_next, np.append(changed[1:], 0) - 1, current_month)
+    keep = (codes >= 0) & (until >= changed) & (changed <= current_month)
+    cohorts, cohort_codes = np.unique(joined[keep], return_inverse=True)
+    cohort_codes = cohort_codes.ravel()
+    start = changed[keep] - joined[keep]
+    stop = np.minimum(until[keep], current_month) - joined[keep] + 1
+    width = current_month - cohorts.min() + 2
+
+    # Difference arrays: +1 where a status span starts, -1 after it ends, then a running sum over months
+    counts = np.zeros((len(cohorts), len(COHORT_STATUSES), width))
+    np.add.at(counts, (cohort_codes, codes[keep], start), 1)
+    np.add.at(counts, (cohort_codes, codes[keep], stop), -1)
+    counts = counts.cumsum(axis=2)
+    active = codes[keep] == 0
+    rating_sums = np.zeros((len(cohorts), width))
+    np.add.at(rating_sums, (cohort_codes[active], start[active]), ratings[keep][active])
+    np.add.at(rating_sums, (cohort_codes[active], stop[active]), -ratings[keep][active])
+    rating_sums = rating_sums.cumsum(axis=1)
+
+    cohort_index, offsets = np.nonzero(np.arange(width)[None, :] <= (current_month - cohorts)[:, None])
+    return [(month_label(int(cohorts[c])), int(m), *(int(round(v)) for v in counts[c, :, m]), float(round(rating_sums[c, m], 6)))
+            for c, m in zip(cohort_index, offsets)]
+
+
+class CohortRollup:
+    """Hiring-cohort x months-since-join status counts kept in cohort_rollup, rebuilt per touched cohort"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def last_run(self):
+        """(change_id, month) of the last rebuild, or (None, None)"""
+        row = self.connection.execute("SELECT change_id, month FROM cohort_runs ORDER BY run_id DESC LIMIT 1").fetchone()
+        return row or (None, None)
+
+    def touched_cohorts(self, since):
+        """Hiring months the journal says changed after change id since, or None if the journal was pruned past it"""
+        oldest = self.connection.execute("SELECT MIN(change_id) FROM employee_changes").fetchone()[0]
+        if oldest is not None and oldest > since + 1:
+            return None
+        rows = self.connection.execute('''
+            SELECT strftime('%Y-%m', old_joining_date) FROM employee_changes WHERE change_id > ?
+            UNION
+            SELECT strftime('%Y-%m', joining_date) FROM employees
+            WHERE emp_id IN (SELECT emp_id FROM employee_changes WHERE change_id > ?)
+        ''', (since, since)).fetchall()
+        return {cohort for (cohort,) in rows if cohort}
+
+    def refresh(self, full=False):
+        """Rebuild stale cohorts from the status history; returns how many cohorts were rebuilt"""
+        latest = self.connection.execute("SELECT COALESCE(MAX(change_id), 0) FROM employee_changes").fetchone()[0]
+        since, month = self.last_run()
+        today = datetime.now()
+        # A new calendar month adds a column to every cohort
+        if full or since is None or month != today.strftime('%Y-%m'):
+            targets = None
+        else:
+            if since >= latest:
+                return 0
+            targets = self.touched_cohorts(since)
+            if targets is not None and not targets:
+                self.connection.execute("INSERT INTO cohort_runs (change_id, month, cohorts) VALUES (?, ?, 0)", (latest, month))
+                self.connection.commit()
+                return 0
+        if targets is None:
+            source, params = "employees e", ()
+        else:
+            # CROSS JOIN keeps the cohort list driving, so each cohort is a joining_date index range
+            source = ("json_each(?) c CROSS JOIN employees e "
+                      "ON e.joining_date >= c.value || '-01' AND e.joining_date < date(c.value || '-01', '+1 month')")
+            params = (json.dumps(sorted(targets)),)
+        sql = f'''
+            SELECT h.emp_id, {MONTH_INDEX_SQL.format(column='e.joining_date')}, {MONTH_INDEX_SQL.format(column='h.changed_at')},
+                   h.status, e.performance_rating
+            FROM {source} CROSS JOIN employee_status_history h ON h.emp_id = e.emp_id
+            WHERE e.joining_date IS NOT NULL AND h.changed_at IS NOT NULL
+            ORDER BY h.emp_id, h.changed_at, h.history_id
+        '''
+        rows = [row for row in self.connection.execute(sql, params) if row[1] is not None and row[2] is not None]
+        rollup = cohort_rollup_rows(rows, today.year * 12 + today.month - 1)
+
+        cursor = self.connection.cursor()
+        if targets is None:
+            cursor.execute("DELETE FROM cohort_rollup")
+        else:
+            cursor.execute("DELETE FROM cohort_rollup WHERE cohort IN (SELECT value FROM json_each(?))", params)
+        cursor.executemany("INSERT INTO cohort_rollup VALUES (?, ?, ?, ?, ?, ?, ?)", rollup)
+        rebuilt = len({row[0] for row in rollup}) if targets is None else len(targets)
+        cursor.execute("INSERT INTO cohort_runs (change_id, month, cohorts) VALUES (?, ?, ?)",
+                       (latest, today.strftime('%Y-%m'), rebuilt))
+        self.connection.commit()
+        return rebuilt
+
+    @staticmethod
+    def matrix(connection, metric='Retention %', cohorts=COHORT_HEATMAP_COHORTS, months=COHORT_HEATMAP_MONTHS):
+        """Heatmap data for the most recent cohorts, read from the rollup only"""
+        rows = connection.execute(QUERIES['cohort_rollup_rows'], (cohorts, months)).fetchall()
+        return cohort_matrix(rows, metric, cohorts, months)
+
+
+def cohort_matrix(rows, metric='Retention %', cohorts=COHORT_HEATMAP_COHORTS, months=COHORT_HEATMAP_MONTHS):
+    """Heatmap data for the most recent cohorts from cohort_rollup rows"""
+    labels = sorted({row[0] for row in rows})[-cohorts:]
+    positions = {label: i for i, label in enumerate(labels)}
+    values = [[None] * months for _ in labels]
+    for cohort, offset, active, on_leave, terminated, inactive, rating_sum in rows:
+        if cohort not in positions or offset >= months:
+            continue
+        size = active + on_leave + terminated + inactive
+        values[positions[cohort]][offset] = {
+            'Retention %': 100 * active / size if size else None,
+            'Active': active,
+            'On Leave': on_leave,
+            'Terminated': terminated,
+            'Avg Rating': rating_sum / active if active else None,
+        }[metric]
+    return {'metric': metric, 'cohorts': labels, 'values': values}
+
+
+COHORT_METRICS = ('Retention %', 'Active', 'On Leave', 'Terminated', 'Avg Rating')
+
+
+# --- Record Cache ---
+
+EMPLOYEE_COLUMNS = ('emp_id', 'name', 'age', 'department', 'position', 'salary', 'joining_date', 'email', 'phone',
+                    'address', 'performance_rating', 'skills', 'manager_id', 'status', 'last_promotion',
+                    'created_at', 'updated_at')
+EMPLOYEE_SELECT = f"SELECT {', '.join(EMPLOYEE_COLUMNS)} FROM employees"
+# Employee Directory columns; listings fetch only these and full records load when a row is opened
+DIRECTORY_COLUMNS = ('emp_id', 'name', 'age', 'department', 'position', 'salary', 'status', 'performance_rating',
+                     'joining_date')
+DIRECTORY_SELECT = f"SELECT {', '.join(DIRECTORY_COLUMNS)} FROM employees"
+
+
+class EmployeeRecord:
+    """Compact full employee record, one slot per column"""
+
+    __slots__ = EMPLOYEE_COLUMNS
+
+    def __init__(self, row):
+        for name, value in zip(EMPLOYEE_COLUMNS, row):
+            setattr(self, name, value)
+
+    def directory_values(self):
+        """Values in Employee Directory column order"""
+        return tuple(getattr(self, column) for column in DIRECTORY_COLUMNS)
+
+
+class RecordCache:
+    """Bounded LRU cache of EmployeeRecord objects keyed by emp_id"""
+
+    PAGE_SIZE = 200  # rows fetched together on a cache miss
+
+    def __init__(self, capacity=5000):
+        self.capacity = capacity
+        self.records = OrderedDict()
+
+    def get(self, emp_id):
+        record = self.records.get(emp_id)
+        if record is not None:
+            self.records.move_to_end(emp_id)
+        return record
+
+    def put(self, record):
+        self.records[record.emp_id] = record
+        self.records.move_to_end(record.emp_id)
+        if len(self.records) > self.capacity:
+            self.records.popitem(last=False)
+
+    def put_many(self, records):
+        for record in records:
+            self.put(record)
+
+    def invalidate(self, emp_ids=None):
+        """Drop the given ids, or everything when emp_ids is None"""
+        if emp_ids is None:
+            self.records.clear()
+            return
+        for emp_id in emp_ids:
+            self.records.pop(int(emp_id), None)
+
+
+# --- Query Registry ---
+
+# Statement cache per connection; comfortably larger than the registry plus ad-hoc statements
+STATEMENT_CACHE_SIZE = 256
+
+# Directory search filter; NULL parameters disable a condition so the text never changes
+SEARCH_WHERE = ("(? IS NULL OR name LIKE ? OR department LIKE ? OR position LIKE ?) "
+                "AND (? IS NULL OR department = ?) AND (? IS NULL OR status = ?)")
+
+# Canonical parameterized statements, shared by every code path that runs them
+QUERIES = {
+    'insert_employee': '''
+        INSERT INTO employees (name, age, department, position, salary, joining_date, email, phone, address, performance_rating, skills, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''',
+    'update_employee': '''
+        UPDATE employees SET name=?, age=?, department=?, position=?, salary=?, joining_date=?, email=?, phone=?, address=?, performance_rating=?, skills=?, status=?, updated_at=CURRENT_TIMESTAMP
+        WHERE emp_id=?
+    ''',
+    'delete_employee': "DELETE FROM employees WHERE emp_id=?",
+    'employee_segments': "SELECT department, position, joining_date FROM employees WHERE emp_id=?",
+    'all_employees': DIRECTORY_SELECT,
+    'search_employees': f"{DIRECTORY_SELECT} WHERE {SEARCH_WHERE}",
+    'search_anomalies': f'''
+        SELECT {', '.join('e.' + column for column in DIRECTORY_COLUMNS)}
+        FROM employees e JOIN employee_anomalies a ON a.emp_id = e.emp_id
+        WHERE {SEARCH_WHERE} AND a.score >= ? ORDER BY a.score DESC
+    ''',
+    'employees_by_ids': f"{EMPLOYEE_SELECT} WHERE emp_id IN (SELECT value FROM json_each(?))",
+    'employee_summaries_by_ids': "SELECT emp_id, name, department, skills FROM employees WHERE emp_id IN (SELECT value FROM json_each(?))",
+    'count_employees': "SELECT COUNT(*) FROM employees",
+    'count_by_status': "SELECT COUNT(*) FROM employees WHERE status=?",
+    'count_joined_since': "SELECT COUNT(*) FROM employees WHERE joining_date >= ?",
+    'avg_salary': "SELECT AVG(salary) FROM employees",
+    'avg_rating': "SELECT AVG(performance_rating) FROM employees",
+    'department_counts': "SELECT department, COUNT(*) FROM employees GROUP BY department",
+    'top_department': "SELECT department, COUNT(*) as cnt FROM employees GROUP BY department ORDER BY cnt DESC LIMIT 1",
+    'department_avg_salary': "SELECT department, AVG(salary) FROM employees GROUP BY department",
+    'department_performance': "SELECT department, AVG(performance_rating), COUNT(*) FROM employees GROUP BY department",
+    'salary_totals': "SELECT SUM(salary), COUNT(salary) FROM employees",
+    'department_salary_totals': "SELECT department, COUNT(*), SUM(salary), COUNT(salary) FROM employees GROUP BY department",
+    'salaries': "SELECT salary FROM employees WHERE salary IS NOT NULL",
+    'monthly_performance': '''
+        SELECT strftime('%Y-%m', joining_date) as month, AVG(performance_rating)
+        FROM employees
+        GROUP BY month
+        ORDER BY month
+    ''',
+    'monthly_performance_totals': '''
+        SELECT strftime('%Y-%m', joining_date) as month, SUM(performance_rating), COUNT(performance_rating)
+        FROM employees
+        GROUP BY month
+    ''',
+    'cohort_rollup_rows': '''
+        SELECT cohort, month_offset, active, on_leave, terminated, inactive, rating_sum FROM cohort_rollup
+        WHERE cohort IN (SELECT DISTINCT cohort FROM cohort_rollup ORDER BY cohort DESC LIMIT ?) AND month_offset < ?
+    ''',
+    'prune_change_journal': "DELETE FROM employee_changes WHERE change_id <= (SELECT MAX(change_id) FROM employee_changes) - ?",
+}
+
+
+def grouped_by_department(aggregates, order="d.name", limit=""):
+    """Aggregate employee_records by department key first, then attach the names (NULL for rows without one)"""
+    columns = ', '.join(f"t.c{i}" for i in range(len(aggregates)))
+    inner = ', '.join(f"{aggregate} AS c{i}" for i, aggregate in enumerate(aggregates))
+    return (f"SELECT d.name, {columns} FROM (SELECT department_id, {inner} FROM employee_records "
+            f"GROUP BY department_id) t LEFT JOIN departments d ON d.department_id = t.department_id ORDER BY {order} {limit}")
+
+
+ENCODED_NAME_COLUMNS = {'department': 'd.name', 'position': 'p.name', 'status': 's.name'}
+ENCODED_DIRECTORY_SELECT = (
+    f"SELECT {', '.join(f'{ENCODED_NAME_COLUMNS[c]} AS {c}' if c in ENCODED_NAME_COLUMNS else f'r.{c}' for c in DIRECTORY_COLUMNS)} "
+    "FROM employee_records r LEFT JOIN departments d ON d.department_id = r.department_id "
+    "LEFT JOIN positions p ON p.position_id = r.position_id LEFT JOIN statuses s ON s.status_id = r.status_id")
+# SEARCH_WHERE with the same parameters, filtering on keys looked up once rather than on every row's joined name
+ENCODED_SEARCH_WHERE = ("(? IS NULL OR r.name LIKE ? OR d.name LIKE ? OR p.name LIKE ?) "
+                        "AND (? IS NULL OR r.department_id = (SELECT department_id FROM departments WHERE name = ?)) "
+                        "AND (? IS NULL OR r.status_id = (SELECT status_id FROM statuses WHERE name = ?))")
+
+# Registry overrides for dictionary-encoded databases (migration 7): group and filter on the integer keys
+# instead of the employees view's joined names
+ENCODED_QUERIES = {**QUERIES,
+    'search_employees': f"{ENCODED_DIRECTORY_SELECT} WHERE {ENCODED_SEARCH_WHERE}",
+    'count_by_status': "SELECT COUNT(*) FROM employee_records WHERE status_id = (SELECT status_id FROM statuses WHERE name = ?)",
+    'department_counts': grouped_by_department(["COUNT(*)"]),
+    'top_department': grouped_by_department(["COUNT(*)"], order="t.c0 DESC", limit="LIMIT 1"),
+    'department_avg_salary': grouped_by_department(["AVG(salary)"]),
+    'department_performance': grouped_by_department(["AVG(performance_rating)", "COUNT(*)"]),
+    'department_salary_totals': grouped_by_department(["COUNT(*)", "SUM(salary)", "COUNT(salary)"]),
+    'insert_employee_with_id': '''
+        INSERT INTO employees (emp_id, name, age, department, position, salary, joining_date, email, phone, address, performance_rating, skills, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''',
+    'next_employee_id': "SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'employee_records'), 0), "
+                        "COALESCE((SELECT MAX(emp_id) FROM employee_records), 0)) + 1",
+}
+
+
+def query_registry(connection):
+    """ENCODED_QUERIES once employees is the dictionary-encoded view, else QUERIES"""
+    encoded = connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'view' AND name = 'employees'").fetchone()
+    return ENCODED_QUERIES if encoded else QUERIES
+
+
+def insert_employee(cursor, values):
+    """Insert one employee and return its emp_id"""
+    queries = query_registry(cursor.connection)
+    if queries is QUERIES:
+        cursor.execute(queries['insert_employee'], values)
+        return cursor.lastrowid
+    # INSTEAD OF triggers on the employees view leave lastrowid unset, so allocate the id under the
+    # write lock and insert it explicitly in the same transaction
+    if not cursor.connection.in_transaction:
+        cursor.execute("BEGIN IMMEDIATE")
+    emp_id = cursor.execute(queries['next_employee_id']).fetchone()[0]
+    cursor.execute(queries['insert_employee_with_id'], (emp_id, *values))
+    return emp_id
+
+
+def category_names(cursor, column):
+    """Sorted values of a categorical column from its lookup table, or from employees before the tables exist"""
+    try:
+        rows = cursor.execute(f"SELECT name FROM {LOOKUP_COLUMNS[column][0]} ORDER BY name").fetchall()
+    except sqlite3.OperationalError:
+        rows = cursor.execute(f"SELECT DISTINCT {column} FROM employees WHERE {column} IS NOT NULL "
+                              f"ORDER BY {column}").fetchall()
+    return [name for (name,) in rows]
+
+
+def search_params(text, department=None, status=None):
+    """Positional parameters for SEARCH_WHERE; blank or 'All' disables a filter"""
+    like = f"%{text}%" if text else None
+    department = department if department and department != "All" else None
+    status = status if status and status != "All" else None
+    return [like, like, like, like, department, department, status, status]
+
+
+# Tuned PRAGMA sets; 'default' keeps SQLite's stock settings for benchmark comparisons. The tuned profiles
+# set the same PRAGMAs, so switching between them at runtime leaves nothing behind
+CONNECTION_PROFILES = {
+    'default': {},
+    'read_heavy': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -65536,        # 64 MB page cache
+        'mmap_size': 268435456,      # 256 MB memory-mapped reads
+        'temp_store': 'MEMORY',      # sorts and GROUP BY temp b-trees stay off disk
+        'busy_timeout': 5000,
+        'wal_autocheckpoint': 1000,
+    },
+    'write_heavy': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -32768,        # 32 MB page cache
+        'mmap_size': 67108864,       # 64 MB memory-mapped reads
+        'temp_store': 'MEMORY',
+        'busy_timeout': 15000,
+        'wal_autocheckpoint': 10000, # fewer checkpoints during bulk writes
+    },
+}
+
+
+def apply_connection_profile(connection, profile):
+    """Apply a named PRAGMA profile to an open connection"""
+    for pragma, value in CONNECTION_PROFILES[profile].items():
+        connection.execute(f"PRAGMA {pragma}={value}")
+
+
+def connect_database(db_path, profile='read_heavy', cached_statements=STATEMENT_CACHE_SIZE, check_same_thread=True):
+    """Open a SQLite connection with statement-cache sizing and a tuned profile"""
+    connection = sqlite3.connect(db_path, cached_statements=cached_statements, check_same_thread=check_same_thread)
+    apply_connection_profile(connection, profile)
+    return connection
+
+
+# read_heavy PRAGMAs that only affect the connection; journal mode and checkpointing belong to the file's owner
+READ_ONLY_PRAGMAS = ('cache_size', 'mmap_size', 'temp_store', 'busy_timeout')
+
+
+def read_only_uri(db_path):
+    return f"{pathlib.Path(os.path.abspath(db_path)).as_uri()}?mode=ro"
+
+
+def connect_read_only(db_path, check_same_thread=True):
+    """Open a database another application owns without writing to it, not even a journal mode change"""
+    connection = sqlite3.connect(read_only_uri(db_path), uri=True, cached_statements=STATEMENT_CACHE_SIZE,
+                                 check_same_thread=check_same_thread)
+    for pragma in READ_ONLY_PRAGMAS:
+        connection.execute(f"PRAGMA {pragma}={CONNECTION_PROFILES['read_heavy'][pragma]}")
+    return connection
+
+
+class ReadSnapshot:
+    """Runs a group of registry queries against one deferred read transaction so they all see the same commit"""
+
+    def __init__(self, connection, queries=None):
+        self.connection = connection
+        self.data_version = None
+        self.change_id = None
+        self.fixed_queries = queries   # a registry to use as-is, e.g. QUERIES for a shard on an older schema
+        self.queries = queries or QUERIES
+
+    def __enter__(self):
+        # Read the version before pinning: a commit in between makes the snapshot newer, never older, than the key
+        self.data_version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+        self.connection.execute("BEGIN DEFERRED")
+        # In WAL mode the first read fixes the snapshot; other connections keep committing meanwhile
+        try:
+            self.change_id = self.connection.execute("SELECT COALESCE(MAX(change_id), 0) FROM employee_changes").fetchone()[0]
+        except sqlite3.OperationalError:
+            self.change_id = None  # a federated shard that predates the change journal
+        self.queries = self.fixed_queries or query_registry(self.connection)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.connection.rollback()
+        return False
+
+    def scalar(self, name, params=()):
+        row = self.connection.execute(self.queries[name], params).fetchone()
+        return row[0] if row else None
+
+    def fetchall(self, name, params=()):
+        return self.connection.execute(self.queries[name], params).fetchall()
+
+    def column(self, name, params=()):
+        return [row[0] for row in self.fetchall(name, params)]
+
+
+SYNTHETIC_DEPARTMENTS = ('HR', 'IT', 'Finance', 'Marketing', 'Operations', 'Sales', 'Engineering', 'Design')
+SYNTHETIC_STATUSES = ('Active', 'Inactive', 'On Leave', 'Terminated')
+# Surname syllables keep duplicate-detection blocks realistically small
+SYNTHETIC_SYLLABLES = ('an', 'bel', 'cor', 'dun', 'fer', 'gar', 'hol', 'kin', 'mor', 'pat', 'ros', 'tev', 'vin', 'wal')
+
+
+def synthetic_employees(rng, count, start=0):
+    """insert_employee parameter tuples for generated employees numbered from start"""
+    return [(f"Employee {i} {''.join(rng.choices(SYNTHETIC_SYLLABLES, k=3)).title()}", rng.randint(21, 65), rng.choice(SYNTHETIC_DEPARTMENTS), f"Position {rng.randint(1, 40)}",
+             round(rng.uniform(30000, 150000), 2), f"{rng.randint(2010, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+             f"employee{i}@ems.com", f"{rng.randint(10**9, 10**10 - 1)}", "", round(rng.uniform(1, 5), 1),
+             "Python,SQL", rng.choice(SYNTHETIC_STATUSES)) for i in range(start, start + count)]
+
+
+def benchmark_connection_profiles(rows=100000, searches=500, commits=300, lookups=20000):
+    """Time the app's write and read patterns for each profile against a scratch database"""
+    departments = SYNTHETIC_DEPARTMENTS
+    rng = random.Random(42)
+    data = synthetic_employees(rng, rows)
+    cases = [(profile, STATEMENT_CACHE_SIZE) for profile in CONNECTION_PROFILES] + [('read_heavy', 0)]
+    columns = ('bulk load', 'commit/row', 'id lookup', 'search', 'aggregate')
+    print(f"{'profile':<12} {'stmt cache':>10} " + " ".join(f"{c:>11}" for c in columns))
+    for profile, cache in cases:
+        timings = []
+        with tempfile.TemporaryDirectory() as tmp:
+            connection = connect_database(os.path.join(tmp, "bench.db"), profile, cache)
+            cursor = connection.cursor()
+            cursor.execute(f"CREATE TABLE employees (emp_id INTEGER PRIMARY KEY, {', '.join(EMPLOYEE_COLUMNS[1:])})")
+
+            start = time.perf_counter()
+            for i in range(0, rows, 1000):
+                cursor.executemany(QUERIES['insert_employee'], data[i:i + 1000])
+                connection.commit()
+            timings.append(time.perf_counter() - start)
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+            # One commit per row, as add_employee and update_employee do
+            start = time.perf_counter()
+            for i in range(commits):
+                cursor.execute(QUERIES['update_employee'], data[i] + (i + 1,))
+                connection.commit()
+            timings.append(time.perf_counter() - start)
+
+            # Detail-pane style point reads, dominated by statement preparation
+            start = time.perf_counter()
+            for _ in range(lookups):
+                cursor.execute(QUERIES['employee_segments'], (rng.randint(1, rows),)).fetchone()
+            timings.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for _ in range(searches):
+                cursor.execute(QUERIES['search_employees'],
+                               search_params(f"Employee {rng.randint(0, rows)}", rng.choice(departments))).fetchall()
+            timings.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for _ in range(20):
+                for name in ('count_employees', 'avg_salary', 'department_counts', 'department_avg_salary'):
+                    cursor.execute(QUERIES[name]).fetchall()
+            timings.append(time.perf_counter() - start)
+            connection.close()
+        print(f"{profile:<12} {cache:>10} " + " ".join(f"{t:>10.3f}s" for t in timings))
+
+
+# --- Duplicate Detection ---
+
+DUPLICATE_THRESHOLD = 0.9   # at or above: same person, skipped on import
+REVIEW_THRESHOLD = 0.6      # at or above: queued for merge review
+MAX_BLOCK_SIZE = 50         # larger blocks are compared within a sliding window only
+BLOCK_WINDOW = 10
+IMPORT_BATCH_SIZE = 500
+
+SOUNDEX_CODES = {c: d for d, letters in (('1', 'bfpv'), ('2', 'cgjkqsxz'), ('3', 'dt'), ('4', 'l'), ('5', 'mn'), ('6', 'r'))
+                 for c in letters}
+
+
+def soundex(word):
+    """American Soundex code of a word, e.g. 'Robert' -> 'R163'"""
+    word = re.sub(r'[^a-z]', '', word.lower())
+    if not word:
+        return ''
+    code = word[0].upper()
+    last = SOUNDEX_CODES.get(word[0], '')
+    for c in word[1:]:
+        digit = SOUNDEX_CODES.get(c, '')
+        if digit and digit != last:
+            code += digit
+            if len(code) == 4:
+                break
+        if c not in 'hw':
+            last = digit
+    return code.ljust(4, '0')
+
+
+def normalize_email(email):
+    email = (email or '').strip().lower()
+    if '@' not in email:
+        return ''
+    local, domain = email.rsplit('@', 1)
+    return f"{local.split('+', 1)[0]}@{domain}"
+
+
+def phone_digits(phone):
+    digits = re.sub(r'\D', '', phone or '')
+    return digits[-10:] if len(digits) >= 7 else ''
+
+
+def match_keys(name, email, phone):
+    """Hashed blocking keys: normalized email, phone digits and a phonetic name key"""
+    keys = []
+    if normalize_email(email):
+        keys.append('e:' + normalize_email(email))
+    if phone_digits(phone):
+        keys.append('p:' + phone_digits(phone))
+    tokens = re.findall(r'[a-z]+', (name or '').lower())
+    if tokens:
+        keys.append(f"n:{soundex(tokens[-1])}{tokens[0][0]}")
+    return [int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big', signed=True) for key in keys]
+
+
+def match_score(a, b):
+    """Similarity of two (name, email, phone) records in 0..1"""
+    name_a = ' '.join(re.findall(r'[a-z]+', (a[0] or '').lower()))
+    name_b = ' '.join(re.findall(r'[a-z]+', (b[0] or '').lower()))
+    score = 0.4 * SequenceMatcher(None, name_a, name_b).ratio()
+    if normalize_email(a[1]) and normalize_email(a[1]) == normalize_email(b[1]):
+        score += 0.35
+    if phone_digits(a[2]) and phone_digits(a[2]) == phone_digits(b[2]):
+        score += 0.25
+    return score
+
+
+def write_match_keys(cursor, emp_id, name, email, phone):
+    """Replace one employee's rows in employee_match_keys"""
+    cursor.execute("DELETE FROM employee_match_keys WHERE emp_id=?", (emp_id,))
+    cursor.executemany("INSERT OR IGNORE INTO employee_match_keys (key_hash, emp_id) VALUES (?, ?)",
+                       [(key, emp_id) for key in match_keys(name, email, phone)])
+
+
+def backfill_match_keys(connection, batch_size=5000):
+    """Compute blocking keys for every employee that has none yet"""
+    cursor = connection.cursor()
+    reader = connection.execute('''
+        SELECT emp_id, name, email, phone FROM employees
+        WHERE emp_id NOT IN (SELECT emp_id FROM employee_match_keys)
+    ''')
+    while True:
+        rows = reader.fetchmany(batch_size)
+        if not rows:
+            break
+        cursor.executemany("INSERT OR IGNORE INTO employee_match_keys (key_hash, emp_id) VALUES (?, ?)",
+                           [(key, emp_id) for emp_id, name, email, phone in rows for key in match_keys(name, email, phone)])
+    connection.commit()
+
+
+def find_existing_matches(cursor, records):
+    """Best existing (emp_id, score) for each (name, email, phone) record, or None"""
+    keys = [match_keys(*record) for record in records]
+    cursor.execute("SELECT key_hash, emp_id FROM employee_match_keys WHERE key_hash IN (SELECT value FROM json_each(?))",
+                   (json.dumps(sorted({k for record_keys in keys for k in record_keys})),))
+    blocks = {}
+    for key, emp_id in cursor.fetchall():
+        blocks.setdefault(key, []).append(emp_id)
+    candidate_ids = sorted({emp_id for ids in blocks.values() for emp_id in ids})
+    cursor.execute("SELECT emp_id, name, email, phone FROM employees WHERE emp_id IN (SELECT value FROM json_each(?))",
+                   (json.dumps(candidate_ids),))
+    existing = {row[0]: row[1:] for row in cursor.fetchall()}
+    matches = []
+    for record, record_keys in zip(records, keys):
+        ids = {emp_id for key in record_keys for emp_id in blocks.get(key, ())}
+        scored = [(emp_id, match_score(record, existing[emp_id])) for emp_id in ids if emp_id in existing]
+        matches.append(max(scored, key=lambda item: item[1]) if scored else None)
+    return matches
+
+
+def find_duplicate_candidates(connection, progress=None, batch_size=2000):
+    """Full-table duplicate scan: pair ids within blocks, score pairs, store those worth reviewing"""
+    backfill_match_keys(connection)
+    cursor = connection.cursor()
+    cursor.execute("SELECT emp_id_a, emp_id_b FROM duplicate_candidates WHERE status != 'pending'")
+    decided = set(cursor.fetchall())
+    pairs = set()
+    blocks = connection.execute('''
+        SELECT group_concat(emp_id) FROM employee_match_keys
+        GROUP BY key_hash HAVING COUNT(*) > 1
+    ''')
+    for (ids,) in blocks:
+        ids = sorted(int(i) for i in ids.split(','))
+        window = len(ids) if len(ids) <= MAX_BLOCK_SIZE else BLOCK_WINDOW
+        for i, a in enumerate(ids):
+            for b in ids[i + 1:i + 1 + window]:
+                if (a, b) not in decided:
+                    pairs.add((a, b))
+
+    cursor.execute("DELETE FROM duplicate_candidates WHERE status='pending'")
+    pairs = sorted(pairs)
+    found = 0
+    for start in range(0, len(pairs), batch_size):
+        chunk = pairs[start:start + batch_size]
+        cursor.execute("SELECT emp_id, name, email, phone FROM employees WHERE emp_id IN (SELECT value FROM json_each(?))",
+                       (json.dumps(sorted({emp_id for pair in chunk for emp_id in pair})),))
+        records = {row[0]: row[1:] for row in cursor.fetchall()}
+        scored = [(a, b, match_score(records[a], records[b])) for a, b in chunk if a in records and b in records]
+        flagged = [item for item in scored if item[2] >= REVIEW_THRESHOLD]
+        cursor.executemany("INSERT OR REPLACE INTO duplicate_candidates (emp_id_a, emp_id_b, score) VALUES (?, ?, ?)", flagged)
+        found += len(flagged)
+        if progress:
+            progress(min(start + batch_size, len(pairs)), len(pairs))
+    connection.commit()
+    return found
+
+
+# --- Peer Benchmarks ---
+
+BENCHMARK_MIN_PEERS = 5     # thinner (department, position) groups fall back to the department, then the company
+BENCHMARK_FIELDS = (('salary', "Salary", "${:,.0f}"), ('age', "Age", "{:.0f}"), ('performance_rating', "Rating", "{:.1f}"))
+BENCHMARK_PERCENTILES = (10, 50, 90)
+
+
+def sorted_groups(labels, values):
+    """{label: ascending values} for every distinct label, from one sort"""
+    keep = ~np.isnan(values)
+    labels, values = labels[keep], values[keep]
+    if not len(values):
+        return {}
+    names, codes = np.unique(labels, return_inverse=True)
+    order = np.lexsort((values, codes.ravel()))
+    codes, values = codes.ravel()[order], values[order]
+    bounds = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+    return {names[codes[start]]: chunk for start, chunk in zip(np.r_[0, bounds], np.split(values, bounds))}
+
+
+class PeerBenchmarks:
+    """Read-only snapshot of peer distributions and duplicate-key buckets, cheap enough to query per keystroke"""
+
+    def __init__(self, rows=(), key_rows=()):
+        self.bands = {}      # (department, position) / (department, None) / (None, None) -> {field: (n, {pct: value})}
+        self.records = {}    # emp_id -> (name, email, phone)
+        self.keys = {}       # blocking key hash -> [emp_id]
+        rows = list(rows)
+        if rows:
+            emp_ids, names, emails, phones, departments, positions = zip(*(row[:6] for row in rows))
+            self.records = dict(zip(emp_ids, zip(names, emails, phones)))
+            groupings = [
+                (np.array([f"{d}\x1f{p}" for d, p in zip(departments, positions)]), lambda label: tuple(label.split('\x1f', 1))),
+                (np.array([str(d) for d in departments]), lambda label: (label, None)),
+                (np.full(len(rows), ''), lambda label: (None, None)),
+            ]
+            for index, (field, _, _) in enumerate(BENCHMARK_FIELDS, start=6):
+                values = np.array([np.nan if row[index] is None else row[index] for row in rows], dtype=float)
+                for labels, group_of in groupings:
+                    for label, peers in sorted_groups(labels, values).items():
+                        self.bands.setdefault(group_of(label), {})[field] = (
+                            len(peers), dict(zip(BENCHMARK_PERCENTILES, exact_percentiles(peers, BENCHMARK_PERCENTILES))))
+        for key, emp_id in key_rows:
+            self.keys.setdefault(key, []).append(emp_id)
+
+    @classmethod
+    def load(cls, connection):
+        """Build from one consistent snapshot of employees and their blocking keys"""
+        with ReadSnapshot(connection):
+            rows = connection.execute('''
+                SELECT emp_id, name, email, phone, department, position, salary, age, performance_rating FROM employees
+            ''').fetchall()
+            key_rows = connection.execute("SELECT key_hash, emp_id FROM employee_match_keys").fetchall()
+        return cls(rows, key_rows)
+
+    def peers(self, department, position, field):
+        """(peer count, percentiles, label) for the narrowest group with enough peers, or None"""
+        for group, label in (((department, position), f"{position} peers in {department}"),
+                             ((department, None), f"{department} peers"), ((None, None), "company-wide")):
+            count, percentiles = self.bands.get(group, {}).get(field, (0, None))
+            if count >= BENCHMARK_MIN_PEERS:
+                return count, percentiles, label
+        return None
+
+    def check(self, form, exclude_id=None):
+        """(level, message) hints for a dict of form values; level is 'warning' or 'info'"""
+        hints = []
+        for field, title, fmt in BENCHMARK_FIELDS:
+            text = str(form.get(field) or '').strip()
+            if not text:
+                continue
+            try:
+                value = float(text)
+            except ValueError:
+                hints.append(('warning', f"{title} is not a number."))
+                continue
+            found = self.peers(form.get('department'), form.get('position'), field)
+            if not found:
+                continue
+            count, pct, label = found
+            if value < pct[10] or value > pct[90]:
+                side = "below P10" if value < pct[10] else "above P90"
+                hints.append(('warning', f"{title} {fmt.format(value)} is {side} of {count} {label} "
+                                         f"(P10 {fmt.format(pct[10])}, median {fmt.format(pct[50])}, P90 {fmt.format(pct[90])})."))
+            elif field == 'salary':
+                hints.append(('info', f"Salary is within the P10–P90 range of {count} {label} (median {fmt.format(pct[50])})."))
+        for emp_id, name, score in self.duplicates(form.get('name'), form.get('email'), form.get('phone'), exclude_id):
+            hints.append(('warning', f"Possible duplicate of #{emp_id} {name} ({score:.0%} match)."))
+        return hints
+
+    def duplicates(self, name, email, phone, exclude_id=None, limit=3):
+        """Existing employees likely to be the same person; only email/phone blocks can reach REVIEW_THRESHOLD"""
+        record = (name or '', email or '', phone or '')
+        ids = {emp_id for key in match_keys('', record[1], record[2]) for emp_id in self.keys.get(key, ())[:MAX_BLOCK_SIZE]}
+        ids.discard(exclude_id)
+        scored = sorted(((match_score(record, self.records[emp_id]), emp_id) for emp_id in ids if emp_id in self.records),
+                        reverse=True)
+        return [(emp_id, self.records[emp_id][0], score) for score, emp_id in scored[:limit] if score >= REVIEW_THRESHOLD]
+
+
+class BenchmarkCache:
+    """Holds the current PeerBenchmarks and rebuilds it on a background thread after changes"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.current = PeerBenchmarks()
+        self.error = None   # why the last rebuild failed, shown by the Tk thread; None once one succeeds
+        self.lock = threading.Lock()
+        self.building = False
+        self.stale = False
+
+    def refresh(self):
+        """Start a rebuild, or queue one more if a rebuild is already running"""
+        with self.lock:
+            if self.building:
+                self.stale = True
+                return
+            self.building = True
+        threading.Thread(target=self.build, daemon=True).start()
+
+    def build(self):
+        while True:
+            try:
+                connection = connect_database(self.db_path, 'read_heavy')
+                try:
+                    # Swapping the reference is atomic, so readers never see a half-built snapshot
+                    self.current = PeerBenchmarks.load(connection)
+                finally:
+                    connection.close()
+                self.error = None
+            except sqlite3.Error as e:
+                self.error = e
+            with self.lock:
+                if not self.stale:
+                    self.building = False
+                    return
+                self.stale = False
+
+
+# --- Federation ---
+
+SHARD_ID_STRIDE = 10 ** 12  # global id = shard index * stride + local emp_id; shard 0 keeps its own ids
+
+
+def shard_alias(name):
+    """Schema name usable in ATTACH and qualified table names"""
+    alias = re.sub(r'\W', '_', name).lower()
+    return alias if alias[:1].isalpha() else f"shard_{alias}"
+
+
+class Federation:
+    """Several business-unit databases used as one directory; shard 0 is the primary database the app owns"""
+
+    def __init__(self, shards):
+        self.shards = [(name, path) for name, path in shards]   # [(name, db_path)], primary first
+        # Other units' databases are only ever read, and never migrated from here. Shards whose schema is behind
+        # this app's are read through the base QUERIES and left out of features that need newer tables
+        self.behind = set()
+        for index, (_, path) in enumerate(self.shards[1:], start=1):
+            connection = connect_read_only(path)
+            try:
+                if SchemaMigrator(connection).current_version() < MIGRATIONS[-1].version:
+                    self.behind.add(index)
+            finally:
+                connection.close()
+        self.local = threading.local()
+        self.executor = ThreadPoolExecutor(max_workers=len(self.shards), thread_name_prefix='shard')
+        # Every worker's thread-local connection, closed in shutdown once the workers have stopped
+        self.readers = []
+        self.readers_lock = threading.Lock()
+        self.writers = {}
+        # One read-only connection with every shard attached, for statements that span databases
+        self.attached = connect_read_only(self.shards[0][1])
+        for name, path in self.shards[1:]:
+            self.attached.execute("ATTACH DATABASE ? AS " + shard_alias(name), (read_only_uri(path),))
+
+    @staticmethod
+    def global_id(index, emp_id):
+        return index * SHARD_ID_STRIDE + int(emp_id)
+
+    @staticmethod
+    def split(global_id):
+        """(shard index, local emp_id) of a global id"""
+        return divmod(int(global_id), SHARD_ID_STRIDE)
+
+    def connection(self, index):
+        """Per-thread read connection to one shard"""
+        connections = getattr(self.local, 'connections', None)
+        if connections is None:
+            connections = self.local.connections = {}
+        if index not in connections:
+            if index == 0:
+                connection = connect_database(self.shards[0][1], 'read_heavy', check_same_thread=False)
+            else:
+                connection = connect_read_only(self.shards[index][1], check_same_thread=False)
+            with self.readers_lock:
+                self.readers.append(connection)
+            connections[index] = connection
+        return connections[index]
+
+    def map(self, work, indexes=None):
+        """Run work(index, connection) for each shard concurrently on worker connections"""
+        indexes = range(len(self.shards)) if indexes is None else list(indexes)
+        return list(self.executor.map(lambda index: work(index, self.connection(index)), indexes))
+
+    def globalize(self, index, rows):
+        return [(self.global_id(index, row[0]),) + tuple(row[1:]) for row in rows]
+
+    def queries(self, index, connection):
+        """Registry for one shard: the base QUERIES for shards on an older schema"""
+        return QUERIES if index in self.behind else query_registry(connection)
+
+    def current(self):
+        """Indexes of the shards whose schema is up to date"""
+        return [index for index in range(len(self.shards)) if index not in self.behind]
+
+    def search(self, params=None):
+        """Directory rows from every shard (all rows, or SEARCH_WHERE params), with global ids"""
+        name, args = ('search_employees', params) if params is not None else ('all_employees', ())
+        parts = self.map(lambda index, connection: self.globalize(
+            index, connection.execute(self.queries(index, connection)[name], args).fetchall()))
+        return [row for part in parts for row in part]
+
+    def fetch_by_ids(self, global_ids):
+        """Full employee rows for global ids, one query per owning shard"""
+        by_shard = {}
+        for global_id in global_ids:
+            index, emp_id = self.split(global_id)
+            by_shard.setdefault(index, []).append(emp_id)
+        parts = self.map(lambda index, connection: self.globalize(index, connection.execute(
+            QUERIES['employees_by_ids'], (json.dumps(by_shard[index]),)).fetchall()), by_shard)
+        return [row for part in parts for row in part]
+
+    def dashboard_figures(self, since):
+        """Dashboard aggregates merged from per-shard partials, each shard read in one snapshot"""
+        def partial(index, connection):
+            with ReadSnapshot(connection, QUERIES if index in self.behind else None) as snapshot:
+                return (snapshot.connection.execute(QUERIES['salary_totals']).fetchone(),
+                        snapshot.scalar('count_joined_since', (since,)) or 0,
+                        snapshot.fetchall('department_salary_totals'))
+
+        salary_sum = salary_count = new_hires = 0
+        departments = {}
+        for (shard_sum, shard_count), shard_hires, dept_rows in self.map(partial):
+            salary_sum += shard_sum or 0
+            salary_count += shard_count or 0
+            new_hires += shard_hires
+            for dept, count, dept_sum, dept_salaries in dept_rows:
+                totals = departments.setdefault(dept, [0, 0.0, 0])
+                totals[0] += count
+                totals[1] += dept_sum or 0
+                totals[2] += dept_salaries
+        dept_counts = sorted((dept, totals[0]) for dept, totals in departments.items())
+        dept_avg = [(dept, totals[1] / totals[2]) for dept, totals in sorted(departments.items()) if totals[2]]
+        top = max(dept_counts, key=lambda item: item[1])[0] if dept_counts else None
+        return (sum(count for _, count in dept_counts), salary_sum / salary_count if salary_count else 0,
+                top, new_hires, dept_counts, dept_avg)
+
+    def rows(self, sql, params=(), global_ids=False, indexes=None):
+        """One read-only statement run on every shard (or the given ones), rows concatenated (first column made a
+        global id if asked)"""
+        def part(index, connection):
+            rows = connection.execute(sql, params).fetchall()
+            return self.globalize(index, rows) if global_ids else rows
+
+        return [row for rows in self.map(part, indexes) for row in rows]
+
+    def analytics_figures(self):
+        """Salaries and the monthly performance trend merged from per-shard partials, each read in one snapshot"""
+        def partial(index, connection):
+            with ReadSnapshot(connection, QUERIES if index in self.behind else None) as snapshot:
+                return snapshot.column('salaries'), snapshot.fetchall('monthly_performance_totals')
+
+        salaries = []
+        months = {}
+        for shard_salaries, trend_rows in self.map(partial):
+            salaries.extend(shard_salaries)
+            for month, rating_sum, rating_count in trend_rows:
+                totals = months.setdefault(month, [0.0, 0])
+                totals[0] += rating_sum or 0
+                totals[1] += rating_count
+        trend = [(month, totals[0] / totals[1] if totals[1] else None) for month, totals in sorted(months.items())]
+        return salaries, trend
+
+    def cohort_matrix(self, metric='Retention %', cohorts=COHORT_HEATMAP_COHORTS, months=COHORT_HEATMAP_MONTHS):
+        """Heatmap data from every up-to-date shard's rollup; each shard's app maintains its own, and the counts add up"""
+        rollup = {}
+        for cohort, offset, *values in self.rows(QUERIES['cohort_rollup_rows'], (cohorts, months), indexes=self.current()):
+            totals = rollup.setdefault((cohort, offset), [0] * len(values))
+            for i, value in enumerate(values):
+                totals[i] += value
+        return cohort_matrix([(cohort, offset, *values) for (cohort, offset), values in rollup.items()],
+                             metric, cohorts, months)
+
+    def export_cursor(self):
+        """One streaming UNION ALL over the attached shards, tagged with the shard name"""
+        selects = [f"SELECT ? AS shard, * FROM {'main' if index == 0 else shard_alias(name)}.employees"
+                   for index, (name, _) in enumerate(self.shards)]
+        return self.attached.execute(" UNION ALL ".join(selects), [name for name, _ in self.shards])
+
+    def write(self, index, statements):
+        """Run statements(cursor) as one transaction on the owning shard's writer connection"""
+        if index not in self.writers:
+            self.writers[index] = connect_database(self.shards[index][1], 'write_heavy')
+        connection = self.writers[index]
+        try:
+            statements(connection.cursor())
+            connection.commit()
+        except sqlite3.Error:
+            connection.rollback()
+            raise
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+        with self.readers_lock:
+            for connection in self.readers:
+                connection.close()
+            self.readers.clear()
+        for connection in self.writers.values():
+            connection.close()
+        self.attached.close()
+
+
+# --- Load Testing ---
+
+# Operation -> weight; the operations replay the data-layer work of the matching GUI actions
+LOAD_TEST_MIXES = {
+    'browse': {'search': 75, 'dashboard': 20, 'update': 5},
+    'editing': {'search': 40, 'update': 35, 'add': 15, 'dashboard': 10},
+    'import': {'import': 25, 'search': 40, 'update': 15, 'dashboard': 20},
+}
+LOAD_IMPORT_BATCH = 100
+
+
+def load_search(connection, rng, context):
+    """advanced_search: filtered directory query"""
+    connection.execute(query_registry(connection)['search_employees'],
+                       search_params(f"Employee {rng.randint(0, context['max_id'])}", rng.choice(SYNTHETIC_DEPARTMENTS))).fetchall()
+
+
+def load_dashboard(connection, rng, context):
+    """update_dashboard: the card and chart aggregates in one snapshot"""
+    since = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+    with ReadSnapshot(connection) as snapshot:
+        for name in ('count_employees', 'avg_salary', 'top_department'):
+            snapshot.scalar(name)
+        snapshot.scalar('count_joined_since', (since,))
+        snapshot.fetchall('department_counts')
+        snapshot.fetchall('department_avg_salary')
+
+
+def load_add(connection, rng, context):
+    """add_employee: insert plus blocking keys and skill mapping, one commit"""
+    row = synthetic_employees(rng, 1, rng.randint(10**6, 10**7))[0]
+    cursor = connection.cursor()
+    emp_id = insert_employee(cursor, row)
+    write_match_keys(cursor, emp_id, row[0], row[6], row[7])
+    write_employee_skills(cursor, emp_id, parse_skills(row[10]))
+    connection.commit()
+    context['max_id'] = max(context['max_id'], emp_id)
+
+
+def load_update(connection, rng, context):
+    """update_employee: read segments, rewrite the row, keys and skills, one commit"""
+    emp_id = rng.randint(1, context['max_id'])
+    row = synthetic_employees(rng, 1, emp_id)[0]
+    cursor = connection.cursor()
+    cursor.execute(QUERIES['employee_segments'], (emp_id,)).fetchone()
+    cursor.execute(QUERIES['update_employee'], row + (emp_id,))
+    write_match_keys(cursor, emp_id, row[0], row[6], row[7])
+    write_employee_skills(cursor, emp_id, parse_skills(row[10]))
+    connection.commit()
+
+
+def load_import(connection, rng, context):
+    """import_from_csv: one batch of duplicate checks and inserts, one commit"""
+    rows = synthetic_employees(rng, LOAD_IMPORT_BATCH, rng.randint(0, context['max_id']))
+    cursor = connection.cursor()
+    for row, match in zip(rows, find_existing_matches(cursor, [(row[0], row[6], row[7]) for row in rows])):
+        if match and match[1] >= DUPLICATE_THRESHOLD:
+            continue
+        emp_id = insert_employee(cursor, row)
+        write_match_keys(cursor, emp_id, row[0], row[6], row[7])
+        write_employee_skills(cursor, emp_id, parse_skills(row[10]))
+    connection.commit()
+
+
+LOAD_OPERATIONS = {
+    'search': load_search,
+    'dashboard': load_dashboard,
+    'add': load_add,
+    'update': load_update,
+    'import': load_import,
+}
+
+
+def run_load_client(db_path, profile, mix, duration, seed, barrier=None):
+    """One simulated user: weighted operations for duration seconds -> {op: [(latency, lock_wait, ok)]}"""
+    connection = connect_database(db_path, profile)
+    # Lock waits are measured by the retry loop below instead of disappearing into busy_timeout
+    lock_timeout = CONNECTION_PROFILES[profile].get('busy_timeout', 5000) / 1000
+    connection.execute("PRAGMA busy_timeout=0")
+    context = {'max_id': connection.execute("SELECT COALESCE(MAX(emp_id), 1) FROM employees").fetchone()[0]}
+    rng = random.Random(seed)
+    operations, weights = zip(*mix.items())
+    samples = {op: [] for op in operations}
+    if barrier is not None:
+        barrier.wait()
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        op = rng.choices(operations, weights)[0]
+        started = attempt = time.perf_counter()
+        ok = True
+        while True:
+            try:
+                LOAD_OPERATIONS[op](connection, rng, context)
+                break
+            except sqlite3.OperationalError as e:
+                connection.rollback()
+                if 'locked' not in str(e) and 'busy' not in str(e) or time.perf_counter() - started > lock_timeout:
+                    ok = False
+                    break
+                time.sleep(rng.uniform(0.001, 0.005))
+                attempt = time.perf_counter()
+            except sqlite3.Error:
+                connection.rollback()
+                ok = False
+                break
+        samples[op].append((time.perf_counter() - started, attempt - started, ok))
+    connection.close()
+    return samples
+
+
+def summarize_load(results, duration):
+    """Per-operation and total rows: count, ops/s, latency P50/P95/P99, lock wait mean/P95 (ms), error rate"""
+    merged = {}
+    for samples in results:
+        for op, values in samples.items():
+            merged.setdefault(op, []).extend(values)
+    merged['total'] = [value for op in list(merged) for value in merged[op]]
+    summary = []
+    for op, values in merged.items():
+        if not values:
+            continue
+        latency, wait, ok = (np.array(column, dtype=float) for column in zip(*values))
+        p50, p95, p99 = np.percentile(latency, [50, 95, 99]) * 1000
+        summary.append((op, len(values), len(values) / duration, p50, p95, p99,
+                        wait.mean() * 1000, np.percentile(wait, 95) * 1000, 1 - ok.mean()))
+    return summary
+
+
+def run_load_test(db_path, clients_list, mixes, duration=10, profile='read_heavy', rows=0, in_place=False):
+    """Drive N client processes per mix against a copy of the database (or the file itself) and print the results"""
+    with tempfile.TemporaryDirectory() as tmp:
+        target = db_path if in_place else os.path.join(tmp, "loadtest.db")
+        if not in_place:
+            source = sqlite3.connect(db_path)
+            copy = sqlite3.connect(target)
+            source.backup(copy)
+            source.close()
+            copy.close()
+        connection = connect_current_schema(target)
+        existing = connection.execute(QUERIES['count_employees']).fetchone()[0]
+        if rows > existing:
+            data = synthetic_employees(random.Random(7), rows - existing, existing)
+            for i in range(0, len(data), 5000):
+                connection.executemany(QUERIES['insert_employee'], data[i:i + 5000])
+                connection.commit()
+            backfill_match_keys(connection)
+        connection.close()
+
+        print(f"{'mix':<9} {'clients':>7} {'op':<10} {'count':>7} {'ops/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+              f"{'wait ms':>8} {'wait p95':>8} {'errors':>7}")
+        context = multiprocessing.get_context('spawn')
+        with context.Manager() as manager:
+            for mix_name in mixes:
+                for clients in clients_list:
+                    barrier = manager.Barrier(clients)
+                    with ProcessPoolExecutor(max_workers=clients, mp_context=context) as executor:
+                        futures = [executor.submit(run_load_client, target, profile, LOAD_TEST_MIXES[mix_name], duration,
+                                                   seed, barrier) for seed in range(clients)]
+                        results = [future.result() for future in futures]
+                    for op, count, rate, p50, p95, p99, wait, wait95, errors in summarize_load(results, duration):
+                        print(f"{mix_name:<9} {clients:>7} {op:<10} {count:>7} {rate:>8.1f} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f} "
+                              f"{wait:>8.1f} {wait95:>8.1f} {errors:>7.1%}")
+
+
+# --- Schema Migrations ---
+
+MIGRATION_BATCH_SIZE = 2000
+MIGRATION_SAMPLE_ROWS = 20000
+
+SCHEMA_VERSION_SQL = '''
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        description TEXT NOT NULL,
+        state TEXT NOT NULL,
+        backfill_cursor INTEGER DEFAULT 0,
+        started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        completed_at TIMESTAMP
+    )
+'''
+
+
+class Migration:
+    """One schema version: DDL, an optional keyset-batched backfill over employees, deferred indexes, then a final swap"""
+
+    def __init__(self, version, description, schema=(), backfill=None, indexes=(), finalize=()):
+        self.version = version
+        self.description = description
+        self.schema = schema          # DDL statements, applied together at startup
+        self.backfill = backfill      # (SELECT ... WHERE emp_id > ? ORDER BY emp_id LIMIT ?, apply(cursor, rows))
+        self.indexes = indexes        # (name, table, columns) built only after the backfill completes
+        self.finalize = finalize      # statements run in one transaction with the 'done' mark
+
+    @staticmethod
+    def index_sql(name, table, columns):
+        return f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"
+
+
+def backfill_skill_rows(cursor, rows):
+    for emp_id, skills in rows:
+        write_employee_skills(cursor, emp_id, parse_skills(skills or ""))
+
+
+def backfill_match_key_rows(cursor, rows):
+    cursor.executemany("INSERT OR IGNORE INTO employee_match_keys (key_hash, emp_id) VALUES (?, ?)",
+                       [(key, emp_id) for emp_id, name, email, phone in rows for key in match_keys(name, email, phone)])
+
+
+# Categorical employee columns stored as integer keys into (table, key column) lookups
+LOOKUP_COLUMNS = {
+    'department': ('departments', 'department_id'),
+    'position': ('positions', 'position_id'),
+    'status': ('statuses', 'status_id'),
+}
+ENCODED_COLUMNS = [LOOKUP_COLUMNS[c][1] if c in LOOKUP_COLUMNS else c for c in EMPLOYEE_COLUMNS]
+# Column defaults of the original table, applied by the view's INSERT trigger
+EMPLOYEE_DEFAULTS = {'performance_rating': "0.0", 'status': "'Active'", 'created_at': "CURRENT_TIMESTAMP",
+                     'updated_at': "CURRENT_TIMESTAMP"}
+
+
+def lookup_name_sql(column, key_expr):
+    table, key = LOOKUP_COLUMNS[column]
+    return f"(SELECT name FROM {table} WHERE {key} = {key_expr})"
+
+
+def encoded_values_sql(row, defaults=False):
+    """employee_records values, in ENCODED_COLUMNS order, for an employees row alias such as NEW or e"""
+    values = []
+    for column in EMPLOYEE_COLUMNS:
+        value = f"{row}.{column}"
+        if defaults and column in EMPLOYEE_DEFAULTS:
+            value = f"COALESCE({value}, {EMPLOYEE_DEFAULTS[column]})"
+        if column in LOOKUP_COLUMNS:
+            table, key = LOOKUP_COLUMNS[column]
+            value = f"(SELECT {key} FROM {table} WHERE name = {value})"
+        values.append(value)
+    return ", ".join(values)
+
+
+def register_lookups_sql(row, defaults=False):
+    """INSERT OR IGNORE statements adding a row's categorical values to the lookup tables"""
+    statements = []
+    for column, (table, _) in LOOKUP_COLUMNS.items():
+        value = f"{row}.{column}"
+        if defaults and column in EMPLOYEE_DEFAULTS:
+            value = f"COALESCE({value}, {EMPLOYEE_DEFAULTS[column]})"
+        statements.append(f"INSERT OR IGNORE INTO {table} (name) SELECT {value} WHERE {value} IS NOT NULL;")
+    return statements
+
+
+def backfill_encoded_rows(cursor, rows):
+    """Copy one keyset batch into employee_records, re-reading it inside the write transaction"""
+    bounds = (rows[0][0], rows[-1][0])
+    for column, (table, _) in LOOKUP_COLUMNS.items():
+        cursor.execute(f"INSERT OR IGNORE INTO {table} (name) SELECT DISTINCT {column} FROM employees "
+                       f"WHERE emp_id BETWEEN ? AND ? AND {column} IS NOT NULL", bounds)
+    # OR IGNORE: rows already mirrored by the triggers are newer than this batch
+    cursor.execute(f"INSERT OR IGNORE INTO employee_records ({', '.join(ENCODED_COLUMNS)}) "
+                   f"SELECT {encoded_values_sql('e')} FROM employees e WHERE e.emp_id BETWEEN ? AND ?", bounds)
+
+
+# Lookups, the integer-keyed table and triggers mirroring writes into it while the backfill copies old rows
+DICTIONARY_ENCODING_SQL = [
+    f"CREATE TABLE IF NOT EXISTS {table} ({key} INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)"
+    for table, key in LOOKUP_COLUMNS.values()
+] + [
+    # The values the forms offered before the lookups existed
+    "INSERT OR IGNORE INTO departments (name) VALUES ('HR'), ('IT'), ('Finance'), ('Marketing'), ('Operations'), "
+    "('Sales'), ('Engineering'), ('Design')",
+    "INSERT OR IGNORE INTO statuses (name) VALUES ('Active'), ('Inactive'), ('On Leave'), ('Terminated')",
+    '''
+    CREATE TABLE IF NOT EXISTS employee_records (
+        emp_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        age INTEGER NOT NULL,
+        department_id INTEGER REFERENCES departments (department_id),
+        position_id INTEGER REFERENCES positions (position_id),
+        salary REAL NOT NULL,
+        joining_date DATE NOT NULL,
+        email TEXT,
+        phone TEXT,
+        address TEXT,
+        performance_rating REAL DEFAULT 0.0,
+        skills TEXT,
+        manager_id INTEGER,
+        status_id INTEGER REFERENCES statuses (status_id),
+        last_promotion DATE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS employees_encode_insert AFTER INSERT ON employees
+    BEGIN
+        {' '.join(register_lookups_sql('NEW'))}
+        INSERT OR REPLACE INTO employee_records ({', '.join(ENCODED_COLUMNS)}) VALUES ({encoded_values_sql('NEW')});
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS employees_encode_update AFTER UPDATE ON employees
+    BEGIN
+        {' '.join(register_lookups_sql('NEW'))}
+        DELETE FROM employee_records WHERE emp_id = OLD.emp_id;
+        INSERT OR REPLACE INTO employee_records ({', '.join(ENCODED_COLUMNS)}) VALUES ({encoded_values_sql('NEW')});
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS employees_encode_delete AFTER DELETE ON employees
+    BEGIN
+        DELETE FROM employee_records WHERE emp_id = OLD.emp_id;
+    END
+    ''',
+]
+
+# Swap: drop the TEXT table (and its triggers), expose employee_records through an employees view with the
+# original columns, and move the change journal and status history triggers onto the base table
+DICTIONARY_SWAP_SQL = [
+    "INSERT INTO sqlite_sequence (name, seq) SELECT 'employee_records', 0 "
+    "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'employee_records')",
+    "UPDATE sqlite_sequence SET seq = MAX(seq, COALESCE((SELECT MAX(seq) FROM sqlite_sequence WHERE name = 'employees'), 0)) "
+    "WHERE name = 'employee_records'",
+    "DROP TABLE employees",
+    "DELETE FROM sqlite_sequence WHERE name = 'employees'",
+    '''
+    CREATE VIEW employees AS
+    SELECT r.emp_id, r.name, r.age, d.name AS department, p.name AS position, r.salary, r.joining_date, r.email, r.phone,
+           r.address, r.performance_rating, r.skills, r.manager_id, s.name AS status, r.last_promotion, r.created_at,
+           r.updated_at
+    FROM employee_records r
+    LEFT JOIN departments d ON d.department_id = r.department_id
+    LEFT JOIN positions p ON p.position_id = r.position_id
+    LEFT JOIN statuses s ON s.status_id = r.status_id
+    ''',
+    f'''
+    CREATE TRIGGER employees_view_insert INSTEAD OF INSERT ON employees
+    BEGIN
+        {' '.join(register_lookups_sql('NEW', defaults=True))}
+        INSERT INTO employee_records ({', '.join(ENCODED_COLUMNS)}) VALUES ({encoded_values_sql('NEW', defaults=True)});
+    END
+    ''',
+    f'''
+    CREATE TRIGGER employees_view_update INSTEAD OF UPDATE ON employees
+    BEGIN
+        {' '.join(register_lookups_sql('NEW'))}
+        UPDATE employee_records SET ({', '.join(ENCODED_COLUMNS)}) = ({encoded_values_sql('NEW')}) WHERE emp_id = OLD.emp_id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER employees_view_delete INSTEAD OF DELETE ON employees
+    BEGIN
+        DELETE FROM employee_records WHERE emp_id = OLD.emp_id;
+    END
+    ''',
+    # Same trigger names as CHANGE_JOURNAL_SQL and STATUS_HISTORY_SQL, so their IF NOT EXISTS forms stay no-ops
+    '''
+    CREATE TRIGGER employees_journal_insert AFTER INSERT ON employee_records
+    BEGIN
+        INSERT INTO employee_changes (emp_id, action) VALUES (NEW.emp_id, 'insert');
+    END
+    ''',
+    f'''
+    CREATE TRIGGER employees_journal_update AFTER UPDATE ON employee_records
+    BEGIN
+        INSERT INTO employee_changes (emp_id, action, old_department, old_position, old_joining_date)
+        VALUES (NEW.emp_id, 'update', {lookup_name_sql('department', 'OLD.department_id')},
+                {lookup_name_sql('position', 'OLD.position_id')}, OLD.joining_date);
+    END
+    ''',
+    f'''
+    CREATE TRIGGER employees_journal_delete AFTER DELETE ON employee_records
+    BEGIN
+        INSERT INTO employee_changes (emp_id, action, old_department, old_position, old_joining_date)
+        VALUES (OLD.emp_id, 'delete', {lookup_name_sql('department', 'OLD.department_id')},
+                {lookup_name_sql('position', 'OLD.position_id')}, OLD.joining_date);
+    END
+    ''',
+    f'''
+    CREATE TRIGGER employees_status_insert AFTER INSERT ON employee_records
+    BEGIN
+        INSERT INTO employee_status_history (emp_id, status, changed_at) VALUES (NEW.emp_id, 'Active', NEW.joining_date);
+        INSERT INTO employee_status_history (emp_id, status, changed_at)
+        SELECT NEW.emp_id, name, date('now') FROM statuses WHERE status_id = NEW.status_id AND name != 'Active';
+    END
+    ''',
+    '''
+    CREATE TRIGGER employees_status_update AFTER UPDATE OF status_id ON employee_records
+    WHEN OLD.status_id IS NOT NEW.status_id
+    BEGIN
+        INSERT INTO employee_status_history (emp_id, status, changed_at)
+        SELECT NEW.emp_id, name, date('now') FROM statuses WHERE status_id = NEW.status_id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER employees_status_delete AFTER DELETE ON employee_records
+    BEGIN
+        DELETE FROM employee_status_history WHERE emp_id = OLD.emp_id;
+    END
+    ''',
+]
+
+
+def backfill_status_history_rows(cursor, rows):
+    """Joining date as 'Active', plus the current status dated by the last update when it differs"""
+    cursor.executemany("INSERT INTO employee_status_history (emp_id, status, changed_at) VALUES (?, ?, ?)",
+                       [entry for emp_id, joining_date, status, updated_at in rows
+                        for entry in [(emp_id, 'Active', joining_date)] +
+                        ([(emp_id, status, str(updated_at or joining_date)[:10])] if status and status != 'Active' else [])])
+
+
+CHANGE_JOURNAL_RETENTION = 100000
+
+# Every write to employees, from any connection, lands in the journal with the segment it left
+CHANGE_JOURNAL_SQL = [
+    '''
+    CREATE TABLE IF NOT EXISTS employee_changes (
+        change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        emp_id INTEGER NOT NULL,
+        action TEXT NOT NULL,
+        old_department TEXT,
+        old_position TEXT,
+        old_joining_date TEXT
+    )
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS employees_journal_insert AFTER INSERT ON employees
+    BEGIN
+        INSERT INTO employee_changes (emp_id, action) VALUES (NEW.emp_id, 'insert');
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS employees_journal_update AFTER UPDATE ON employees
+    BEGIN
+        INSERT INTO employee_changes (emp_id, action, old_department, old_position, old_joining_date)
+        VALUES (NEW.emp_id, 'update', OLD.department, OLD.position, OLD.joining_date);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS employees_journal_delete AFTER DELETE ON employees
+    BEGIN
+        INSERT INTO employee_changes (emp_id, action, old_department, old_position, old_joining_date)
+        VALUES (OLD.emp_id, 'delete', OLD.department, OLD.position, OLD.joining_date);
+    END
+    ''',
+]
+
+# Tables and triggers the later migrations build on; version 1 creates them on databases that predate them
+BASELINE_SCHEMA_SQL = [
+    # Employee records, as first released
+    '''
+    CREATE TABLE IF NOT EXISTS employees (
+        emp_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        age INTEGER NOT NULL,
+        department TEXT NOT NULL,
+        position TEXT NOT NULL,
+        salary REAL NOT NULL,
+        joining_date DATE NOT NULL,
+        email TEXT,
+        phone TEXT,
+        address TEXT,
+        performance_rating REAL DEFAULT 0.0,
+        skills TEXT,
+        manager_id INTEGER,
+        status TEXT DEFAULT 'Active',
+        last_promotion DATE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    # Performance tracking
+    '''
+    CREATE TABLE IF NOT EXISTS performance_reviews (
+        review_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        emp_id INTEGER,
+        review_date DATE NOT NULL,
+        rating REAL NOT NULL,
+        feedback TEXT,
+        goals TEXT,
+        reviewer TEXT,
+        FOREIGN KEY (emp_id) REFERENCES employees (emp_id)
+    )
+    ''',
+    # AI insights
+    '''
+    CREATE TABLE IF NOT EXISTS ai_insights (
+        insight_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        insight_type TEXT NOT NULL,
+        insight_data TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    # Normalized skill dictionary and employee-skill mapping
+    '''
+    CREATE TABLE IF NOT EXISTS skills (
+        skill_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        normalized_name TEXT NOT NULL UNIQUE
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS employee_skills (
+        emp_id INTEGER NOT NULL,
+        skill_id INTEGER NOT NULL,
+        PRIMARY KEY (emp_id, skill_id),
+        FOREIGN KEY (emp_id) REFERENCES employees (emp_id),
+        FOREIGN KEY (skill_id) REFERENCES skills (skill_id)
+    )
+    ''',
+    # Bulk operation journal so whole batches can be rolled back
+    '''
+    CREATE TABLE IF NOT EXISTS bulk_batches (
+        batch_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        description TEXT NOT NULL,
+        column_name TEXT NOT NULL,
+        row_count INTEGER DEFAULT 0,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        rolled_back_at TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS bulk_batch_rows (
+        batch_id INTEGER NOT NULL,
+        emp_id INTEGER NOT NULL,
+        old_value,
+        new_value,
+        PRIMARY KEY (batch_id, emp_id),
+        FOREIGN KEY (batch_id) REFERENCES bulk_batches (batch_id)
+    )
+    ''',
+    # Hashed blocking-key index and duplicate review queue
+    '''
+    CREATE TABLE IF NOT EXISTS employee_match_keys (
+        key_hash INTEGER NOT NULL,
+        emp_id INTEGER NOT NULL,
+        PRIMARY KEY (key_hash, emp_id)
+    ) WITHOUT ROWID
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS duplicate_candidates (
+        emp_id_a INTEGER NOT NULL,
+        emp_id_b INTEGER NOT NULL,
+        score REAL NOT NULL,
+        status TEXT DEFAULT 'pending',
+        detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (emp_id_a, emp_id_b)
+    )
+    ''',
+] + CHANGE_JOURNAL_SQL
+
+
+MIGRATIONS = [
+    Migration(1, "Baseline schema", schema=BASELINE_SCHEMA_SQL),
+    Migration(2, "Map free-text skills into employee_skills",
+              backfill=("SELECT emp_id, skills FROM employees WHERE emp_id > ? ORDER BY emp_id LIMIT ?", backfill_skill_rows),
+              indexes=[('idx_employee_skills_skill', 'employee_skills', ('skill_id',))]),
+    Migration(3, "Blocking keys for duplicate detection",
+              backfill=("SELECT emp_id, name, email, phone FROM employees WHERE emp_id > ? ORDER BY emp_id LIMIT ?",
+                        backfill_match_key_rows),
+              indexes=[('idx_match_keys_emp', 'employee_match_keys', ('emp_id',))]),
+    Migration(4, "Directory filter indexes",
+              indexes=[('idx_employees_department_status', 'employees', ('department', 'status')),
+                       ('idx_employees_status', 'employees', ('status',))]),
+    Migration(5, "Pay and rating anomaly scores",
+              schema=['''
+                  CREATE TABLE IF NOT EXISTS employee_anomalies (
+                      emp_id INTEGER PRIMARY KEY,
+                      segment TEXT NOT NULL,
+                      salary_z REAL NOT NULL,
+                      rating_z REAL NOT NULL,
+                      score REAL NOT NULL,
+                      reason TEXT
+                  )
+              ''', '''
+                  CREATE TABLE IF NOT EXISTS anomaly_runs (
+                      run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                      change_id INTEGER NOT NULL,
+                      segments INTEGER NOT NULL,
+                      full_pass INTEGER NOT NULL,
+                      computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                  )
+              '''],
+              indexes=[('idx_employee_anomalies_score', 'employee_anomalies', ('score',)),
+                       ('idx_employee_anomalies_segment', 'employee_anomalies', ('segment',))]),
+    Migration(6, "Status history and hiring-cohort rollup",
+              schema=STATUS_HISTORY_SQL,
+              backfill=('''
+                  SELECT emp_id, joining_date, status, updated_at FROM employees
+                  WHERE emp_id > ? AND emp_id NOT IN (SELECT emp_id FROM employee_status_history)
+                  ORDER BY emp_id LIMIT ?
+              ''', backfill_status_history_rows),
+              indexes=[('idx_status_history_emp', 'employee_status_history', ('emp_id', 'changed_at')),
+                       ('idx_employees_joining_date', 'employees', ('joining_date',))]),
+    Migration(7, "Dictionary-encode department, position and status",
+              schema=DICTIONARY_ENCODING_SQL,
+              backfill=("SELECT emp_id FROM employees WHERE emp_id > ? ORDER BY emp_id LIMIT ?", backfill_encoded_rows),
+              indexes=[('idx_employee_records_department_status', 'employee_records', ('department_id', 'status_id')),
+                       ('idx_employee_records_position', 'employee_records', ('position_id',)),
+                       ('idx_employee_records_status', 'employee_records', ('status_id',)),
+                       ('idx_employee_records_joining_date', 'employee_records', ('joining_date',)),
+                       # Covers the per-department pay and rating aggregates, now affordable on an integer key
+                       ('idx_employee_records_department_pay', 'employee_records',
+                        ('department_id', 'salary', 'performance_rating'))],
+              finalize=DICTIONARY_SWAP_SQL),
+]
+
+
+# Grouped and filtered reads that pay for string comparisons on the categorical columns
+ENCODING_BENCHMARK_QUERIES = [
+    ('department_counts', ()), ('top_department', ()), ('department_avg_salary', ()), ('department_performance', ()),
+    ('department_salary_totals', ()), ('count_by_status', ('Active',)),
+    ('search_employees', tuple(search_params(None, 'Engineering', 'On Leave'))),
+]
+
+
+def benchmark_dictionary_encoding(rows=1000000, repeats=5):
+    """File size and grouped-query time of a TEXT-column employees table before and after migration 7"""
+    rng = random.Random(42)
+    encoding = [m for m in MIGRATIONS if m.finalize == DICTIONARY_SWAP_SQL]
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {'text': os.path.join(tmp, "text.db"), 'encoded': os.path.join(tmp, "encoded.db")}
+        connection = connect_database(paths['text'], 'write_heavy')
+        connection.execute(f"CREATE TABLE employees (emp_id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                           f"{', '.join(EMPLOYEE_COLUMNS[1:])})")
+        for start in range(0, rows, 10000):
+            connection.executemany(QUERIES['insert_employee'], synthetic_employees(rng, min(10000, rows - start), start))
+            connection.commit()
+        # The indexes an unencoded database has by migration 6
+        for migration in MIGRATIONS:
+            for name, table, columns in migration.indexes:
+                if table == 'employees':
+                    connection.execute(migration.index_sql(name, table, columns))
+        copy = sqlite3.connect(paths['encoded'])
+        connection.backup(copy)
+        copy.close()
+        connection.close()
+
+        connection = connect_database(paths['encoded'], 'write_heavy')
+        start = time.perf_counter()
+        SchemaMigrator(connection, encoding).run_pending()
+        print(f"migration 7 on {rows:,} rows: {time.perf_counter() - start:.1f}s")
+        connection.close()
+
+        results = {}
+        for label, path in paths.items():
+            connection = connect_database(path, 'write_heavy')
+            connection.execute("VACUUM")
+            connection.close()
+            connection = connect_database(path, 'read_heavy')
+            timings = []
+            queries = query_registry(connection)
+            for name, params in ENCODING_BENCHMARK_QUERIES:
+                connection.execute(queries[name], params).fetchall()
+                start = time.perf_counter()
+                for _ in range(repeats):
+                    connection.execute(queries[name], params).fetchall()
+                timings.append((time.perf_counter() - start) / repeats)
+            connection.close()
+            results[label] = (os.path.getsize(path), timings)
+    print(f"{'':<26} {'TEXT columns':>14} {'encoded':>14} {'change':>8}")
+    sizes = [results[label][0] for label in paths]
+    print(f"{'file size (MB)':<26} {sizes[0] / 2**20:>14.1f} {sizes[1] / 2**20:>14.1f} {sizes[1] / sizes[0] - 1:>+8.0%}")
+    for i, (name, _) in enumerate(ENCODING_BENCHMARK_QUERIES):
+        before, after = (results[label][1][i] for label in paths)
+        print(f"{name + ' (ms)':<26} {before * 1000:>14.1f} {after * 1000:>14.1f} {after / before - 1:>+8.0%}")
+
+
+class SchemaMigrator:
+    """Applies MIGRATIONS in order, recording progress in schema_version so backfills resume where they stopped"""
+
+    def __init__(self, connection, migrations=MIGRATIONS):
+        self.connection = connection
+        self.migrations = migrations
+
+    def states(self):
+        """{version: (state, backfill cursor)}; empty until apply_schema first creates schema_version"""
+        if not self.connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'").fetchone():
+            return {}
+        return {version: (state, cursor) for version, state, cursor in
+                self.connection.execute("SELECT version, state, backfill_cursor FROM schema_version")}
+
+    def current_version(self):
+        return max((version for version, (state, _) in self.states().items() if state == 'done'), default=0)
+
+    def pending(self):
+        states = self.states()
+        return [m for m in self.migrations if states.get(m.version, (None,))[0] != 'done']
+
+    def apply_schema(self):
+        """Run the (fast) DDL of every new migration and queue its backfill and indexes"""
+        self.connection.execute(SCHEMA_VERSION_SQL)
+        self.connection.commit()
+        states = self.states()
+        for migration in self.migrations:
+            if migration.version in states:
+                continue
+            try:
+                self.connection.execute("BEGIN")
+                for statement in migration.schema:
+                    self.connection.execute(statement)
+                self.connection.execute("INSERT INTO schema_version (version, description, state) VALUES (?, ?, ?)",
+                                        (migration.version, migration.description, 'backfill' if migration.backfill else 'indexes'))
+                self.connection.commit()
+            except sqlite3.Error:
+                self.connection.rollback()
+                raise
+
+    def run_pending(self, batch_size=MIGRATION_BATCH_SIZE, progress=None, should_stop=None, defer_finalize=False):
+        """Backfill in committed batches, then build indexes; returns False if stopped early (resumable).
+        With defer_finalize, stop before a migration's final swap and leave it in state 'finalize' for finalize_ready"""
+        self.apply_schema()
+        for migration in self.pending():
+            state, last_id = self.states()[migration.version]
+            if state == 'backfill':
+                select_sql, apply = migration.backfill
+                done = 0
+                while True:
+                    if should_stop and should_stop():
+                        return False
+                    rows = self.connection.execute(select_sql, (last_id, batch_size)).fetchall()
+                    cursor = self.connection.cursor()
+                    if rows:
+                        apply(cursor, rows)
+                        last_id = rows[-1][0]
+                        done += len(rows)
+                    cursor.execute("UPDATE schema_version SET backfill_cursor=?, state=? WHERE version=?",
+                                   (last_id, 'backfill' if rows else 'indexes', migration.version))
+                    self.connection.commit()
+                    if progress and rows:
+                        progress(migration, done)
+                    if not rows:
+                        break
+            for name, table, columns in migration.indexes:
+                self.connection.execute(migration.index_sql(name, table, columns))
+            if migration.finalize and defer_finalize:
+                self.connection.execute("UPDATE schema_version SET state='finalize' WHERE version=?", (migration.version,))
+                self.connection.commit()
+                return False
+            self.finish(migration)
+        return True
+
+    def finalize_ready(self):
+        """Run the final swap of each leading pending migration whose backfill and indexes are done; returns the count"""
+        finished = 0
+        states = self.states()
+        for migration in self.pending():
+            if states[migration.version][0] != 'finalize':
+                break
+            self.finish(migration)
+            finished += 1
+        return finished
+
+    def finish(self, migration):
+        """The migration's finalize statements and its 'done' mark, as one transaction"""
+        try:
+            self.connection.execute("BEGIN")
+            for statement in migration.finalize:
+                self.connection.execute(statement)
+            self.connection.execute("UPDATE schema_version SET state='done', completed_at=CURRENT_TIMESTAMP WHERE version=?",
+                                    (migration.version,))
+            self.connection.commit()
+        except sqlite3.Error:
+            self.connection.rollback()
+            raise
+
+    def estimate(self, batch_size=MIGRATION_BATCH_SIZE):
+        """Dry run: time one backfill batch and a sampled index build per pending migration, extrapolate, then
+        roll everything back; each migration sees the DDL of the ones before it"""
+        states = self.states()
+        estimates = []
+        try:
+            self.connection.execute("BEGIN")
+            for migration in self.pending():
+                last_id = states.get(migration.version, (None, 0))[1] or 0
+                remaining = self.connection.execute("SELECT COUNT(*) FROM employees WHERE emp_id > ?", (last_id,)).fetchone()[0]
+                backfill_seconds = index_seconds = 0.0
+                for statement in migration.schema:
+                    self.connection.execute(statement)
+                if migration.backfill and remaining:
+                    select_sql, apply = migration.backfill
+                    start = time.perf_counter()
+                    rows = self.connection.execute(select_sql, (last_id, batch_size)).fetchall()
+                    apply(self.connection.cursor(), rows)
+                    backfill_seconds = (time.perf_counter() - start) * remaining / max(len(rows), 1)
+                for name, table, columns in migration.indexes:
+                    total = self.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                    sample_table = f"migration_sample_{name}"
+                    self.connection.execute(f"CREATE TEMP TABLE {sample_table} AS SELECT {', '.join(columns)} FROM {table} LIMIT ?",
+                                            (MIGRATION_SAMPLE_ROWS,))
+                    sample = max(min(total, MIGRATION_SAMPLE_ROWS), 2)
+                    start = time.perf_counter()
+                    self.connection.execute(migration.index_sql(f"temp.{name}", sample_table, columns))
+                    elapsed = time.perf_counter() - start
+                    # Index builds sort, so scale by n log n from the sample
+                    index_seconds += elapsed * (total / sample) * (np.log2(max(total, 2)) / np.log2(sample)) if total > sample else elapsed
+                    self.connection.execute(f"DROP TABLE temp.{sample_table}")
+                estimates.append((migration.version, migration.description, remaining if migration.backfill else 0,
+                                  backfill_seconds, float(index_seconds)))
+        finally:
+            self.connection.rollback()
+        return estimates
+
+
+def connect_current_schema(db_path, profile='write_heavy'):
+    """connect_database with every migration's DDL applied, for entry points that may open a database the GUI never has"""
+    connection = connect_database(db_path, profile)
+    try:
+        SchemaMigrator(connection).apply_schema()
+    except sqlite3.Error:
+        connection.close()
+        raise
+    return connection
+
+
+# --- Columnar Snapshots ---
+
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_MANIFEST = "manifest.json"
+SNAPSHOT_CHUNK_ROWS = 50000
+SNAPSHOT_INT_NULL = int(np.iinfo(np.int64).min)   # NULL marker in 'int' columns
+
+# table: (source query, {column: kind}). 'category' columns hold int32 codes into the manifest's category list and
+# 'text' columns a UTF-8 byte buffer plus int64 offsets, so every file memory-maps without unpickling
+SNAPSHOT_TABLES = {
+    'employees': (f"{EMPLOYEE_SELECT} ORDER BY emp_id", dict(zip(EMPLOYEE_COLUMNS, (
+        'int', 'text', 'int', 'category', 'category', 'float', 'date', 'text', 'text', 'text', 'float', 'text', 'int',
+        'category', 'date', 'text', 'text')))),
+    'reviews': ("SELECT review_id, emp_id, review_date, rating, feedback, goals, reviewer FROM performance_reviews "
+                "ORDER BY review_id",
+                {'review_id': 'int', 'emp_id': 'int', 'review_date': 'date', 'rating': 'float', 'feedback': 'text',
+                 'goals': 'text', 'reviewer': 'text'}),
+    'anomalies': ("SELECT emp_id, score, reason FROM employee_anomalies ORDER BY emp_id",
+                  {'emp_id': 'int', 'score': 'float', 'reason': 'text'}),
+    'cohort_rollup': ("SELECT cohort, month_offset, active, on_leave, terminated, inactive, rating_sum FROM cohort_rollup",
+                      {'cohort': 'category', 'month_offset': 'int', 'active': 'int', 'on_leave': 'int',
+                       'terminated': 'int', 'inactive': 'int', 'rating_sum': 'float'}),
+}
+# Registry results stored in the manifest; the dashboard, analytics and insights views read these as-is
+SNAPSHOT_AGGREGATES = ('count_employees', 'avg_salary', 'avg_rating', 'top_department', 'department_counts',
+                       'department_avg_salary', 'department_performance', 'department_salary_totals',
+                       'salary_totals', 'monthly_performance')
+# GUI actions that work from a snapshot; the others need the live database and are disabled
+SNAPSHOT_COMMANDS = {'clear_enhanced_form', 'get_ai_suggestions', 'export_to_csv', 'generate_ai_insights',
+                     'predict_turnover', 'performance_forecast'}
+
+
+def snapshot_dates(values):
+    """datetime64[D] array from ISO date strings; NULL and unparseable dates become NaT"""
+    strings = [str(value)[:10] if value else 'NaT' for value in values]
+    try:
+        return np.array(strings, dtype='datetime64[D]')
+    except ValueError:
+        dates = []
+        for string in strings:
+            try:
+                dates.append(np.datetime64(string, 'D'))
+            except ValueError:
+                dates.append(np.datetime64('NaT'))
+        return np.array(dates, dtype='datetime64[D]')
+
+
+class SnapshotColumnWriter:
+    """Streams one column into .npy files sized up front, so a snapshot never holds a whole table in memory"""
+
+    DTYPES = {'int': np.int64, 'float': np.float64, 'date': 'datetime64[D]', 'category': np.int32}
+
+    def __init__(self, directory, table, column, kind, rows):
+        self.kind = kind
+        self.stem = os.path.join(directory, f"{table}.{column}")
+        self.position = 0
+        self.categories = {}
+        if kind == 'text':
+            self.offsets = np.lib.format.open_memmap(f"{self.stem}.offsets.npy", mode='w+', dtype=np.int64, shape=(rows + 1,))
+            self.buffer = open(f"{self.stem}.bytes", 'wb')
+        else:
+            self.values = np.lib.format.open_memmap(f"{self.stem}.npy", mode='w+', dtype=self.DTYPES[kind], shape=(rows,))
+
+    def append(self, values):
+        end = self.position + len(values)
+        if self.kind == 'text':
+            encoded = [b'' if value is None else str(value).encode('utf-8') for value in values]
+            self.buffer.write(b''.join(encoded))
+            self.offsets[self.position + 1:end + 1] = self.offsets[self.position] + np.cumsum([len(e) for e in encoded])
+        elif self.kind == 'category':
+            self.values[self.position:end] = [-1 if value is None else self.categories.setdefault(value, len(self.categories))
+                                              for value in values]
+        elif self.kind == 'date':
+            self.values[self.position:end] = snapshot_dates(values)
+        elif self.kind == 'int':
+            self.values[self.position:end] = [SNAPSHOT_INT_NULL if value is None else int(value) for value in values]
+        else:
+            self.values[self.position:end] = [np.nan if value is None else float(value) for value in values]
+        self.position = end
+
+    def finish(self):
+        """Flush the column's files and return its manifest entry"""
+        entry = {'kind': self.kind}
+        if self.kind == 'text':
+            self.buffer.close()
+            size = os.path.getsize(f"{self.stem}.bytes")
+            data = np.lib.format.open_memmap(f"{self.stem}.npy", mode='w+', dtype=np.uint8, shape=(size,))
+            if size:
+                data[:] = np.fromfile(f"{self.stem}.bytes", dtype=np.uint8)
+            data.flush()
+            os.remove(f"{self.stem}.bytes")
+            self.offsets.flush()
+        else:
+            self.values.flush()
+        if self.kind == 'category':
+            entry['categories'] = list(self.categories)
+        return entry
+
+
+def write_columnar_snapshot(db_path, path, progress=None):
+    """Write employees, reviews, scores, the cohort rollup and registry aggregates from one read transaction"""
+    connection = connect_database(db_path, 'read_heavy')
+    partial = f"{path}.partial"
+    shutil.rmtree(partial, ignore_errors=True)
+    os.makedirs(partial)
+    try:
+        with ReadSnapshot(connection) as snapshot:
+            tables = {}
+            for table, (sql, kinds) in SNAPSHOT_TABLES.items():
+                try:
+                    rows = connection.execute(f"SELECT COUNT(*) FROM ({sql})").fetchone()[0]
+                except sqlite3.OperationalError:
+                    continue  # the migration that adds this table has not run on this database
+                writers = {column: SnapshotColumnWriter(partial, table, column, kind, rows) for column, kind in kinds.items()}
+                cursor = connection.execute(sql)
+                done = 0
+                while True:
+                    chunk = cursor.fetchmany(SNAPSHOT_CHUNK_ROWS)
+                    if not chunk:
+                        break
+                    for writer, values in zip(writers.values(), zip(*chunk)):
+                        writer.append(values)
+                    done += len(chunk)
+                    if progress:
+                        progress(table, done, rows)
+                tables[table] = {'rows': rows, 'columns': {column: writer.finish() for column, writer in writers.items()}}
+            schema_version = SchemaMigrator(connection).current_version()
+            manifest = {
+                'format': SNAPSHOT_FORMAT,
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+                'source': os.path.abspath(db_path),
+                'schema_version': schema_version,
+                'change_id': snapshot.change_id,
+                'tables': tables,
+                'aggregates': {name: [list(row) for row in snapshot.fetchall(name)] for name in SNAPSHOT_AGGREGATES},
+            }
+        with open(os.path.join(partial, SNAPSHOT_MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1)
+    except BaseException:
+        shutil.rmtree(partial, ignore_errors=True)
+        raise
+    finally:
+        connection.close()
+    # Swap the finished bundle in whole, so a reader never opens a half-written one
+    if os.path.exists(path):
+        shutil.rmtree(f"{path}.old", ignore_errors=True)
+        os.replace(path, f"{path}.old")
+        os.replace(partial, path)
+        shutil.rmtree(f"{path}.old", ignore_errors=True)
+    else:
+        os.replace(partial, path)
+    return manifest
+
+
+class ColumnarSnapshot:
+    """Read-only snapshot bundle: columns are memory-mapped on first use and answer the ReadSnapshot queries"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, SNAPSHOT_MANIFEST), encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('format') != SNAPSHOT_FORMAT:
+            raise ValueError(f"unsupported snapshot format {self.manifest.get('format')} (expected {SNAPSHOT_FORMAT})")
+        # The bundle never changes, so one version key serves every cached view
+        self.data_version = self.manifest['created_at']
+        self.change_id = self.manifest['change_id']
+        self.arrays = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+    def rows(self, table):
+        return self.manifest['tables'].get(table, {}).get('rows', 0)
+
+    def array(self, table, column, part=''):
+        key = f"{table}.{column}{part}"
+        if key not in self.arrays:
+            self.arrays[key] = np.load(os.path.join(self.path, f"{key}.npy"), mmap_mode='r')
+        return self.arrays[key]
+
+    def categories(self, column, table='employees'):
+        return self.manifest['tables'][table]['columns'][column]['categories']
+
+    def code(self, column, value, table='employees'):
+        """Category code of a value, or -2 (matching nothing) if the snapshot never saw it"""
+        categories = self.categories(column, table)
+        return categories.index(value) if value in categories else -2
+
+    def values(self, table, column, positions=None):
+        """Python values of a column (all rows, or the given row positions); NULLs read back as None, text as ''"""
+        kind = self.manifest['tables'][table]['columns'][column]['kind']
+        if kind == 'text':
+            offsets = self.array(table, column, '.offsets')
+            data = self.array(table, column)
+            if positions is None:
+                starts, ends = offsets[:-1], offsets[1:]
+            else:
+                starts, ends = offsets[positions], offsets[np.asarray(positions) + 1]
+            # Large reads decode from one copy of the buffer; small ones slice the memory map directly
+            if positions is None or len(positions) > SNAPSHOT_CHUNK_ROWS:
+                blob = data.tobytes()
+                return [blob[start:end].decode('utf-8') for start, end in zip(starts.tolist(), ends.tolist())]
+            return [data[start:end].tobytes().decode('utf-8') for start, end in zip(starts.tolist(), ends.tolist())]
+        array = self.array(table, column) if positions is None else self.array(table, column)[positions]
+        if kind == 'category':
+            names = self.categories(column, table) + [None]  # code -1 indexes the trailing None
+            return [names[code] for code in array.tolist()]
+        if kind == 'date':
+            return [None if value == 'NaT' else value for value in np.datetime_as_string(array).tolist()]
+        if kind == 'int':
+            return [None if value == SNAPSHOT_INT_NULL else value for value in array.tolist()]
+        return [None if value != value else value for value in array.tolist()]
+
+    def employee_rows(self, emp_ids=None, positions=None, columns=EMPLOYEE_COLUMNS):
+        """Employee rows (full by default): all of them, or by emp_id, or by row position"""
+        if emp_ids is not None:
+            ids = self.array('employees', 'emp_id')
+            wanted = np.array(sorted({int(emp_id) for emp_id in emp_ids}), dtype=np.int64)
+            found = np.searchsorted(ids, wanted)
+            found = found[found < len(ids)]
+            positions = found[ids[found] == wanted[:len(found)]]
+        return list(zip(*(self.values('employees', column, positions) for column in columns)))
+
+    def search(self, params, min_score=None):
+        """Directory rows for SEARCH_WHERE parameters (LIKE as a case-insensitive substring), optionally anomalies only"""
+        like, _, _, _, department, _, status, _ = params
+        mask = np.ones(self.rows('employees'), dtype=bool)
+        for column, value in (('department', department), ('status', status)):
+            if value is not None:
+                mask &= self.array('employees', column) == self.code(column, value)
+        if min_score is not None:
+            scores = self.anomaly_scores()
+            mask &= np.isin(self.array('employees', 'emp_id'),
+                            [emp_id for emp_id, score in scores.items() if score >= min_score])
+        positions = None if mask.all() else np.flatnonzero(mask)
+        if like is not None:
+            needle = like.strip('%').lower()
+            candidates = np.arange(len(mask)) if positions is None else positions
+            texts = zip(*(self.values('employees', column, positions) for column in ('name', 'department', 'position')))
+            positions = candidates[np.array([any(needle in (text or '').lower() for text in row) for row in texts], dtype=bool)]
+        return self.employee_rows(positions=positions, columns=DIRECTORY_COLUMNS)
+
+    def anomaly_scores(self):
+        if not self.rows('anomalies'):
+            return {}
+        return dict(zip(self.array('anomalies', 'emp_id').tolist(), self.array('anomalies', 'score').tolist()))
+
+    def cohort_matrix(self, metric):
+        columns = SNAPSHOT_TABLES['cohort_rollup'][1]
+        rows = list(zip(*(self.values('cohort_rollup', column) for column in columns))) if self.rows('cohort_rollup') else []
+        return cohort_matrix(rows, metric)
+
+    # ReadSnapshot protocol
+    def scalar(self, name, params=()):
+        rows = self.fetchall(name, params)
+        return rows[0][0] if rows else None
+
+    def fetchall(self, name, params=()):
+        if name == 'count_by_status':
+            return [(int(np.count_nonzero(self.array('employees', 'status') == self.code('status', params[0]))),)]
+        if name == 'count_joined_since':
+            return [(int(np.count_nonzero(self.array('employees', 'joining_date') >= np.datetime64(params[0], 'D'))),)]
+        if params or name not in self.manifest['aggregates']:
+            raise KeyError(f"{name} is not stored in columnar snapshots")
+        return [tuple(row) for row in self.manifest['aggregates'][name]]
+
+    def column(self, name, params=()):
+        """First column of a registry query as an array; 'salaries' is the memory-mapped salary column itself"""
+        if name != 'salaries':
+            return np.array([row[0] for row in self.fetchall(name, params)])
+        salary = self.array('employees', 'salary')
+        return salary[~np.isnan(salary)] if np.isnan(salary).any() else salary
+
+
+# --- Chart Rendering ---
+
+CHART_RENDER_MODES = ('inline', 'process')
+CHART_WORKERS = 2
+CHART_POLL_MS = 50
+
+
+def draw_department_pie(ax, dept_data):
+    """Department headcount pie from (department, count) rows"""
+    if dept_data:
+        labels, sizes = zip(*dept_data)
+        ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=140, colors=sns.color_palette("pastel"))
+        ax.set_title("Department Distribution", fontsize=14, fontweight='bold')
+    else:
+        ax.text(0.5, 0.5, "No Data", ha='center', va='center')
+
+
+def draw_salary_bars(ax, salary_data):
+    """Average salary bars from (department, average) rows"""
+    if salary_data:
+        depts, avgs = zip(*salary_data)
+        sns.barplot(x=list(depts), y=list(avgs), ax=ax, palette="Blues_d")
+        ax.set_title("Average Salary by Department", fontsize=14, fontweight='bold')
+        ax.set_ylabel("Average Salary ($)")
+        ax.set_xlabel("Department")
+    else:
+        ax.text(0.5, 0.5, "No Data", ha='center', va='center')
+
+
+def draw_salary_histogram(ax, salaries):
+    """Salary histogram with a KDE overlay"""
+    if len(salaries):
+        sns.histplot(salaries, bins=10, kde=True, ax=ax, color="#2563eb")
+        ax.set_title("Salary Distribution")
+        ax.set_xlabel("Salary")
+        ax.set_ylabel("Count")
+    else:
+        ax.text(0.5, 0.5, "No Data", ha='center', va='center')
+
+
+def draw_performance_trend(ax, trend_data):
+    """Monthly average rating line from (month, rating) rows"""
+    if trend_data:
+        months, ratings = zip(*trend_data)
+        ax.plot(months, ratings, marker='o', color="#10b981")
+        ax.set_title("Performance Trends")
+        ax.set_xlabel("Month")
+        ax.set_ylabel("Avg. Performance Rating")
+        ax.tick_params(axis='x', rotation=45)
+    else:
+        ax.text(0.5, 0.5, "No Data", ha='center', va='center')
+
+
+def draw_report_bars(ax, chart):
+    """Titled bar chart from a {'title', 'xlabel', 'ylabel', 'rows'} spec"""
+    if chart['rows']:
+        labels, values = zip(*chart['rows'])
+        ax.bar([str(label) for label in labels], values, color="#2563eb")
+        ax.set_title(chart['title'], fontsize=12, fontweight='bold')
+        ax.set_xlabel(chart['xlabel'])
+        ax.set_ylabel(chart['ylabel'])
+        ax.tick_params(axis='x', rotation=30)
+    else:
+        ax.text(0.5, 0.5, "No Data", ha='center', va='center')
+
+
+def draw_cohort_heatmap(ax, heatmap):
+    """Cohort x months-since-join heatmap from CohortRollup.matrix data"""
+    if heatmap['cohorts']:
+        values = np.ma.masked_invalid(np.array(heatmap['values'], dtype=float))
+        scale = {'Retention %': (0, 100), 'Avg Rating': (1, 5)}.get(heatmap['metric'], (0, None))
+        ax.imshow(values, aspect='auto', cmap='YlGnBu', vmin=scale[0], vmax=scale[1], interpolation='nearest')
+        step = max(1, len(heatmap['cohorts']) // 12)
+        ax.set_yticks(range(0, len(heatmap['cohorts']), step))
+        ax.set_yticklabels(heatmap['cohorts'][::step], fontsize=8)
+        ax.set_title(f"{heatmap['metric']} by Hiring Cohort", fontsize=12, fontweight='bold')
+        ax.set_xlabel("Months since joining")
+        ax.set_ylabel("Hiring month")
+    else:
+        ax.text(0.5, 0.5, "No Data", ha='center', va='center')
+
+
+CHART_DRAWERS = {
+    'department_pie': draw_department_pie,
+    'salary_bars': draw_salary_bars,
+    'salary_histogram': draw_salary_histogram,
+    'performance_trend': draw_performance_trend,
+    'report_bars': draw_report_bars,
+    'cohort_heatmap': draw_cohort_heatmap,
+}
+
+
+def render_chart_image(kind, data, width, height, dpi):
+    """Rasterize one chart with the Agg backend; runs inside a worker process"""
+    figure = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+    canvas = FigureCanvasAgg(figure)
+    CHART_DRAWERS[kind](figure.add_subplot(), data)
+    figure.tight_layout()
+    canvas.draw()
+    return canvas.get_width_height(), bytes(canvas.buffer_rgba())
+
+
+class ChartRenderer:
+    """Renders charts in worker processes and hands finished images back on the Tk thread"""
+
+    def __init__(self, root, workers=CHART_WORKERS):
+        self.root = root
+        self.workers = workers
+        self.executor = None
+        self.pending = {}   # slot -> (signature, future, callback, on_error); only the newest request per slot
+        self.applied = {}   # slot -> signature of the image currently on screen
+        self.polling = False
+
+    def request(self, slot, kind, data, size, dpi, callback, on_error=None):
+        """Queue a render unless the same chart is already shown or in flight; returns True if queued.
+        callback gets the finished image and on_error the exception of a failed render, both on the Tk thread"""
+        signature = hashlib.blake2b(repr((kind, data, size, dpi)).encode(), digest_size=16).digest()
+        current = self.pending.get(slot)
+        if current and current[0] == signature:
+            return False
+        if current:
+            # Newer data supersedes the render in flight; its result is dropped if it still finishes
+            current[1].cancel()
+            del self.pending[slot]
+        if self.applied.get(slot) == signature:
+            return False
+        if self.executor is None:
+            # Spawned workers never inherit the Tk interpreter or the GUI backend
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+        future = self.executor.submit(render_chart_image, kind, data, size[0], size[1], dpi)
+        self.pending[slot] = (signature, future, callback, on_error)
+        if not self.polling:
+            self.polling = True
+            self.root.after(CHART_POLL_MS, self.poll)
+        return True
+
+    def poll(self):
+        """Deliver finished renders; stale futures are no longer in pending and never arrive"""
+        for slot, (signature, future, callback, on_error) in list(self.pending.items()):
+            if not future.done():
+                continue
+            del self.pending[slot]
+            if future.cancelled():
+                continue
+            try:
+                (width, height), pixels = future.result()
+            except Exception as e:
+                if on_error:
+                    on_error(e)
+                continue
+            self.applied[slot] = signature
+            callback(Image.frombuffer('RGBA', (width, height), pixels, 'raw', 'RGBA', 0, 1))
+        if self.pending:
+            self.root.after(CHART_POLL_MS, self.poll)
+        else:
+            self.polling = False
+
+    def reset(self):
+        """Forget shown and in-flight renders so every slot draws again"""
+        for signature, future, *_ in self.pending.values():
+            future.cancel()
+        self.pending.clear()
+        self.applied.clear()
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+# --- Change Events ---
+
+class EventBus:
+    """Synchronous publish/subscribe for change notifications between views"""
+
+    def __init__(self):
+        self.subscribers = {}
+
+    def subscribe(self, topic, handler):
+        self.subscribers.setdefault(topic, []).append(handler)
+
+    def publish(self, topic, **event):
+        """Deliver an event dict (with its topic) to every subscriber of the topic"""
+        event['topic'] = topic
+        for handler in self.subscribers.get(topic, ()):
+            handler(event)
+
+
+class RefreshScheduler:
+    """Coalesces change events into one refresh per frame for the visible view; hidden views refresh on show"""
+
+    FRAME_MS = 16
+
+    def __init__(self, root, bus):
+        self.root = root
+        self.bus = bus
+        self.views = {}     # view -> refresh(events)
+        self.events = {}    # view -> events received since its last refresh
+        self.stale = set()  # views that must refresh on show even without events
+        self.visible = None
+        self.job = None
+
+    def register(self, view, refresh, topics, stale=False):
+        self.views[view] = refresh
+        self.events[view] = []
+        if stale:
+            self.stale.add(view)
+        for topic in topics:
+            self.bus.subscribe(topic, lambda event, v=view: self.notify(v, event))
+
+    def notify(self, view, event):
+        self.events[view].append(event)
+        if view == self.visible and self.job is None:
+            self.job = self.root.after(self.FRAME_MS, self.flush)
+
+    def show(self, view):
+        """Make a view current, refreshing it first if changes arrived while it was hidden"""
+        self.visible = view
+        if view in self.views and (self.events[view] or view in self.stale):
+            self.refresh(view)
+
+    def flush(self):
+        self.job = None
+        if self.visible in self.views and self.events[self.visible]:
+            self.refresh(self.visible)
+
+    def refresh(self, view):
+        events, self.events[view] = self.events[view], []
+        self.stale.discard(view)
+        self.views[view](events)
+
+
+CHANGE_POLL_MS = 1000
+CHANGE_PRUNE_STEP = 10000   # journal rows a running session accumulates between trims
+
+
+class ChangeWatcher:
+    """Detects commits by other connections with PRAGMA data_version and reads them from the change journal"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.data_version = self.current_version()
+        self.last_change_id = self.latest_change_id()
+        self.pruned_at = self.last_change_id
+
+    def current_version(self):
+        # data_version only moves when a different connection commits
+        return self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def latest_change_id(self):
+        return self.connection.execute("SELECT COALESCE(MAX(change_id), 0) FROM employee_changes").fetchone()[0]
+
+    def poll(self):
+        """Journal rows (change_id, emp_id, action, old segment...) committed elsewhere since the last poll"""
+        version = self.current_version()
+        if version == self.data_version:
+            return []
+        self.data_version = version
+        rows = self.connection.execute('''
+            SELECT change_id, emp_id, action, old_department, old_position, old_joining_date
+            FROM employee_changes WHERE change_id > ? ORDER BY change_id
+        ''', (self.last_change_id,)).fetchall()
+        if rows:
+            self.last_change_id = rows[-1][0]
+        return rows
+
+    def acknowledge_local(self):
+        """Skip our own journal rows, unless another connection has committed since the last poll"""
+        if self.current_version() == self.data_version:
+            self.last_change_id = self.latest_change_id()
+
+    def prune(self):
+        """Trim the journal to CHANGE_JOURNAL_RETENTION rows once CHANGE_PRUNE_STEP more arrived; returns rows deleted"""
+        if self.last_change_id - self.pruned_at < CHANGE_PRUNE_STEP or self.connection.in_transaction:
+            return 0
+        try:
+            deleted = self.connection.execute(QUERIES['prune_change_journal'], (CHANGE_JOURNAL_RETENTION,)).rowcount
+            self.connection.commit()
+        except sqlite3.Error:
+            self.connection.rollback()
+            raise
+        self.pruned_at = self.last_change_id
+        return deleted
+
+
+# --- Reporting ---
+
+REPORT_FORMATS = ('html', 'pdf', 'xlsx')
+REPORT_CHUNK_SIZE = 2000
+REPORT_WORKERS = 2
+REPORT_TABLE_ROWS_PER_PAGE = 28
+
+
+class ReportCancelled(Exception):
+    pass
+
+
+class HeadcountReport:
+    """Headcount by department, status and hiring year"""
+
+    TITLE = "Headcount Report"
+    QUERY = "SELECT department, status, joining_date FROM employees"
+
+    def __init__(self):
+        self.by_department = Counter()
+        self.by_status = Counter()
+        self.by_year = Counter()
+
+    def add(self, row):
+        department, status, joining_date = row
+        self.by_department[department or 'Unassigned'] += 1
+        self.by_status[status or 'Unknown'] += 1
+        self.by_year[str(joining_date or '')[:4] or 'Unknown'] += 1
+
+    def sections(self):
+        total = sum(self.by_department.values())
+        return [
+            {'title': "Headcount by Department", 'columns': ['Department', 'Employees', 'Share'],
+             'rows': [(dept, count, f"{count / total:.1%}") for dept, count in self.by_department.most_common()],
+             'chart': ('department_pie', sorted(self.by_department.items()))},
+            {'title': "Headcount by Status", 'columns': ['Status', 'Employees'],
+             'rows': self.by_status.most_common(), 'chart': None},
+            {'title': "Hires by Year", 'columns': ['Year', 'Hires'], 'rows': sorted(self.by_year.items()),
+             'chart': ('report_bars', {'title': "Hires by Year", 'xlabel': "Year", 'ylabel': "Hires",
+                                       'rows': sorted(self.by_year.items())})},
+        ]
+
+
+class CompensationReport:
+    """Salary bands per department, position and tenure from streamed quantile sketches"""
+
+    TITLE = "Compensation by Band"
+    QUERY = "SELECT department, position, joining_date, salary FROM employees WHERE salary IS NOT NULL"
+
+    def __init__(self):
+        self.bands = SalaryBandEngine()
+
+    def add(self, row):
+        self.bands.add(*row)
+
+    def band_section(self, dimension, label):
+        bands = self.bands.bands(dimension)
+        counts = {value: sketch.n for (dim, value), sketch in self.bands.sketches.items() if dim == dimension}
+        rows = [(value, counts[value], *(f"${band[p]:,.0f}" for p in SalaryBandEngine.PERCENTILES))
+                for value, band in bands.items()]
+        return {'title': f"Salary Bands by {label}",
+                'columns': [label, 'Employees'] + [f"P{p}" for p in SalaryBandEngine.PERCENTILES],
+                'rows': rows,
+                'chart': ('report_bars', {'title': f"Median Salary by {label}", 'xlabel': label, 'ylabel': "Median Salary ($)",
+                                          'rows': [(value, band[50]) for value, band in bands.items()]})}
+
+    def sections(self):
+        return [self.band_section('department', 'Department'), self.band_section('position', 'Position'),
+                self.band_section('tenure', 'Tenure')]
+
+
+class PerformanceReport:
+    """Performance rating distribution overall and per department"""
+
+    TITLE = "Performance Distribution"
+    QUERY = "SELECT department, performance_rating FROM employees"
+    BUCKETS = ('<2', '2-3', '3-4', '4-4.5', '4.5+')
+
+    def __init__(self):
+        self.distribution = Counter()
+        self.department_totals = {}
+
+    @classmethod
+    def bucket(cls, rating):
+        for limit, label in zip((2, 3, 4, 4.5), cls.BUCKETS):
+            if rating < limit:
+                return label
+        return cls.BUCKETS[-1]
+
+    def add(self, row):
+        department, rating = row
+        if rating is None:
+            return
+        self.distribution[self.bucket(rating)] += 1
+        totals = self.department_totals.setdefault(department or 'Unassigned', [0, 0.0, 0])
+        totals[0] += 1
+        totals[1] += rating
+        totals[2] += rating >= 4
+
+    def sections(self):
+        rated = sum(self.distribution.values())
+        distribution = [(label, self.distribution[label]) for label in self.BUCKETS]
+        return [
+            {'title': "Rating Distribution", 'columns': ['Rating', 'Employees', 'Share'],
+             'rows': [(label, count, f"{count / rated:.1%}" if rated else "-") for label, count in distribution],
+             'chart': ('report_bars', {'title': "Rating Distribution", 'xlabel': "Rating", 'ylabel': "Employees",
+                                       'rows': distribution})},
+            {'title': "Performance by Department", 'columns': ['Department', 'Rated', 'Average', 'Rated 4+'],
+             'rows': [(dept, n, f"{total / n:.2f}", f"{high / n:.1%}")
+                      for dept, (n, total, high) in sorted(self.department_totals.items())],
+             'chart': None},
+        ]
+
+
+class AttritionReport:
+    """Terminated share of headcount per department and tenure"""
+
+    TITLE = "Attrition Report"
+    QUERY = "SELECT department, joining_date, status FROM employees"
+
+    def __init__(self):
+        self.by_department = {}
+        self.by_tenure = {}
+
+    def add(self, row):
+        department, joining_date, status = row
+        left = status == 'Terminated'
+        for table, key in ((self.by_department, department or 'Unassigned'), (self.by_tenure, tenure_bucket(joining_date))):
+            counts = table.setdefault(key, [0, 0])
+            counts[0] += 1
+            counts[1] += left
+
+    @staticmethod
+    def rate_rows(table):
+        return [(key, total, left, f"{left / total:.1%}") for key, (total, left) in sorted(table.items())]
+
+    def sections(self):
+        return [
+            {'title': "Attrition by Department", 'columns': ['Department', 'Headcount', 'Terminated', 'Attrition'],
+             'rows': self.rate_rows(self.by_department),
+             'chart': ('report_bars', {'title': "Attrition Rate by Department", 'xlabel': "Department", 'ylabel': "Attrition (%)",
+                                       'rows': [(key, 100 * left / total) for key, (total, left) in sorted(self.by_department.items())]})},
+            {'title': "Attrition by Tenure", 'columns': ['Tenure', 'Headcount', 'Terminated', 'Attrition'],
+             'rows': self.rate_rows(self.by_tenure), 'chart': None},
+        ]
+
+
+REPORT_TEMPLATES = {
+    'headcount': HeadcountReport,
+    'compensation': CompensationReport,
+    'performance': PerformanceReport,
+    'attrition': AttritionReport,
+}
+
+
+def collect_report(db_path, template, progress=None, cancelled=None):
+    """Stream the template's rows from the database in chunks and return its title and sections"""
+    report = REPORT_TEMPLATES[template]()
+    connection = connect_database(db_path, 'read_heavy')
+    try:
+        total = connection.execute(QUERIES['count_employees']).fetchone()[0] or 0
+        cursor = connection.execute(report.QUERY)
+        done = 0
+        while True:
+            chunk = cursor.fetchmany(REPORT_CHUNK_SIZE)
+            if not chunk:
+                break
+            for row in chunk:
+                report.add(row)
+            done += len(chunk)
+            if progress:
+                progress(done, total)
+            if cancelled and cancelled():
+                raise ReportCancelled(template)
+    finally:
+        connection.close()
+    return report.TITLE, report.sections()
+
+
+def chart_png(chart, width=800, height=420, dpi=100):
+    """PNG bytes for a (kind, data) chart spec"""
+    (w, h), pixels = render_chart_image(chart[0], chart[1], width, height, dpi)
+    buffer = io.BytesIO()
+    Image.frombuffer('RGBA', (w, h), pixels, 'raw', 'RGBA', 0, 1).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def write_html_report(path, title, sections):
+    generated = datetime.now().strftime('%Y-%m-%d %H:%M')
+    parts = [f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{html.escape(title)}</title>",
+             "<style>body{font-family:'Segoe UI',sans-serif;margin:40px;color:#1e293b}"
+             "table{border-collapse:collapse;margin:12px 0}th,td{border:1px solid #cbd5e1;padding:6px 12px;text-align:left}"
+             "th{background:#2563eb;color:#fff}img{max-width:100%}</style></head><body>",
+             f"<h1>{html.escape(title)}</h1><p>Generated {generated}</p>"]
+    for section in sections:
+        parts.append(f"<h2>{html.escape(section['title'])}</h2><table><tr>")
+        parts.extend(f"<th>{html.escape(str(col))}</th>" for col in section['columns'])
+        parts.append("</tr>")
+        for row in section['rows']:
+            parts.append("<tr>" + "".join(f"<td>{html.escape(str(value))}</td>" for value in row) + "</tr>")
+        parts.append("</table>")
+        if section['chart']:
+            encoded = base64.b64encode(chart_png(section['chart'])).decode('ascii')
+            parts.append(f"<img src='data:image/png;base64,{encoded}' alt='{html.escape(section['title'])}'>")
+    parts.append("</body></html>")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("".join(parts))
+
+
+def write_pdf_report(path, title, sections):
+    """One or more A4 pages per section: a table page split as needed, then the chart"""
+    with PdfPages(path) as pdf:
+        for section in sections:
+            rows = section['rows'] or [("No data",) + ("",) * (len(section['columns']) - 1)]
+            for start in range(0, len(rows), REPORT_TABLE_ROWS_PER_PAGE):
+                figure = Figure(figsize=(8.27, 11.69))
+                FigureCanvasAgg(figure)
+                figure.suptitle(f"{title}\n{section['title']}", fontsize=14, fontweight='bold')
+                ax = figure.add_subplot()
+                ax.set_axis_off()
+                table = ax.table(cellText=[[str(value) for value in row] for row in rows[start:start + REPORT_TABLE_ROWS_PER_PAGE]],
+                                 colLabels=section['columns'], loc='upper center')
+                table.auto_set_font_size(False)
+                table.set_fontsize(9)
+                table.scale(1, 1.4)
+                pdf.savefig(figure)
+            if section['chart']:
+                figure = Figure(figsize=(8.27, 5.5))
+                FigureCanvasAgg(figure)
+                CHART_DRAWERS[section['chart'][0]](figure.add_subplot(), section['chart'][1])
+                figure.tight_layout()
+                pdf.savefig(figure)
+
+
+def write_xlsx_report(path, title, sections):
+    """One sheet per section with its chart placed beside the table (needs openpyxl)"""
+    try:
+        from openpyxl.drawing.image import Image as SheetImage
+    except ImportError:
+        raise RuntimeError("XLSX reports need the openpyxl package (pip install openpyxl)")
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        for section in sections:
+            sheet_name = re.sub(r'[\[\]:*?/\\]', '', section['title'])[:31]
+            pd.DataFrame(section['rows'], columns=section['columns']).to_excel(writer, sheet_name=sheet_name, index=False, startrow=2)
+            sheet = writer.sheets[sheet_name]
+            sheet['A1'] = f"{title} - {section['title']}"
+            if section['chart']:
+                sheet.add_image(SheetImage(io.BytesIO(chart_png(section['chart']))), f"{chr(ord('A') + len(section['columns']) + 1)}3")
+
+
+REPORT_WRITERS = {
+    'html': write_html_report,
+    'pdf': write_pdf_report,
+    'xlsx': write_xlsx_report,
+}
+
+
+def run_report_job(job_id, db_path, template, fmt, output_path, progress_queue=None, cancel_event=None):
+    """Worker-process entry point: collect, render and write one report, reporting progress on the queue"""
+    def progress(done, total):
+        if progress_queue is not None:
+            progress_queue.put((job_id, done, total))
+
+    def cancelled():
+        return cancel_event is not None and cancel_event.is_set()
+
+    title, sections = collect_report(db_path, template, progress, cancelled)
+    if cancelled():
+        raise ReportCancelled(template)
+    try:
+        REPORT_WRITERS[fmt](output_path, title, sections)
+    except BaseException:
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        raise
+    return output_path
+
+
+class ReportRunner:
+    """Runs report jobs concurrently in worker processes with shared progress and cancel signals"""
+
+    def __init__(self, workers=REPORT_WORKERS):
+        context = multiprocessing.get_context('spawn')
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        self.manager = context.Manager()
+        self.progress_queue = self.manager.Queue()
+        self.jobs = {}  # job_id -> (future, cancel_event)
+        self.job_ids = itertools.count(1)
+
+    def submit(self, db_path, template, fmt, output_path):
+        job_id = next(self.job_ids)
+        cancel_event = self.manager.Event()
+        future = self.executor.submit(run_report_job, job_id, db_path, template, fmt, output_path,
+                                      self.progress_queue, cancel_event)
+        self.jobs[job_id] = (future, cancel_event)
+        return job_id
+
+    def cancel(self, job_id):
+        future, cancel_event = self.jobs[job_id]
+        if not future.cancel():
+            cancel_event.set()
+
+    def drain_progress(self):
+        """Latest (done, total) per job since the last call"""
+        latest = {}
+        while True:
+            try:
+                job_id, done, total = self.progress_queue.get_nowait()
+            except queue.Empty:
+                return latest
+            latest[job_id] = (done, total)
+
+    def shutdown(self):
+        for future, cancel_event in self.jobs.values():
+            if not future.done():
+                cancel_event.set()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.manager.shutdown()
+
+
+# --- Workforce Projection ---
+
+PROJECTION_DEFAULTS = {
+    'months': 24,
+    'trials': 5000,
+    'hires_per_month': 2.0,
+    'annual_raise_pct': 3.0,
+    'promotion_raise_pct': 10.0,
+    'attrition_multiplier': 1.0,
+    'seed': 2024,
+}
+PROJECTION_PERCENTILES = (5, 25, 50, 75, 95)
+PROJECTION_PRIOR_YEARS = 5.0        # person-years of company-wide experience blended into each segment's rates
+PROJECTION_PROMOTION_WINDOW = 3     # years of last_promotion history used for promotion rates
+PROJECTION_INLINE_WORK = 2_000_000  # trials * segments * months below which the pool is not worth starting
+PROJECTION_CACHE_SIZE = 16
+
+
+def projection_inputs(cursor, today=None):
+    """Per-department headcount, payroll and annual attrition/promotion rates derived from the employee table"""
+    today = today or datetime.now()
+    # Leavers stop accruing exposure at their dated termination in employee_status_history
+    cursor.execute('''
+        SELECT e.department, e.salary, e.joining_date, e.status, e.last_promotion, t.left_at
+        FROM employees e
+        LEFT JOIN (SELECT emp_id, MAX(changed_at) AS left_at FROM employee_status_history
+                   WHERE status = 'Terminated' GROUP BY emp_id) t ON t.emp_id = e.emp_id
+    ''')
+    frame = pd.DataFrame(cursor.fetchall(),
+                         columns=['department', 'salary', 'joining_date', 'status', 'last_promotion', 'left_at'])
+    frame['department'] = frame['department'].fillna('Unassigned')
+    frame['salary'] = pd.to_numeric(frame['salary'], errors='coerce').fillna(0.0)
+    frame['left'] = frame['status'] == 'Terminated'
+    joined = pd.to_datetime(frame['joining_date'], errors='coerce')
+    left_at = pd.to_datetime(frame['left_at'], errors='coerce').where(frame['left'])
+    until = left_at.fillna(pd.Timestamp(today)).clip(upper=pd.Timestamp(today))
+    frame['exposure'] = ((until - joined).dt.days / 365.25).clip(lower=1 / 12).fillna(1.0)
+    promoted = pd.to_datetime(frame['last_promotion'], errors='coerce')
+    frame['promoted'] = (today - promoted).dt.days <= 365.25 * PROJECTION_PROMOTION_WINDOW
+    frame['promotion_exposure'] = frame['exposure'].clip(upper=PROJECTION_PROMOTION_WINDOW)
+
+    # Rates per person-year, shrunk towards the company rate so small departments stay sensible
+    company_attrition = frame['left'].sum() / max(frame['exposure'].sum(), 1e-9)
+    company_promotion = frame['promoted'].sum() / max(frame['promotion_exposure'].sum(), 1e-9)
+    active = frame[~frame['left']]
+    segments = sorted(frame['department'].unique())
+    grouped = frame.groupby('department')
+    active_grouped = active.groupby('department')
+    counts = active_grouped.size().reindex(segments, fill_value=0)
+    payroll = active_grouped['salary'].sum().reindex(segments, fill_value=0.0)
+    means = active_grouped['salary'].mean().reindex(segments)
+    cv = (active_grouped['salary'].std() / means).reindex(segments).fillna(0.0)
+    medians = grouped['salary'].median().reindex(segments).fillna(frame['salary'].median() if len(frame) else 0.0)
+    attrition = ((grouped['left'].sum() + company_attrition * PROJECTION_PRIOR_YEARS)
+                 / (grouped['exposure'].sum() + PROJECTION_PRIOR_YEARS)).reindex(segments)
+    promotion = ((grouped['promoted'].sum() + company_promotion * PROJECTION_PRIOR_YEARS)
+                 / (grouped['promotion_exposure'].sum() + PROJECTION_PRIOR_YEARS)).reindex(segments)
+    total = counts.sum()
+    return {
+        'segments': segments,
+        'counts': counts.to_numpy(dtype=np.int64),
+        'payroll': payroll.to_numpy(dtype=float),
+        'salary_cv': cv.to_numpy(dtype=float),
+        'hire_salary': medians.to_numpy(dtype=float),
+        'hire_share': (counts / total).to_numpy(dtype=float) if total else np.full(len(segments), 1 / max(len(segments), 1)),
+        'attrition': attrition.to_numpy(dtype=float),
+        'promotion': promotion.to_numpy(dtype=float),
+    }
+
+
+def simulate_workforce(inputs, scenario, trials, seed):
+    """Monthly headcount and annual payroll run-rate paths, shape (trials, months + 1), vectorized over trials and segments"""
+    rng = np.random.default_rng(seed)
+    months = scenario['months']
+    counts = np.tile(inputs['counts'], (trials, 1))
+    payroll = np.tile(inputs['payroll'], (trials, 1))
+    p_leave = 1 - (1 - np.minimum(inputs['attrition'] * scenario['attrition_multiplier'], 0.99)) ** (1 / 12)
+    p_promote = 1 - (1 - np.minimum(inputs['promotion'], 0.99)) ** (1 / 12)
+    hire_rate = scenario['hires_per_month'] * inputs['hire_share']
+    promotion_raise = scenario['promotion_raise_pct'] / 100
+    headcount = np.empty((trials, months + 1))
+    run_rate = np.empty((trials, months + 1))
+    headcount[:, 0] = counts.sum(axis=1)
+    run_rate[:, 0] = payroll.sum(axis=1)
+    for month in range(1, months + 1):
+        # Leavers take the segment's mean salary, with CLT noise for who exactly leaves
+        leavers = rng.binomial(counts, p_leave)
+        mean = np.divide(payroll, counts, out=np.zeros_like(payroll), where=counts > 0)
+        loss = leavers * mean + np.sqrt(leavers) * mean * inputs['salary_cv'] * rng.standard_normal(counts.shape)
+        payroll = payroll - np.clip(loss, 0, payroll)
+        counts = counts - leavers
+        mean = np.divide(payroll, counts, out=np.zeros_like(payroll), where=counts > 0)
+        payroll = payroll + rng.binomial(counts, p_promote) * mean * promotion_raise
+        hires = rng.poisson(hire_rate, size=counts.shape)
+        counts = counts + hires
+        payroll = payroll + hires * inputs['hire_salary']
+        if month % 12 == 0:
+            payroll = payroll * (1 + scenario['annual_raise_pct'] / 100)
+        headcount[:, month] = counts.sum(axis=1)
+        run_rate[:, month] = payroll.sum(axis=1)
+    return headcount, run_rate
+
+
+class WorkforceProjection:
+    """Monte Carlo headcount and payroll projection with per-scenario result caching"""
+
+    def __init__(self, workers=None):
+        self.workers = workers or min(os.cpu_count() or 1, 4)
+        self.executor = None
+        self.cache = OrderedDict()
+        # Guards the cache and the executor; projections run on worker threads, possibly several at once
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def cache_key(inputs, scenario):
+        digest = hashlib.blake2b(repr(sorted(scenario.items())).encode(), digest_size=16)
+        for name in ('counts', 'payroll', 'salary_cv', 'hire_salary', 'hire_share', 'attrition', 'promotion'):
+            digest.update(np.ascontiguousarray(inputs[name]).tobytes())
+        return digest.hexdigest()
+
+    def project(self, inputs, scenario):
+        """Percentile bands per month for headcount, payroll run-rate and cumulative payroll cost"""
+        scenario = {**PROJECTION_DEFAULTS, **scenario}
+        key = self.cache_key(inputs, scenario)
+        trials = scenario['trials']
+        chunks = 1 if trials * len(inputs['segments']) * scenario['months'] < PROJECTION_INLINE_WORK else self.workers
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key]
+            if chunks > 1 and self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+            executor = self.executor
+        sizes = [trials // chunks + (i < trials % chunks) for i in range(chunks)]
+        seeds = np.random.SeedSequence(scenario['seed']).spawn(chunks)
+        if chunks == 1:
+            parts = [simulate_workforce(inputs, scenario, sizes[0], seeds[0])]
+        else:
+            parts = list(executor.map(simulate_workforce, itertools.repeat(inputs), itertools.repeat(scenario), sizes, seeds))
+        headcount = np.concatenate([part[0] for part in parts])
+        run_rate = np.concatenate([part[1] for part in parts])
+        cost = np.cumsum(run_rate[:, 1:] / 12, axis=1)
+        result = {
+            'scenario': scenario,
+            'months': np.arange(scenario['months'] + 1),
+            'headcount': np.percentile(headcount, PROJECTION_PERCENTILES, axis=0),
+            'run_rate': np.percentile(run_rate, PROJECTION_PERCENTILES, axis=0),
+            'cost': np.percentile(cost, PROJECTION_PERCENTILES, axis=0),
+        }
+        with self.lock:
+            self.cache[key] = result
+            if len(self.cache) > PROJECTION_CACHE_SIZE:
+                self.cache.popitem(last=False)
+        return result
+
+    def shutdown(self):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def draw_projection_bands(ax, months, bands, title, ylabel, color):
+    """Fan chart: P5-P95 and P25-P75 shaded around the median"""
+    ax.fill_between(months, bands[0], bands[-1], color=color, alpha=0.15, label="P5-P95")
+    ax.fill_between(months, bands[1], bands[-2], color=color, alpha=0.35, label="P25-P75")
+    ax.plot(months, bands[2], color=color, label="Median")
+    ax.set_title(title, fontsize=12, fontweight='bold')
+    ax.set_xlabel("Month")
+    ax.set_ylabel(ylabel)
+    ax.legend(loc='upper left', fontsize=8)
+
+
+# --- Bulk Operations ---
+
+# Operation name -> (column, SQL expression computing the new value from one bound parameter)
+BULK_OPERATIONS = {
+    'Salary change (%)': ('salary', 'ROUND(salary * (1 + ? / 100.0), 2)'),
+    'Move to department': ('department', '?'),
+    'Set position': ('position', '?'),
+    'Set status': ('status', '?'),
+}
+
 
 class ModernEmployeeManagementSystem:
-    def __init__(self):
+    def __init__(self, db_path="advanced_employee_management.db", shards=None, snapshot_path=None):
         self.root = tk.Tk()
         self.root.title("AI-Powered Employee Management System")
         self.root.geometry("1600x1000")
@@ -44,6 +3395,9 @@ class ModernEmployeeManagementSystem:
         # Current view
         self.current_view = tk.StringVar(value="dashboard")
         
+        # Status bar text for background work
+        self.status_var = tk.StringVar(value="Ready")
+        
         # AI insights data
         self.ai_insights_cache = {}
         
@@ -53,11 +3407,66 @@ class ModernEmployeeManagementSystem:
             'auto_backup': True,
             'notification_sound': True,
             'show_tooltips': True,
-            'data_retention_days': 365
+            'data_retention_days': 365,
+            'db_profile': 'read_heavy',
+            'chart_rendering': 'inline'
         }
         
-        # Setup database connection
-        self.setup_database()
+        # Skill inventory index
+        self.skill_index = SkillIndex()
+        
+        # Salary band sketches per department, position and tenure
+        self.salary_bands = SalaryBandEngine()
+        
+        # Persisted anomaly scores by emp_id, shown in the directory's Anomaly column
+        self.anomalies = None
+        self.anomaly_scores = {}
+        
+        # LRU cache of full employee records for the directory detail pane
+        self.record_cache = RecordCache()
+        
+        # Chart slots (figure, axes, canvas) and the optional worker-process renderer
+        self.chart_slots = {}
+        self.chart_data = {}
+        self.chart_images = {}
+        self.chart_resize_jobs = {}
+        self.chart_renderer = ChartRenderer(self.root)
+        self.report_runner = None
+        self.workforce_projection = WorkforceProjection()
+        
+        # Writes publish change events; views refresh through the coalescing scheduler
+        self.events = EventBus()
+        self.refresh_scheduler = RefreshScheduler(self.root, self.events)
+        self.register_view_refreshes()
+        
+        # Setup database connection; extra (name, path) shards federate other business units,
+        # while a columnar snapshot replaces the database with a read-only, memory-mapped bundle
+        self.db_path = db_path
+        self.columnar = None
+        if snapshot_path:
+            self.open_columnar_snapshot(snapshot_path)
+        else:
+            self.setup_database()
+            if self.connection:
+                # Swaps left ready by the last session run before the UI opens
+                self.finish_schema_swaps()
+        self.federation = Federation([('primary', db_path)] + list(shards)) if shards and self.connection else None
+        if self.federation:
+            self.root.title(f"AI-Powered Employee Management System — {len(self.federation.shards)} databases")
+            if self.federation.behind:
+                names = ", ".join(self.federation.shards[index][0] for index in sorted(self.federation.behind))
+                self.status_var.set(f"Older schema in {names}: read as-is and left out of the cohort heatmap")
+        self.load_skill_index()
+        self.load_salary_bands()
+        self.load_anomaly_scores()
+        self.cohort_rollup = CohortRollup(self.connection) if self.connection else None
+        
+        # Peer benchmarks and duplicate keys for live form checks, rebuilt in the background after changes
+        self.peer_benchmarks = BenchmarkCache(db_path)
+        self.form_check_job = None
+        if self.connection:
+            self.peer_benchmarks.refresh()
+            self.events.subscribe('employees', lambda event: self.peer_benchmarks.refresh())
         
         # Setup modern GUI
         self.setup_modern_gui()
@@ -65,64 +3474,35 @@ class ModernEmployeeManagementSystem:
         # Load initial data
         self.refresh_employee_list()
         self.update_dashboard()
+        
+        # Finish pending migrations without blocking the UI
+        self.migration_stop = threading.Event()
+        self.migration_thread = None
+        if self.connection:
+            self.run_migrations_in_background()
+        
+        # Watch for commits made by other instances sharing the database
+        if self.connection:
+            self.change_watcher = ChangeWatcher(self.connection)
+            self.events.subscribe('employees', self.on_local_change)
+            self.root.after(CHANGE_POLL_MS, self.poll_external_changes)
     
     def setup_database(self):
         """Setup SQLite database connection and create enhanced table"""
         try:
-            db_path = "advanced_employee_management.db"
-            self.connection = sqlite3.connect(db_path)
+            db_path = self.db_path
+            self.connection = connect_database(db_path, self.settings['db_profile'])
             self.cursor = self.connection.cursor()
+            # Analytic reads run in snapshots on a separate WAL connection so they never block writers
+            self.read_connection = connect_database(db_path, 'read_heavy')
+            self.dashboard_version = self.analytics_version = None
             
-            # Create enhanced table with additional fields
-            create_table_query = '''
-            CREATE TABLE IF NOT EXISTS employees (
-                emp_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                age INTEGER NOT NULL,
-                department TEXT NOT NULL,
-                position TEXT NOT NULL,
-                salary REAL NOT NULL,
-                joining_date DATE NOT NULL,
-                email TEXT,
-                phone TEXT,
-                address TEXT,
-                performance_rating REAL DEFAULT 0.0,
-                skills TEXT,
-                manager_id INTEGER,
-                status TEXT DEFAULT 'Active',
-                last_promotion DATE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            '''
-            self.cursor.execute(create_table_query)
-            
-            # Create performance tracking table
-            performance_table_query = '''
-            CREATE TABLE IF NOT EXISTS performance_reviews (
-                review_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                emp_id INTEGER,
-                review_date DATE NOT NULL,
-                rating REAL NOT NULL,
-                feedback TEXT,
-                goals TEXT,
-                reviewer TEXT,
-                FOREIGN KEY (emp_id) REFERENCES employees (emp_id)
-            )
-            '''
-            self.cursor.execute(performance_table_query)
-            
-            # Create AI insights table
-            ai_insights_query = '''
-            CREATE TABLE IF NOT EXISTS ai_insights (
-                insight_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                insight_type TEXT NOT NULL,
-                insight_data TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            '''
-            self.cursor.execute(ai_insights_query)
+            # Versioned migrations: DDL now (version 1 is the baseline tables), batched backfills and index builds in the background
+            self.migrator = SchemaMigrator(self.connection)
+            self.migrator.apply_schema()
             
+            # Keep the change journal bounded
+            self.cursor.execute(QUERIES['prune_change_journal'], (CHANGE_JOURNAL_RETENTION,))
             self.connection.commit()
             print(f"Enhanced database created/connected successfully: {db_path}")
             
@@ -131,11 +3511,33 @@ class ModernEmployeeManagementSystem:
             self.connection = None
             self.cursor = None
     
+    def open_columnar_snapshot(self, path):
+        """Read-only mode: serve the views from a snapshot bundle, with no SQLite connection"""
+        self.read_connection = None
+        self.dashboard_version = self.analytics_version = None
+        try:
+            self.columnar = ColumnarSnapshot(path)
+        except (OSError, ValueError, KeyError) as e:
+            messagebox.showerror("Snapshot Error", f"Error opening snapshot: {e}")
+            return
+        self.root.title(f"AI-Powered Employee Management System — read-only snapshot of {self.columnar.data_version}")
+
+    def read_snapshot(self):
+        """Consistent read context for multi-query views: the open columnar snapshot, else a ReadSnapshot"""
+        return self.columnar if self.columnar is not None else ReadSnapshot(self.read_connection)
+
+    def command_state(self, command):
+        """'disabled' for actions that need the live database while a columnar snapshot is open"""
+        return 'disabled' if self.columnar is not None and command.__name__ not in SNAPSHOT_COMMANDS else 'normal'
+    
     def setup_modern_gui(self):
         """Setup modern GUI with dashboard and navigation"""
         # Configure modern styles
         self.setup_modern_styles()
         
+        # Status bar, packed first so the content never covers it
+        ttk.Label(self.root, textvariable=self.status_var, anchor='w', padding=(10, 3)).pack(side='bottom', fill='x')
+        
         # Create main container
         self.main_container = ttk.Frame(self.root)
         self.main_container.pack(fill='both', expand=True)
@@ -152,6 +3554,7 @@ class ModernEmployeeManagementSystem:
         self.create_employee_view()
         self.create_analytics_view()
         self.create_ai_insights_view()
+        self.create_skills_view()
         self.create_settings_view()
         
         # Show dashboard by default
@@ -279,6 +3682,7 @@ class ModernEmployeeManagementSystem:
             ("👥 Employees", "employees"),
             ("📊 Analytics", "analytics"),
             ("🤖 AI Insights", "ai_insights"),
+            ("🧠 Skills", "skills"),
             ("⚙️ Settings", "settings")
         ]
         
@@ -385,6 +3789,7 @@ class ModernEmployeeManagementSystem:
         self.dept_fig, self.dept_ax = plt.subplots(figsize=(6, 4))
         self.dept_canvas = FigureCanvasTkAgg(self.dept_fig, left_panel)
         self.dept_canvas.get_tk_widget().pack(fill='both', expand=True, padx=20, pady=(0, 20))
+        self.register_chart_slot('department', self.dept_fig, self.dept_ax, self.dept_canvas)
         
         # Right panel for salary trends
         right_panel = ttk.Frame(parent, style='Card.TFrame')
@@ -396,6 +3801,7 @@ class ModernEmployeeManagementSystem:
         self.salary_fig, self.salary_ax = plt.subplots(figsize=(6, 4))
         self.salary_canvas = FigureCanvasTkAgg(self.salary_fig, right_panel)
         self.salary_canvas.get_tk_widget().pack(fill='both', expand=True, padx=20, pady=(0, 20))
+        self.register_chart_slot('salary', self.salary_fig, self.salary_ax, self.salary_canvas)
     
     def create_employee_view(self):
         """Create enhanced employee management view"""
@@ -450,7 +3856,7 @@ class ModernEmployeeManagementSystem:
             ("Full Name:", 'name', 'normal'),
             ("Age:", 'age', 'normal'),
             ("Department:", 'department', 'combobox'),
-            ("Position:", 'position', 'normal'),
+            ("Position:", 'position', 'combobox'),
             ("Email:", 'email', 'normal'),
             ("Phone:", 'phone', 'normal'),
             ("Salary ($):", 'salary', 'normal'),
@@ -471,10 +3877,7 @@ class ModernEmployeeManagementSystem:
                                  state='readonly', width=35, style='Modern.TEntry')
             elif widget_type == 'combobox':
                 widget = ttk.Combobox(parent, textvariable=self.form_vars[var_name], width=33)
-                if var_name == 'department':
-                    widget['values'] = ('HR', 'IT', 'Finance', 'Marketing', 'Operations', 'Sales', 'Engineering', 'Design')
-                elif var_name == 'status':
-                    widget['values'] = ('Active', 'Inactive', 'On Leave', 'Terminated')
+                self.bind_category_values(widget, var_name)
             elif widget_type == 'text':
                 widget = tk.Text(parent, width=35, height=3, font=('Segoe UI', 10))
             else:
@@ -490,6 +3893,13 @@ class ModernEmployeeManagementSystem:
         self.address_text = tk.Text(parent, width=35, height=3, font=('Segoe UI', 10))
         self.address_text.grid(row=len(fields), column=1, pady=5, sticky='ew')
         
+        # Live checks against peer benchmarks, updated as the user types
+        self.form_hints = tk.Label(parent, text="", justify='left', anchor='w', wraplength=380,
+                                   font=('Segoe UI', 9), fg=self.colors['danger'], bg=self.colors['background'])
+        self.form_hints.grid(row=len(fields)+1, column=0, columnspan=2, sticky='ew', pady=(5, 0))
+        for var_name in ('emp_id', 'name', 'age', 'department', 'position', 'salary', 'email', 'phone', 'performance_rating'):
+            self.form_vars[var_name].trace_add('write', lambda *args: self.schedule_form_check())
+        
         # Button frame
         button_frame = ttk.Frame(parent)
         button_frame.grid(row=len(fields)+2, column=0, columnspan=2, pady=20)
@@ -503,12 +3913,23 @@ class ModernEmployeeManagementSystem:
         ]
         
         for i, (text, command, style) in enumerate(buttons):
-            btn = ttk.Button(button_frame, text=text, command=command, style=style)
+            btn = ttk.Button(button_frame, text=text, command=command, style=style, state=self.command_state(command))
             btn.grid(row=i//2, column=i%2, padx=5, pady=5, sticky='ew')
         
         button_frame.grid_columnconfigure(0, weight=1)
         button_frame.grid_columnconfigure(1, weight=1)
     
+    def bind_category_values(self, combobox, column, leading=()):
+        """Fill a department/status combobox from its lookup table, re-read each time the list opens"""
+        def load_values():
+            if self.columnar is not None:
+                names = sorted(self.columnar.categories(column))
+            else:
+                names = category_names(self.cursor, column) if self.connection else ()
+            combobox['values'] = tuple(leading) + tuple(names)
+        combobox.configure(postcommand=load_values)
+        load_values()
+    
     def setup_enhanced_list_panel(self, parent):
         """Setup enhanced employee list panel"""
         # Advanced search frame
@@ -530,16 +3951,21 @@ class ModernEmployeeManagementSystem:
         
         ttk.Label(filter_row, text="Department:").pack(side='left')
         self.dept_filter = ttk.Combobox(filter_row, width=15)
-        self.dept_filter['values'] = ('All', 'HR', 'IT', 'Finance', 'Marketing', 'Operations', 'Sales', 'Engineering', 'Design')
+        self.bind_category_values(self.dept_filter, 'department', ('All',))
         self.dept_filter.set('All')
         self.dept_filter.pack(side='left', padx=(5, 15))
         
         ttk.Label(filter_row, text="Status:").pack(side='left')
         self.status_filter = ttk.Combobox(filter_row, width=12)
-        self.status_filter['values'] = ('All', 'Active', 'Inactive', 'On Leave', 'Terminated')
+        self.bind_category_values(self.status_filter, 'status', ('All',))
         self.status_filter.set('All')
         self.status_filter.pack(side='left', padx=(5, 15))
         
+        self.anomaly_filter = tk.BooleanVar(value=False)
+        # Scores are computed for the primary database only, so the filter is off across federated databases
+        ttk.Checkbutton(filter_row, text="Anomalies only", variable=self.anomaly_filter,
+                        state='disabled' if self.federation else 'normal').pack(side='left', padx=(0, 15))
+        
         # Action buttons
         ttk.Button(filter_row, text="Search", command=self.advanced_search, style='Primary.TButton').pack(side='left', padx=5)
         ttk.Button(filter_row, text="Reset", command=self.reset_filters, style='Modern.TButton').pack(side='left', padx=5)
@@ -549,15 +3975,16 @@ class ModernEmployeeManagementSystem:
         list_frame.pack(fill='both', expand=True)
         
         # Enhanced Treeview
-        columns = ('ID', 'Name', 'Age', 'Department', 'Position', 'Salary', 'Status', 'Performance', 'Joining Date')
+        columns = ('ID', 'Name', 'Age', 'Department', 'Position', 'Salary', 'Status', 'Performance', 'Joining Date', 'Anomaly')
         self.tree = ttk.Treeview(list_frame, columns=columns, show='headings', height=20)
         
         # Configure columns
         column_widths = {'ID': 50, 'Name': 150, 'Age': 50, 'Department': 100, 'Position': 120, 
-                        'Salary': 100, 'Status': 80, 'Performance': 90, 'Joining Date': 100}
+                        'Salary': 100, 'Status': 80, 'Performance': 90, 'Joining Date': 100, 'Anomaly': 70}
         
         for col in columns:
-            self.tree.heading(col, text=col, command=lambda c=col: self.sort_treeview(c, False))
+            # Anomaly sorts highest first on the first click
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_treeview(c, c == 'Anomaly'))
             self.tree.column(col, width=column_widths.get(col, 100), anchor='center')
         
         # Scrollbars
@@ -585,12 +4012,15 @@ class ModernEmployeeManagementSystem:
             ("Delete Selected", self.delete_employee, 'Danger.TButton'),
             ("Export CSV", self.export_to_csv, 'Modern.TButton'),
             ("Import CSV", self.import_from_csv, 'Modern.TButton'),
+            ("Bulk Update", self.open_bulk_update_dialog, 'Primary.TButton'),
+            ("Find Duplicates", self.open_duplicate_review, 'Modern.TButton'),
             ("Generate Report", self.generate_report, 'Primary.TButton'),
             ("Sample Data", self.add_enhanced_sample_data, 'Success.TButton')
         ]
         
         for text, command, style in action_buttons:
-            ttk.Button(action_frame, text=text, command=command, style=style).pack(side='left', padx=5)
+            ttk.Button(action_frame, text=text, command=command, style=style,
+                       state=self.command_state(command)).pack(side='left', padx=5)
     
     def create_analytics_view(self):
         """Create analytics dashboard view"""
@@ -628,55 +4058,74 @@ class ModernEmployeeManagementSystem:
         
         ttk.Label(right_chart, text="Performance Trends", style='Heading.TLabel').pack(pady=15)
         
+        # Cohort retention heatmap, drawn from the precomputed rollup
+        cohort_frame = ttk.Frame(content_frame, style='Card.TFrame')
+        cohort_frame.pack(fill='both', expand=True, pady=(20, 0))
+        
+        cohort_header = ttk.Frame(cohort_frame)
+        cohort_header.pack(fill='x', padx=10, pady=(15, 0))
+        ttk.Label(cohort_header, text="Hiring Cohort Retention", style='Heading.TLabel').pack(side='left')
+        self.cohort_metric = ttk.Combobox(cohort_header, values=COHORT_METRICS, state='readonly', width=14)
+        self.cohort_metric.set(COHORT_METRICS[0])
+        self.cohort_metric.pack(side='right')
+        self.cohort_metric.bind('<<ComboboxSelected>>', lambda e: self.render_cohort_heatmap())
+        ttk.Label(cohort_header, text="Show:").pack(side='right', padx=5)
+        
         # Create analytics charts
-        self.setup_analytics_charts(left_chart, right_chart)
+        self.setup_analytics_charts(left_chart, right_chart, cohort_frame)
     
 
-    def setup_analytics_charts(self, left_parent, right_parent):
+    def setup_analytics_charts(self, left_parent, right_parent, cohort_parent):
         """Setup analytics charts for salary distribution and performance trends"""
         # --- Salary Distribution Chart ---
         self.salary_dist_fig, self.salary_dist_ax = plt.subplots(figsize=(5, 3))
         self.salary_dist_canvas = FigureCanvasTkAgg(self.salary_dist_fig, left_parent)
         self.salary_dist_canvas.get_tk_widget().pack(fill='both', expand=True, padx=10, pady=10)
-
-        self.cursor.execute("SELECT salary FROM employees")
-        salaries = [row[0] for row in self.cursor.fetchall()]
-        self.salary_dist_ax.clear()
-        if salaries:
-            sns.histplot(salaries, bins=10, kde=True, ax=self.salary_dist_ax, color="#2563eb")
-            self.salary_dist_ax.set_title("Salary Distribution")
-            self.salary_dist_ax.set_xlabel("Salary")
-            self.salary_dist_ax.set_ylabel("Count")
-        else:
-            self.salary_dist_ax.text(0.5, 0.5, "No Data", ha='center', va='center')
-        self.salary_dist_fig.tight_layout()
-        self.salary_dist_canvas.draw()
+        self.register_chart_slot('salary_distribution', self.salary_dist_fig, self.salary_dist_ax, self.salary_dist_canvas)
 
         # --- Performance Trends Chart ---
         self.performance_fig, self.performance_ax = plt.subplots(figsize=(5, 3))
         self.performance_canvas = FigureCanvasTkAgg(self.performance_fig, right_parent)
         self.performance_canvas.get_tk_widget().pack(fill='both', expand=True, padx=10, pady=10)
+        self.register_chart_slot('performance_trend', self.performance_fig, self.performance_ax, self.performance_canvas)
 
-        self.cursor.execute("""
-            SELECT strftime('%Y-%m', joining_date) as month, AVG(performance_rating)
-            FROM employees
-            GROUP BY month
-            ORDER BY month
-        """)
-        data = self.cursor.fetchall()
-        months = [row[0] for row in data]
-        ratings = [row[1] for row in data]
-        self.performance_ax.clear()
-        if months and ratings:
-            self.performance_ax.plot(months, ratings, marker='o', color="#10b981")
-            self.performance_ax.set_title("Performance Trends")
-            self.performance_ax.set_xlabel("Month")
-            self.performance_ax.set_ylabel("Avg. Performance Rating")
-            self.performance_ax.tick_params(axis='x', rotation=45)
+        # --- Cohort Retention Heatmap ---
+        self.cohort_fig, self.cohort_ax = plt.subplots(figsize=(10, 3))
+        self.cohort_canvas = FigureCanvasTkAgg(self.cohort_fig, cohort_parent)
+        self.cohort_canvas.get_tk_widget().pack(fill='both', expand=True, padx=10, pady=10)
+        self.register_chart_slot('cohort_retention', self.cohort_fig, self.cohort_ax, self.cohort_canvas)
+
+        self.update_analytics_charts()
+
+    def update_analytics_charts(self):
+        """Redraw the analytics salary distribution, performance trend and cohort retention charts"""
+        if self.cohort_rollup:
+            self.cohort_rollup.refresh()
+        if self.federation:
+            salaries, trend = self.federation.analytics_figures()
+            self.render_chart('salary_distribution', 'salary_histogram', salaries)
+            self.render_chart('performance_trend', 'performance_trend', trend)
+            self.render_cohort_heatmap()
+            return
+        with self.read_snapshot() as snapshot:
+            if snapshot.data_version == self.analytics_version:
+                return
+            salaries = snapshot.column('salaries')
+            trend = snapshot.fetchall('monthly_performance')
+        self.analytics_version = snapshot.data_version
+        self.render_chart('salary_distribution', 'salary_histogram', salaries)
+        self.render_chart('performance_trend', 'performance_trend', trend)
+        self.render_cohort_heatmap()
+
+    def render_cohort_heatmap(self):
+        """Draw the selected cohort metric from the rollup table, without touching employees"""
+        if self.columnar is not None:
+            heatmap = self.columnar.cohort_matrix(self.cohort_metric.get())
+        elif self.federation:
+            heatmap = self.federation.cohort_matrix(self.cohort_metric.get())
         else:
-            self.performance_ax.text(0.5, 0.5, "No Data", ha='center', va='center')
-        self.performance_fig.tight_layout()
-        self.performance_canvas.draw()
+            heatmap = CohortRollup.matrix(self.read_connection, self.cohort_metric.get())
+        self.render_chart('cohort_retention', 'cohort_heatmap', heatmap)
     
     def create_ai_insights_view(self):
         """Create AI insights view"""
@@ -716,11 +4165,15 @@ class ModernEmployeeManagementSystem:
             ("Generate Insights", self.generate_ai_insights, 'Primary.TButton'),
             ("Predict Turnover", self.predict_turnover, 'Modern.TButton'),
             ("Salary Analysis", self.ai_salary_analysis, 'Modern.TButton'),
-            ("Performance Forecast", self.performance_forecast, 'Modern.TButton')
+            ("Band Audit (Exact)", self.salary_band_audit, 'Modern.TButton'),
+            ("Performance Forecast", self.performance_forecast, 'Modern.TButton'),
+            ("Pay Anomalies", self.show_pay_anomalies, 'Modern.TButton'),
+            ("Workforce Projection", self.open_projection_dialog, 'Modern.TButton')
         ]
 
         for text, command, style in ai_buttons:
-            ttk.Button(ai_button_frame, text=text, command=command, style=style).pack(side='left', padx=10)
+            ttk.Button(ai_button_frame, text=text, command=command, style=style,
+                       state=self.command_state(command)).pack(side='left', padx=10)
 
     # --- AI Features Implementation ---
 
@@ -729,19 +4182,18 @@ class ModernEmployeeManagementSystem:
         self.ai_recommendations.delete('1.0', tk.END)
         self.predictive_analytics.delete('1.0', tk.END)
 
-        # Gather data
-        self.cursor.execute("SELECT department, AVG(performance_rating), COUNT(*) FROM employees GROUP BY department")
-        dept_perf = self.cursor.fetchall()
-        self.cursor.execute("SELECT AVG(salary) FROM employees")
-        avg_salary = self.cursor.fetchone()[0] or 0
-        self.cursor.execute("SELECT department, AVG(salary) FROM employees GROUP BY department")
-        dept_salary = self.cursor.fetchall()
-        self.cursor.execute("SELECT COUNT(*) FROM employees WHERE status='On Leave'")
-        on_leave = self.cursor.fetchone()[0]
-        self.cursor.execute("SELECT COUNT(*) FROM employees WHERE status='Active'")
-        active = self.cursor.fetchone()[0]
-        self.cursor.execute("SELECT COUNT(*) FROM employees WHERE status='Terminated'")
-        terminated = self.cursor.fetchone()[0]
+        # Gather data from one snapshot so the figures agree with each other
+        with self.read_snapshot() as snapshot:
+            dept_perf = snapshot.fetchall('department_performance')
+            avg_salary = snapshot.scalar('avg_salary') or 0
+            dept_salary = snapshot.fetchall('department_avg_salary')
+            on_leave = snapshot.scalar('count_by_status', ('On Leave',))
+            active = snapshot.scalar('count_by_status', ('Active',))
+            terminated = snapshot.scalar('count_by_status', ('Terminated',))
+        flagged = 0
+        if self.anomalies:
+            self.refresh_anomalies()
+            flagged = len(self.anomalies.flagged())
 
         # AI Recommendations
         self.ai_recommendations.insert(tk.END, "🔍 **AI Insights & Recommendations**\n\n")
@@ -756,6 +4208,8 @@ class ModernEmployeeManagementSystem:
         self.ai_recommendations.insert(tk.END, f"• Employees on leave: {on_leave}\n")
         self.ai_recommendations.insert(tk.END, f"• Active employees: {active}\n")
         self.ai_recommendations.insert(tk.END, f"• Terminated employees: {terminated}\n")
+        if flagged:
+            self.ai_recommendations.insert(tk.END, f"• Pay/rating anomalies vs. position and tenure peers: {flagged} (see Pay Anomalies)\n")
         if avg_salary:
             self.ai_recommendations.insert(tk.END, f"• Company-wide average salary: ${avg_salary:,.2f}\n")
         self.ai_recommendations.insert(tk.END, "\n• Suggestion: Consider upskilling programs for departments with low performance.\n")
@@ -764,10 +4218,9 @@ class ModernEmployeeManagementSystem:
     def predict_turnover(self):
         """Predict employee turnover using simple AI logic"""
         self.predictive_analytics.delete('1.0', tk.END)
-        self.cursor.execute("SELECT COUNT(*) FROM employees")
-        total = self.cursor.fetchone()[0] or 1
-        self.cursor.execute("SELECT COUNT(*) FROM employees WHERE status='Terminated'")
-        terminated = self.cursor.fetchone()[0]
+        with self.read_snapshot() as snapshot:
+            total = snapshot.scalar('count_employees') or 1
+            terminated = snapshot.scalar('count_by_status', ('Terminated',))
         turnover_rate = (terminated / total) * 100
         self.predictive_analytics.insert(tk.END, "🔮 **Turnover Prediction**\n\n")
         self.predictive_analytics.insert(tk.END, f"• Estimated turnover rate: {turnover_rate:.2f}%\n")
@@ -777,23 +4230,130 @@ class ModernEmployeeManagementSystem:
             self.predictive_analytics.insert(tk.END, "• Turnover is within a healthy range.\n")
 
     def ai_salary_analysis(self):
-        """AI-powered salary analysis"""
+        """AI-powered salary analysis with percentile bands from the salary sketches"""
         self.predictive_analytics.delete('1.0', tk.END)
-        self.cursor.execute("SELECT AVG(salary) FROM employees")
-        avg_salary = self.cursor.fetchone()[0] or 0
-        self.cursor.execute("SELECT department, AVG(salary) FROM employees GROUP BY department")
-        dept_salary = self.cursor.fetchall()
+        totals = self.rows_everywhere(QUERIES['salary_totals'])
+        salary_count = sum(count for _, count in totals)
+        avg_salary = sum(total or 0 for total, _ in totals) / salary_count if salary_count else 0
         self.predictive_analytics.insert(tk.END, "💰 **Salary Analysis**\n\n")
         self.predictive_analytics.insert(tk.END, f"• Company-wide average salary: ${avg_salary:,.2f}\n")
-        for dept, avg in dept_salary:
-            self.predictive_analytics.insert(tk.END, f"• {dept}: ${avg:,.2f}\n")
+        if self.current_salary_bands():
+            overall = self.salary_bands.overall()
+            self.predictive_analytics.insert(tk.END, f"• Company-wide band: {self.format_band(overall)}\n")
+        for dimension, title in (('department', "Department"), ('position', "Position"), ('tenure', "Tenure")):
+            bands = self.current_salary_bands(dimension)
+            if not bands:
+                continue
+            self.predictive_analytics.insert(tk.END, f"\n{title} bands (P10 / P25 / P50 / P75 / P90):\n")
+            for value, band in bands.items():
+                self.predictive_analytics.insert(tk.END, f"• {value}: {self.format_band(band)}\n")
+        outliers = self.employees_outside_band(self.current_salary_bands())
+        self.predictive_analytics.insert(tk.END, f"\n• {len(outliers)} employees outside their department's P10–P90 band\n")
+        for emp_id, name, dept, salary, side in outliers[:10]:
+            self.predictive_analytics.insert(tk.END, f"   - {name} (#{emp_id}, {dept}): ${salary:,.2f} {side}\n")
         self.predictive_analytics.insert(tk.END, "\n• Suggestion: Review salary structure for equity across departments.\n")
 
+    def salary_band_audit(self):
+        """Exact-mode salary band audit using NumPy partitioning"""
+        self.predictive_analytics.delete('1.0', tk.END)
+        by_dept = {}
+        for dept, salary in self.rows_everywhere("SELECT department, salary FROM employees"):
+            by_dept.setdefault(dept, []).append(salary)
+        exact = {dept: dict(zip(SalaryBandEngine.PERCENTILES, exact_percentiles(salaries, SalaryBandEngine.PERCENTILES)))
+                 for dept, salaries in sorted(by_dept.items())}
+        approx = self.current_salary_bands()
+        self.predictive_analytics.insert(tk.END, "🧾 **Salary Band Audit (Exact)**\n\n")
+        for dept, band in exact.items():
+            self.predictive_analytics.insert(tk.END, f"• {dept}: {self.format_band(band)}\n")
+            if dept in approx:
+                drift = max((abs(approx[dept][p] - band[p]) / band[p] for p in band if band[p]), default=0.0)
+                self.predictive_analytics.insert(tk.END, f"   sketch deviation: {drift:.2%}\n")
+        outliers = self.employees_outside_band(exact)
+        self.predictive_analytics.insert(tk.END, f"\n• {len(outliers)} employees outside their department's P10–P90 band:\n")
+        for emp_id, name, dept, salary, side in outliers:
+            self.predictive_analytics.insert(tk.END, f"   - {name} (#{emp_id}, {dept}): ${salary:,.2f} {side}\n")
+
+    def load_salary_bands(self, segments=None):
+        """Rebuild salary sketches (all, or only the given segments) in one table scan"""
+        if not self.cursor:
+            return
+        self.salary_bands.rebuild(self.rows_everywhere("SELECT department, position, joining_date, salary FROM employees"),
+                                  segments)
+
+    def current_salary_bands(self, dimension='department'):
+        """Salary bands for a dimension, rebuilding stale segments first"""
+        if self.salary_bands.stale:
+            self.load_salary_bands()
+        elif self.salary_bands.dirty:
+            self.load_salary_bands(set(self.salary_bands.dirty))
+        return self.salary_bands.bands(dimension)
+
+    def employees_outside_band(self, bands):
+        """Employees paid below P10 or above P90 of their department band"""
+        outliers = []
+        for emp_id, name, dept, salary in self.rows_everywhere("SELECT emp_id, name, department, salary FROM employees",
+                                                               global_ids=True):
+            band = bands.get(dept)
+            if not band:
+                continue
+            if salary < band[10]:
+                outliers.append((emp_id, name, dept, salary, "below P10"))
+            elif salary > band[90]:
+                outliers.append((emp_id, name, dept, salary, "above P90"))
+        return outliers
+
+    def rows_everywhere(self, sql, global_ids=False):
+        """Rows of a read-only statement from every federated database, or from this one"""
+        if self.federation:
+            return self.federation.rows(sql, global_ids=global_ids)
+        return self.cursor.execute(sql).fetchall()
+
+    def format_band(self, band):
+        return " / ".join(f"${band[p]:,.0f}" for p in SalaryBandEngine.PERCENTILES)
+
+    def load_anomaly_scores(self):
+        """Score anything changed since the last run and load every persisted score"""
+        if self.columnar is not None:
+            self.anomaly_scores = self.columnar.anomaly_scores()
+            return
+        if not self.connection:
+            return
+        self.anomalies = AnomalyDetector(self.connection)
+        self.anomalies.refresh()
+        self.anomaly_scores = self.anomalies.scores()
+
+    def refresh_anomalies(self):
+        """Rescore segments touched since the last pass and patch their Anomaly cells"""
+        if not self.anomalies:
+            return {}
+        rescored = self.anomalies.refresh()
+        self.anomaly_scores.update(rescored)
+        for emp_id, score in rescored.items():
+            if self.tree.exists(str(emp_id)):
+                self.tree.set(str(emp_id), 'Anomaly', f"{score:.1f}")
+        return rescored
+
+    def show_pay_anomalies(self):
+        """Employees paid or rated far outside their position/tenure peers"""
+        self.predictive_analytics.delete('1.0', tk.END)
+        if not self.anomalies:
+            return
+        self.refresh_anomalies()
+        flagged = self.anomalies.flagged()
+        self.predictive_analytics.insert(tk.END, "🚩 **Pay & Rating Anomalies**\n\n")
+        self.predictive_analytics.insert(tk.END, f"• {len(flagged)} employees score ≥ {ANOMALY_THRESHOLD} against "
+                                                 f"peers with the same position and tenure\n\n")
+        for emp_id, name, position, segment, salary, rating, score, reason in flagged[:25]:
+            self.predictive_analytics.insert(tk.END, f"• {name} (#{emp_id}, {position}, {segment.rsplit('|', 1)[1]}): "
+                                                     f"${salary:,.0f}, rating {rating} — {reason} (score {score:.1f})\n")
+        if flagged:
+            self.predictive_analytics.insert(tk.END, "\n• Tip: tick \"Anomalies only\" in the directory to review them all.\n")
+
     def performance_forecast(self):
         """AI-powered performance forecast"""
         self.predictive_analytics.delete('1.0', tk.END)
-        self.cursor.execute("SELECT AVG(performance_rating) FROM employees")
-        avg_perf = self.cursor.fetchone()[0] or 0
+        with self.read_snapshot() as snapshot:
+            avg_perf = snapshot.scalar('avg_rating') or 0
         self.predictive_analytics.insert(tk.END, "📈 **Performance Forecast**\n\n")
         self.predictive_analytics.insert(tk.END, f"• Current average performance rating: {avg_perf:.2f}\n")
         if avg_perf < 3:
@@ -801,21 +4361,106 @@ class ModernEmployeeManagementSystem:
         else:
             self.predictive_analytics.insert(tk.END, "• Forecast: Performance is stable or improving.\n")
 
+    def open_projection_dialog(self):
+        """Scenario inputs and fan charts for the Monte Carlo headcount/payroll projection"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Workforce Projection")
+        dialog.geometry("1100x720")
+
+        form = ttk.Frame(dialog)
+        form.pack(fill='x', padx=15, pady=10)
+        fields = [('months', "Months"), ('trials', "Trials"), ('hires_per_month', "Hires / month"),
+                  ('annual_raise_pct', "Annual raise %"), ('promotion_raise_pct', "Promotion raise %"),
+                  ('attrition_multiplier', "Attrition x")]
+        scenario_vars = {}
+        for column, (key, label) in enumerate(fields):
+            ttk.Label(form, text=label).grid(row=0, column=column, padx=5, sticky='w')
+            scenario_vars[key] = tk.StringVar(value=str(PROJECTION_DEFAULTS[key]))
+            ttk.Entry(form, textvariable=scenario_vars[key], width=10).grid(row=1, column=column, padx=5)
+        status_var = tk.StringVar(value="Rates are derived per department from tenure, terminations and last promotions.")
+        ttk.Label(dialog, textvariable=status_var).pack(fill='x', padx=15)
+
+        figure = Figure(figsize=(11, 5.5))
+        canvas = FigureCanvasTkAgg(figure, dialog)
+        canvas.get_tk_widget().pack(fill='both', expand=True, padx=15, pady=10)
+
+        def show(result):
+            figure.clear()
+            months = result['months']
+            draw_projection_bands(figure.add_subplot(1, 2, 1), months, result['headcount'], "Headcount", "Employees", "#2563eb")
+            draw_projection_bands(figure.add_subplot(1, 2, 2), months, result['run_rate'] / 1e6, "Annual Payroll Run-Rate",
+                                  "$ millions", "#10b981")
+            figure.tight_layout()
+            canvas.draw()
+            last = result['scenario']['months']
+            headcount, run_rate, cost = result['headcount'][:, -1], result['run_rate'][:, -1], result['cost'][:, -1]
+            status_var.set(f"Month {last}: headcount {headcount[2]:,.0f} (P5–P95 {headcount[0]:,.0f}–{headcount[-1]:,.0f}); "
+                           f"run-rate ${run_rate[2]:,.0f}; cumulative payroll ${cost[2]:,.0f} "
+                           f"(P5–P95 ${cost[0]:,.0f}–${cost[-1]:,.0f})")
+
+        def run():
+            try:
+                scenario = {key: type(PROJECTION_DEFAULTS[key])(var.get()) for key, var in scenario_vars.items()}
+            except ValueError:
+                messagebox.showerror("Projection", "Scenario values must be numbers.", parent=dialog)
+                return
+            if not 1 <= scenario['months'] <= 120 or scenario['trials'] < 100:
+                messagebox.showerror("Projection", "Use 1-120 months and at least 100 trials.", parent=dialog)
+                return
+            inputs = projection_inputs(self.cursor)
+            status_var.set(f"Simulating {scenario['trials']:,} trials over {scenario['months']} months...")
+            result = {}
+
+            def worker():
+                try:
+                    result['value'] = self.workforce_projection.project(inputs, scenario)
+                except Exception as e:
+                    result['error'] = e
+
+            def poll():
+                if thread.is_alive():
+                    dialog.after(100, poll)
+                elif 'error' in result:
+                    status_var.set(f"Projection failed: {result['error']}")
+                elif dialog.winfo_exists():
+                    show(result['value'])
+
+            thread = threading.Thread(target=worker, daemon=True)
+            thread.start()
+            poll()
+
+        ttk.Button(form, text="Run Projection", command=run, style='Primary.TButton').grid(row=1, column=len(fields), padx=10)
+        run()
+
+    def form_peer_hints(self):
+        """Benchmark and duplicate hints for the current form values"""
+        form = {name: var.get() for name, var in self.form_vars.items()}
+        exclude_id = int(form['emp_id']) if str(form['emp_id']).isdigit() else None
+        return self.peer_benchmarks.current.check(form, exclude_id)
+
+    def schedule_form_check(self):
+        """Coalesce keystrokes into one check when Tk is next idle"""
+        if self.form_check_job is None:
+            self.form_check_job = self.root.after_idle(self.check_form)
+
+    def check_form(self):
+        self.form_check_job = None
+        if self.peer_benchmarks.error is not None:
+            self.status_var.set(f"Peer benchmarks could not be refreshed, hints use older figures: {self.peer_benchmarks.error}")
+        hints = self.form_peer_hints()
+        self.form_hints.config(text="\n".join(("⚠ " if level == 'warning' else "ℹ ") + message for level, message in hints),
+                               fg=self.colors['danger'] if any(level == 'warning' for level, _ in hints) else self.colors['info'])
+
     def get_ai_suggestions(self):
         """Enable AI suggestions for the employee form"""
         name = self.form_vars['name'].get()
         dept = self.form_vars['department'].get()
-        perf = self.form_vars['performance_rating'].get()
-        salary = self.form_vars['salary'].get()
         suggestions = []
         if not name:
             suggestions.append("Enter the employee's full name.")
         if dept == "":
             suggestions.append("Select a department for the employee.")
-        if perf and float(perf) < 3:
-            suggestions.append("Performance is below average. Recommend training.")
-        if salary and float(salary) < 30000:
-            suggestions.append("Salary is below market average. Consider review.")
+        suggestions.extend(message for _, message in self.form_peer_hints())
         if not suggestions:
             suggestions.append("All fields look good! Ready to add/update employee.")
         messagebox.showinfo("AI Suggestions", "\n".join(suggestions))
@@ -829,120 +4474,219 @@ class ModernEmployeeManagementSystem:
             ("David Kim", 27, "Engineering", "DevOps Engineer", 90000, "2023-06-01", "david.k@ems.com", "6543210987", "321 Cedar Blvd", 4.7, "AWS,Docker", "Active"),
             ("Eva Brown", 31, "Marketing", "Marketing Lead", 78000, "2022-11-18", "eva.b@ems.com", "5432109876", "654 Spruce Ln", 4.0, "SEO,Content", "Active"),
         ]
+        emp_ids = []
         for emp in sample_employees:
-            self.cursor.execute('''
-                INSERT INTO employees (name, age, department, position, salary, joining_date, email, phone, address, performance_rating, skills, status)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', emp)
+            emp_ids.append(insert_employee(self.cursor, emp))
+            self.sync_match_keys(emp_ids[-1], emp[0], emp[6], emp[7])
+            self.sync_employee_skills(emp_ids[-1], emp[10], emp[2])
+            self.salary_bands.add(emp[2], emp[3], emp[5], emp[4])
         self.connection.commit()
-        self.refresh_employee_list()
+        self.events.publish('employees', action='insert', emp_ids=emp_ids)
         messagebox.showinfo("Sample Data", "Sample employee data added successfully!")
 
     def refresh_employee_list(self):
         """Refresh the employee list in the UI"""
         for row in self.tree.get_children():
             self.tree.delete(row)
-        self.cursor.execute("SELECT emp_id, name, age, department, position, salary, status, performance_rating, joining_date FROM employees")
-        for row in self.cursor.fetchall():
-            self.tree.insert('', 'end', values=row)
+        if self.columnar is not None:
+            self.populate_tree(self.columnar.employee_rows(columns=DIRECTORY_COLUMNS))
+            return
+        if self.federation:
+            self.populate_tree(self.federation.search())
+            return
+        self.cursor.execute(QUERIES['all_employees'])
+        self.populate_tree(self.cursor.fetchall())
+
+    def fetch_employee_rows(self, emp_ids):
+        """Full employee rows by id, from the owning shards when federated"""
+        if self.columnar is not None:
+            return self.columnar.employee_rows(emp_ids)
+        if self.federation:
+            return self.federation.fetch_by_ids(emp_ids)
+        self.cursor.execute(QUERIES['employees_by_ids'], (json.dumps([int(i) for i in emp_ids]),))
+        return self.cursor.fetchall()
+
+    def populate_tree(self, rows):
+        """Fill the directory from DIRECTORY_COLUMNS rows; full records load when a row is opened"""
+        for row in rows:
+            self.tree.insert('', 'end', iid=str(row[0]), values=self.directory_row(row))
+
+    def directory_row(self, values):
+        """Directory values with the employee's persisted anomaly score"""
+        score = self.anomaly_scores.get(values[0])
+        return tuple(values) + ("" if score is None else f"{score:.1f}",)
+
+    def sort_treeview(self, col, reverse):
+        """Sort directory rows by a column, numerically where possible; blanks stay last and clicking again reverses"""
+        def key(iid):
+            value = self.tree.set(iid, col)
+            try:
+                return (0, float(value), "")
+            except ValueError:
+                return (1, 0, value)
+        rows = [iid for iid in self.tree.get_children() if self.tree.set(iid, col) != ""]
+        blanks = [iid for iid in self.tree.get_children() if self.tree.set(iid, col) == ""]
+        for index, iid in enumerate(sorted(rows, key=key, reverse=reverse) + blanks):
+            self.tree.move(iid, '', index)
+        self.tree.heading(col, command=lambda: self.sort_treeview(col, not reverse))
+
+    def get_employee_record(self, emp_id):
+        """Full record for an employee, from cache or by fetching the surrounding directory page"""
+        emp_id = int(emp_id)
+        record = self.record_cache.get(emp_id)
+        if record is None:
+            page = [emp_id]
+            iid = str(emp_id)
+            while len(page) < self.record_cache.PAGE_SIZE and self.tree.exists(iid):
+                iid = self.tree.next(iid)
+                if not iid:
+                    break
+                page.append(int(iid))
+            records = {row[0]: EmployeeRecord(row) for row in self.fetch_employee_rows(page)}
+            record = records.pop(emp_id, None)
+            self.record_cache.put_many(records.values())
+            if record is not None:
+                self.record_cache.put(record)
+        return record
 
 
     def update_dashboard(self):
-        """Update dashboard stats and charts with latest data"""
+        """Update dashboard stats and charts from one consistent snapshot (or merged shard partials)"""
+        since = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+        if self.federation:
+            total_employees, avg_salary, top_department, new_hires, dept_data, salary_data = \
+                self.federation.dashboard_figures(since)
+        else:
+            with self.read_snapshot() as snapshot:
+                if snapshot.data_version == self.dashboard_version:
+                    return
+                total_employees = snapshot.scalar('count_employees') or 0
+                avg_salary = snapshot.scalar('avg_salary') or 0
+                top_department = snapshot.scalar('top_department')
+                new_hires = snapshot.scalar('count_joined_since', (since,)) or 0
+                dept_data = snapshot.fetchall('department_counts')
+                salary_data = snapshot.fetchall('department_avg_salary')
+            self.dashboard_version = snapshot.data_version
+
         # Update stats cards
-        self.cursor.execute("SELECT COUNT(*) FROM employees")
-        total_employees = self.cursor.fetchone()[0] or 0
         self.stats_vars['total_employees'].set(str(total_employees))
-
-        self.cursor.execute("SELECT AVG(salary) FROM employees")
-        avg_salary = self.cursor.fetchone()[0] or 0
         self.stats_vars['avg_salary'].set(f"${avg_salary:,.2f}")
+        self.stats_vars['top_department'].set(top_department or "N/A")
+        self.stats_vars['new_hires'].set(str(new_hires))
 
-        self.cursor.execute("SELECT department, COUNT(*) as cnt FROM employees GROUP BY department ORDER BY cnt DESC LIMIT 1")
-        row = self.cursor.fetchone()
-        self.stats_vars['top_department'].set(row[0] if row else "N/A")
+        # Update department pie and salary bar charts
+        self.render_chart('department', 'department_pie', dept_data)
+        self.render_chart('salary', 'salary_bars', salary_data)
 
-        self.cursor.execute("SELECT COUNT(*) FROM employees WHERE joining_date >= ?", 
-                            ((datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d'),))
-        new_hires = self.cursor.fetchone()[0] or 0
-        self.stats_vars['new_hires'].set(str(new_hires))
+    # --- Chart Rendering ---
+    def register_chart_slot(self, slot, figure, ax, canvas):
+        """Track a Tk chart so it can be drawn inline or blitted from the renderer"""
+        self.chart_slots[slot] = (figure, ax, canvas)
+        if self.settings['chart_rendering'] == 'process':
+            ax.set_axis_off()
+        canvas.get_tk_widget().bind('<Configure>', lambda e: self.on_chart_resize(slot), add='+')
 
-        # Update department pie chart
-        self.cursor.execute("SELECT department, COUNT(*) FROM employees GROUP BY department")
-        dept_data = self.cursor.fetchall()
-        self.dept_ax.clear()
-        if dept_data:
-            labels, sizes = zip(*dept_data)
-            self.dept_ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=140, colors=sns.color_palette("pastel"))
-            self.dept_ax.set_title("Department Distribution", fontsize=14, fontweight='bold')
-        else:
-            self.dept_ax.text(0.5, 0.5, "No Data", ha='center', va='center')
-        self.dept_fig.tight_layout()
-        self.dept_canvas.draw()
-
-        # Update salary bar chart
-        self.cursor.execute("SELECT department, AVG(salary) FROM employees GROUP BY department")
-        salary_data = self.cursor.fetchall()
-        self.salary_ax.clear()
-        if salary_data:
-            depts, avgs = zip(*salary_data)
-            sns.barplot(x=list(depts), y=list(avgs), ax=self.salary_ax, palette="Blues_d")
-            self.salary_ax.set_title("Average Salary by Department", fontsize=14, fontweight='bold')
-            self.salary_ax.set_ylabel("Average Salary ($)")
-            self.salary_ax.set_xlabel("Department")
-        else:
-            self.salary_ax.text(0.5, 0.5, "No Data", ha='center', va='center')
-        self.salary_fig.tight_layout()
-        self.salary_canvas.draw()
+    def render_chart(self, slot, kind, data):
+        """Draw a chart on the Tk thread or hand it to the worker-process renderer"""
+        figure, ax, canvas = self.chart_slots[slot]
+        self.chart_data[slot] = (kind, data)
+        widget = canvas.get_tk_widget()
+        if self.settings['chart_rendering'] == 'process':
+            width, height = widget.winfo_width(), widget.winfo_height()
+            if width <= 1 or height <= 1:
+                # Not mapped yet; render at the figure's nominal size
+                width, height = (figure.get_size_inches() * figure.dpi).astype(int)
+            self.chart_renderer.request(slot, kind, data, (int(width), int(height)), figure.dpi,
+                                        lambda image: self.blit_chart(slot, image),
+                                        lambda error: self.draw_chart_inline(slot))
+            return
+        self.draw_chart_inline(slot)
+
+    def draw_chart_inline(self, slot):
+        """Draw a slot's latest chart data on the Tk thread; also the fallback when a worker render fails"""
+        figure, ax, canvas = self.chart_slots[slot]
+        kind, data = self.chart_data[slot]
+        canvas.get_tk_widget().delete('rendered')
+        ax.clear()
+        CHART_DRAWERS[kind](ax, data)
+        figure.tight_layout()
+        canvas.draw()
+
+    def blit_chart(self, slot, image):
+        """Show a finished worker render on top of the chart canvas"""
+        widget = self.chart_slots[slot][2].get_tk_widget()
+        # Tk only keeps the image while Python holds a reference to it
+        self.chart_images[slot] = ImageTk.PhotoImage(image)
+        widget.delete('rendered')
+        widget.create_image(0, 0, anchor='nw', image=self.chart_images[slot], tags='rendered')
+
+    def on_chart_resize(self, slot):
+        """Re-render at the new size once resizing settles"""
+        if self.settings['chart_rendering'] != 'process' or slot not in self.chart_data:
+            return
+        job = self.chart_resize_jobs.pop(slot, None)
+        if job:
+            self.root.after_cancel(job)
+
+        def rerender():
+            self.chart_resize_jobs.pop(slot, None)
+            self.render_chart(slot, *self.chart_data[slot])
+
+        self.chart_resize_jobs[slot] = self.root.after(150, rerender)
+
+    def set_chart_rendering(self, mode):
+        """Switch between inline and worker-process chart rendering and redraw every chart"""
+        self.settings['chart_rendering'] = mode
+        self.chart_renderer.reset()
+        for slot, (figure, ax, canvas) in self.chart_slots.items():
+            canvas.get_tk_widget().delete('rendered')
+            if mode == 'process':
+                ax.clear()
+                ax.set_axis_off()
+                canvas.draw()
+            if slot in self.chart_data:
+                self.render_chart(slot, *self.chart_data[slot])
 
     def on_employee_select(self, event):
         """Populate form with selected employee data"""
         selected = self.tree.selection()
         if not selected:
             return
-        values = self.tree.item(selected[0], 'values')
-        keys = ['emp_id', 'name', 'age', 'department', 'position', 'salary', 'status', 'performance_rating', 'joining_date']
-        for i, key in enumerate(keys):
-            if key in self.form_vars:
-                self.form_vars[key].set(values[i])
-        # Load address and other fields
-        emp_id = values[0]
-        self.cursor.execute("SELECT address, email, phone, skills FROM employees WHERE emp_id=?", (emp_id,))
-        row = self.cursor.fetchone()
-        if row:
+        record = self.get_employee_record(selected[0])
+        if record:
+            for key in self.form_vars:
+                value = getattr(record, key)
+                self.form_vars[key].set("" if value is None else value)
             self.address_text.delete('1.0', tk.END)
-            self.address_text.insert(tk.END, row[0] or "")
-            self.form_vars['email'].set(row[1] or "")
-            self.form_vars['phone'].set(row[2] or "")
-            self.form_vars['skills'].set(row[3] or "")
+            self.address_text.insert(tk.END, record.address or "")
+            self.form_widgets['skills'].delete('1.0', tk.END)
+            self.form_widgets['skills'].insert(tk.END, record.skills or "")
 
     def on_employee_double_click(self, event):
         """Show detailed employee info on double-click"""
         selected = self.tree.selection()
         if not selected:
             return
-        values = self.tree.item(selected[0], 'values')
-        emp_id = values[0]
-        self.cursor.execute("SELECT * FROM employees WHERE emp_id=?", (emp_id,))
-        emp = self.cursor.fetchone()
+        emp = self.get_employee_record(selected[0])
         if emp:
-            info = f"ID: {emp[0]}\nName: {emp[1]}\nAge: {emp[2]}\nDepartment: {emp[3]}\nPosition: {emp[4]}\nSalary: ${emp[5]:,.2f}\nJoining Date: {emp[6]}\nEmail: {emp[7]}\nPhone: {emp[8]}\nAddress: {emp[9]}\nPerformance: {emp[10]}\nSkills: {emp[11]}\nStatus: {emp[13]}"
+            info = f"ID: {emp.emp_id}\nName: {emp.name}\nAge: {emp.age}\nDepartment: {emp.department}\nPosition: {emp.position}\nSalary: ${emp.salary:,.2f}\nJoining Date: {emp.joining_date}\nEmail: {emp.email}\nPhone: {emp.phone}\nAddress: {emp.address}\nPerformance: {emp.performance_rating}\nSkills: {emp.skills}\nStatus: {emp.status}"
             messagebox.showinfo("Employee Details", info)
 
     def add_employee(self):
         """Add a new employee to the database"""
         try:
             data = {k: v.get() for k, v in self.form_vars.items()}
+            data['skills'] = self.form_widgets['skills'].get('1.0', tk.END).strip()
             address = self.address_text.get('1.0', tk.END).strip()
-            self.cursor.execute('''
-                INSERT INTO employees (name, age, department, position, salary, joining_date, email, phone, address, performance_rating, skills, status)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            emp_id = insert_employee(self.cursor, (
                 data['name'], int(data['age']), data['department'], data['position'], float(data['salary']),
                 data['joining_date'], data['email'], data['phone'], address, float(data['performance_rating'] or 0), data['skills'], data['status']
             ))
+            self.sync_match_keys(emp_id, data['name'], data['email'], data['phone'])
+            self.sync_employee_skills(emp_id, data['skills'], data['department'])
             self.connection.commit()
-            self.refresh_employee_list()
+            self.salary_bands.add(data['department'], data['position'], data['joining_date'], float(data['salary']))
+            self.events.publish('employees', action='insert', emp_ids=[emp_id])
             messagebox.showinfo("Success", "Employee added successfully!")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to add employee: {e}")
@@ -951,20 +4695,33 @@ class ModernEmployeeManagementSystem:
         """Update selected employee in the database"""
         try:
             data = {k: v.get() for k, v in self.form_vars.items()}
+            data['skills'] = self.form_widgets['skills'].get('1.0', tk.END).strip()
             address = self.address_text.get('1.0', tk.END).strip()
             emp_id = data['emp_id']
             if not emp_id:
                 messagebox.showwarning("Update", "Select an employee to update.")
                 return
-            self.cursor.execute('''
-                UPDATE employees SET name=?, age=?, department=?, position=?, salary=?, joining_date=?, email=?, phone=?, address=?, performance_rating=?, skills=?, status=?, updated_at=CURRENT_TIMESTAMP
-                WHERE emp_id=?
-            ''', (
-                data['name'], int(data['age']), data['department'], data['position'], float(data['salary']),
-                data['joining_date'], data['email'], data['phone'], address, float(data['performance_rating'] or 0), data['skills'], data['status'], emp_id
-            ))
+            values = (data['name'], int(data['age']), data['department'], data['position'], float(data['salary']),
+                      data['joining_date'], data['email'], data['phone'], address, float(data['performance_rating'] or 0),
+                      data['skills'], data['status'])
+            index, local_id = self.federation.split(emp_id) if self.federation else (0, emp_id)
+            if index:
+                self.write_shard_employee(index, local_id, values, data)
+                self.record_cache.invalidate([int(emp_id)])
+                self.events.publish('employees', action='update', emp_ids=[int(emp_id)])
+                messagebox.showinfo("Success", f"Employee updated in {self.federation.shards[index][0]}.")
+                return
+            self.cursor.execute(QUERIES['employee_segments'], (emp_id,))
+            previous = self.cursor.fetchone()
+            self.cursor.execute(QUERIES['update_employee'], values + (emp_id,))
+            self.sync_match_keys(emp_id, data['name'], data['email'], data['phone'])
+            self.sync_employee_skills(emp_id, data['skills'], data['department'])
             self.connection.commit()
-            self.refresh_employee_list()
+            self.record_cache.invalidate([emp_id])
+            if previous:
+                self.salary_bands.invalidate(*previous)
+            self.salary_bands.invalidate(data['department'], data['position'], data['joining_date'])
+            self.events.publish('employees', action='update', emp_ids=[int(emp_id)])
             messagebox.showinfo("Success", "Employee updated successfully!")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to update employee: {e}")
@@ -974,6 +4731,7 @@ class ModernEmployeeManagementSystem:
         for var in self.form_vars.values():
             var.set("")
         self.address_text.delete('1.0', tk.END)
+        self.form_widgets['skills'].delete('1.0', tk.END)
 
     def delete_employee(self):
         """Delete selected employee"""
@@ -983,83 +4741,756 @@ class ModernEmployeeManagementSystem:
             return
         emp_id = self.tree.item(selected[0], 'values')[0]
         if messagebox.askyesno("Delete", "Are you sure you want to delete this employee?"):
-            self.cursor.execute("DELETE FROM employees WHERE emp_id=?", (emp_id,))
+            index, local_id = self.federation.split(emp_id) if self.federation else (0, emp_id)
+            if index:
+                self.write_shard_employee(index, local_id)
+                self.record_cache.invalidate([int(emp_id)])
+                self.events.publish('employees', action='delete', emp_ids=[int(emp_id)])
+                messagebox.showinfo("Deleted", f"Employee deleted from {self.federation.shards[index][0]}.")
+                return
+            self.cursor.execute(QUERIES['employee_segments'], (emp_id,))
+            previous = self.cursor.fetchone()
+            self.cursor.execute(QUERIES['delete_employee'], (emp_id,))
+            self.remove_employee_skills(emp_id)
+            self.remove_match_keys(emp_id)
             self.connection.commit()
-            self.refresh_employee_list()
+            self.record_cache.invalidate([emp_id])
+            if previous:
+                self.salary_bands.invalidate(*previous)
+            self.events.publish('employees', action='delete', emp_ids=[int(emp_id)])
             messagebox.showinfo("Deleted", "Employee deleted successfully.")
 
+    def write_shard_employee(self, index, local_id, values=None, data=None):
+        """Route an update (values) or a delete (no values) to the business-unit database that owns the row"""
+        def statements(cursor):
+            if values is None:
+                cursor.execute(QUERIES['delete_employee'], (local_id,))
+                cursor.execute("DELETE FROM employee_skills WHERE emp_id=?", (local_id,))
+                cursor.execute("DELETE FROM employee_match_keys WHERE emp_id=?", (local_id,))
+            else:
+                cursor.execute(QUERIES['update_employee'], values + (local_id,))
+                write_employee_skills(cursor, local_id, parse_skills(data['skills']))
+                write_match_keys(cursor, local_id, data['name'], data['email'], data['phone'])
+        self.federation.write(index, statements)
+
     def export_to_csv(self):
         """Export employee data to CSV"""
         file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV Files", "*.csv")])
         if not file_path:
             return
-        self.cursor.execute("SELECT * FROM employees")
-        rows = self.cursor.fetchall()
-        headers = [description[0] for description in self.cursor.description]
+        if self.columnar is not None:
+            headers, chunks = EMPLOYEE_COLUMNS, [self.columnar.employee_rows()]
+        else:
+            cursor = self.federation.export_cursor() if self.federation else self.cursor.execute("SELECT * FROM employees")
+            headers = [description[0] for description in cursor.description]
+            chunks = iter(lambda: cursor.fetchmany(REPORT_CHUNK_SIZE), [])
         with open(file_path, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             writer.writerow(headers)
-            writer.writerows(rows)
+            for rows in chunks:
+                writer.writerows(rows)
         messagebox.showinfo("Export", "Employee data exported to CSV successfully.")
 
     def import_from_csv(self):
-        """Import employee data from CSV"""
+        """Import employee data from CSV, skipping rows that duplicate existing employees"""
         file_path = filedialog.askopenfilename(filetypes=[("CSV Files", "*.csv")])
         if not file_path:
             return
+        imported = skipped = flagged = 0
         with open(file_path, 'r', encoding='utf-8') as f:
             reader = csv.DictReader(f)
-            for row in reader:
-                try:
-                    self.cursor.execute('''
-                        INSERT INTO employees (name, age, department, position, salary, joining_date, email, phone, address, performance_rating, skills, status)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        row['name'], int(row['age']), row['department'], row['position'], float(row['salary']),
-                        row['joining_date'], row['email'], row['phone'], row['address'], float(row['performance_rating'] or 0), row['skills'], row['status']
-                    ))
-                except Exception:
-                    continue
-            self.connection.commit()
-        self.refresh_employee_list()
-        messagebox.showinfo("Import", "Employee data imported from CSV successfully.")
+            while True:
+                batch = list(itertools.islice(reader, IMPORT_BATCH_SIZE))
+                if not batch:
+                    break
+                # One blocking-key lookup per batch; rows inserted earlier in this batch are checked in memory
+                matches = find_existing_matches(self.cursor, [(row.get('name'), row.get('email'), row.get('phone')) for row in batch])
+                batch_blocks = {}
+                for row, match in zip(batch, matches):
+                    record = (row.get('name'), row.get('email'), row.get('phone'))
+                    keys = match_keys(*record)
+                    for emp_id, other in (pair for key in keys for pair in batch_blocks.get(key, ())):
+                        score = match_score(record, other)
+                        if not match or score > match[1]:
+                            match = (emp_id, score)
+                    if match and match[1] >= DUPLICATE_THRESHOLD:
+                        skipped += 1
+                        continue
+                    try:
+                        emp_id = insert_employee(self.cursor, (
+                            row['name'], int(row['age']), row['department'], row['position'], float(row['salary']),
+                            row['joining_date'], row['email'], row['phone'], row['address'], float(row['performance_rating'] or 0), row['skills'], row['status']
+                        ))
+                        self.sync_match_keys(emp_id, *record)
+                        self.sync_employee_skills(emp_id, row['skills'], row['department'])
+                        self.salary_bands.add(row['department'], row['position'], row['joining_date'], float(row['salary']))
+                    except Exception:
+                        continue
+                    imported += 1
+                    for key in keys:
+                        batch_blocks.setdefault(key, []).append((emp_id, record))
+                    if match and match[1] >= REVIEW_THRESHOLD:
+                        self.cursor.execute("INSERT OR REPLACE INTO duplicate_candidates (emp_id_a, emp_id_b, score) VALUES (?, ?, ?)",
+                                            (min(match[0], emp_id), max(match[0], emp_id), match[1]))
+                        flagged += 1
+                self.connection.commit()
+        self.events.publish('employees', action='import', emp_ids=None)
+        messagebox.showinfo("Import", f"Imported {imported} employees from CSV.\n"
+                                      f"Skipped {skipped} duplicates; {flagged} possible duplicates queued for review.")
 
     def generate_report(self):
-        """Generate a simple employee report"""
-        self.cursor.execute("SELECT department, COUNT(*) FROM employees GROUP BY department")
-        dept_counts = self.cursor.fetchall()
-        report = "Employee Report\n\nDepartment-wise Count:\n"
-        for dept, count in dept_counts:
-            report += f"{dept}: {count}\n"
-        messagebox.showinfo("Report", report)
+        """Report dialog: queue templated reports to worker processes and follow their progress"""
+        if self.report_runner is None:
+            self.report_runner = ReportRunner()
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Reports")
+        dialog.geometry("760x420")
+
+        form = ttk.Frame(dialog)
+        form.pack(fill='x', padx=15, pady=10)
+        ttk.Label(form, text="Report:").pack(side='left')
+        template_combo = ttk.Combobox(form, values=list(REPORT_TEMPLATES), state='readonly', width=16)
+        template_combo.set('headcount')
+        template_combo.pack(side='left', padx=5)
+        ttk.Label(form, text="Format:").pack(side='left', padx=(10, 0))
+        format_combo = ttk.Combobox(form, values=list(REPORT_FORMATS), state='readonly', width=8)
+        format_combo.set('pdf')
+        format_combo.pack(side='left', padx=5)
+
+        columns = ('Job', 'Report', 'Format', 'Progress', 'Status', 'File')
+        jobs_tree = ttk.Treeview(dialog, columns=columns, show='headings', height=12)
+        for col in columns:
+            jobs_tree.heading(col, text=col)
+            jobs_tree.column(col, width=260 if col == 'File' else 80, anchor='center')
+        jobs_tree.pack(fill='both', expand=True, padx=15)
+
+        def start():
+            template, fmt = template_combo.get(), format_combo.get()
+            path = filedialog.asksaveasfilename(parent=dialog, defaultextension=f".{fmt}",
+                                                initialfile=f"{template}_{datetime.now():%Y%m%d}.{fmt}",
+                                                filetypes=[(fmt.upper(), f"*.{fmt}")])
+            if not path:
+                return
+            job_id = self.report_runner.submit(self.db_path, template, fmt, path)
+            jobs_tree.insert('', 'end', iid=str(job_id), values=(job_id, template, fmt, "0%", "Queued", path))
+            if not polling['active']:
+                poll()
+
+        def cancel():
+            for iid in jobs_tree.selection():
+                self.report_runner.cancel(int(iid))
+
+        polling = {'active': False}
+
+        def poll():
+            polling['active'] = False
+            if not dialog.winfo_exists():
+                return
+            for job_id, (done, total) in self.report_runner.drain_progress().items():
+                if jobs_tree.exists(str(job_id)):
+                    jobs_tree.set(str(job_id), 'Progress', f"{done / total:.0%}" if total else "100%")
+                    jobs_tree.set(str(job_id), 'Status', "Running")
+            running = False
+            for iid in jobs_tree.get_children():
+                future, _ = self.report_runner.jobs[int(iid)]
+                if not future.done():
+                    running = True
+                    continue
+                if jobs_tree.set(iid, 'Status') in ("Done", "Cancelled", "Failed"):
+                    continue
+                if future.cancelled():
+                    jobs_tree.set(iid, 'Status', "Cancelled")
+                elif isinstance(future.exception(), ReportCancelled):
+                    jobs_tree.set(iid, 'Status', "Cancelled")
+                elif future.exception():
+                    jobs_tree.set(iid, 'Status', "Failed")
+                    messagebox.showerror("Reports", f"Report {iid} failed: {future.exception()}", parent=dialog)
+                else:
+                    jobs_tree.set(iid, 'Progress', "100%")
+                    jobs_tree.set(iid, 'Status', "Done")
+            if running:
+                polling['active'] = True
+                dialog.after(200, poll)
+
+        buttons = ttk.Frame(dialog)
+        buttons.pack(fill='x', padx=15, pady=10)
+        ttk.Button(buttons, text="Generate", command=start, style='Primary.TButton').pack(side='left', padx=5)
+        ttk.Button(buttons, text="Cancel Selected", command=cancel, style='Danger.TButton').pack(side='left', padx=5)
 
     def advanced_search(self):
         """Advanced search/filter employees"""
-        query = "SELECT emp_id, name, age, department, position, salary, status, performance_rating, joining_date FROM employees WHERE 1=1"
-        params = []
-        if self.search_var.get():
-            query += " AND (name LIKE ? OR department LIKE ? OR position LIKE ?)"
-            val = f"%{self.search_var.get()}%"
-            params.extend([val, val, val])
-        if self.dept_filter.get() and self.dept_filter.get() != "All":
-            query += " AND department=?"
-            params.append(self.dept_filter.get())
-        if self.status_filter.get() and self.status_filter.get() != "All":
-            query += " AND status=?"
-            params.append(self.status_filter.get())
-        self.cursor.execute(query, params)
-        rows = self.cursor.fetchall()
+        _, params = self.build_filter_clause()
+        if self.columnar is not None:
+            rows = self.columnar.search(params, ANOMALY_THRESHOLD if self.anomaly_filter.get() else None)
+        elif self.anomaly_filter.get() and not self.federation:
+            self.refresh_anomalies()
+            self.cursor.execute(QUERIES['search_anomalies'], params + [ANOMALY_THRESHOLD])
+            rows = self.cursor.fetchall()
+        elif self.federation:
+            rows = self.federation.search(params)
+        else:
+            self.cursor.execute(query_registry(self.connection)['search_employees'], params)
+            rows = self.cursor.fetchall()
         self.tree.delete(*self.tree.get_children())
-        for row in rows:
-            self.tree.insert('', 'end', values=row)
+        self.populate_tree(rows)
+
+    def build_filter_clause(self):
+        """WHERE clause and parameters for the current search filters"""
+        return SEARCH_WHERE, search_params(self.search_var.get(), self.dept_filter.get(), self.status_filter.get())
 
     def reset_filters(self):
         """Reset all search filters"""
         self.search_var.set("")
         self.dept_filter.set("All")
         self.status_filter.set("All")
+        self.anomaly_filter.set(False)
         self.refresh_employee_list()
 
+    # --- Bulk Operations ---
+    def bulk_scope_clause(self, scope, min_rating=None):
+        """WHERE clause selecting the rows of a bulk operation ('selection' or 'filters')"""
+        if scope == 'selection':
+            emp_ids = [int(self.tree.item(iid, 'values')[0]) for iid in self.tree.selection()]
+            where, params = "emp_id IN (SELECT value FROM json_each(?))", [json.dumps(emp_ids)]
+        else:
+            where, params = self.build_filter_clause()
+        if min_rating is not None:
+            where += " AND performance_rating >= ?"
+            params.append(min_rating)
+        return where, params
+
+    def preview_bulk_update(self, operation, value, scope, min_rating=None):
+        """Return (row count, payroll delta, sample rows) without changing anything"""
+        column, expression = BULK_OPERATIONS[operation]
+        where, params = self.bulk_scope_clause(scope, min_rating)
+        self.cursor.execute(f"SELECT COUNT(*), COALESCE(SUM(salary), 0) FROM employees WHERE {where}", params)
+        count, payroll = self.cursor.fetchone()
+        self.cursor.execute(f"SELECT emp_id, name, department, {column}, {expression} FROM employees WHERE {where} LIMIT 50",
+                            [value] + params)
+        sample = self.cursor.fetchall()
+        payroll_delta = payroll * value / 100 if column == 'salary' else 0
+        return count, payroll_delta, sample
+
+    def apply_bulk_update(self, operation, value, scope, min_rating=None, description=""):
+        """Apply one set-based UPDATE in a single transaction, journaling old values for rollback"""
+        column, expression = BULK_OPERATIONS[operation]
+        try:
+            where, params = self.bulk_scope_clause(scope, min_rating)
+            self.cursor.execute("INSERT INTO bulk_batches (description, column_name) VALUES (?, ?)",
+                                (description or f"{operation}: {value}", column))
+            batch_id = self.cursor.lastrowid
+            # New values are journaled too, so a rollback can tell which rows were edited after the batch
+            self.cursor.execute(f"INSERT INTO bulk_batch_rows (batch_id, emp_id, old_value, new_value) "
+                                f"SELECT ?, emp_id, {column}, {expression} FROM employees WHERE {where}",
+                                [batch_id, value] + params)
+            # Counted from the journal: UPDATEs through the encoded employees view report no changed rows
+            row_count = self.cursor.rowcount
+            self.cursor.execute(f'''
+                UPDATE employees SET {column} = (SELECT new_value FROM bulk_batch_rows r
+                                                 WHERE r.batch_id=? AND r.emp_id=employees.emp_id),
+                                     updated_at=CURRENT_TIMESTAMP
+                WHERE emp_id IN (SELECT emp_id FROM bulk_batch_rows WHERE batch_id=?)
+            ''', (batch_id, batch_id))
+            self.cursor.execute("UPDATE bulk_batches SET row_count=? WHERE batch_id=?", (row_count, batch_id))
+            self.connection.commit()
+        except sqlite3.Error:
+            self.connection.rollback()
+            raise
+        self.after_bulk_change(batch_id, column)
+        return batch_id, row_count
+
+    def rollback_bulk_batch(self, batch_id):
+        """Restore the values a bulk batch overwrote, as one transaction; rows edited since the batch keep their
+        current value and their emp_ids are returned"""
+        self.cursor.execute("SELECT column_name, rolled_back_at FROM bulk_batches WHERE batch_id=?", (batch_id,))
+        row = self.cursor.fetchone()
+        if not row:
+            raise ValueError(f"Unknown batch {batch_id}")
+        column, rolled_back_at = row
+        if rolled_back_at:
+            raise ValueError(f"Batch {batch_id} was already rolled back")
+        if column not in {col for col, _ in BULK_OPERATIONS.values()}:
+            raise ValueError(f"Unsupported column {column}")
+        try:
+            self.cursor.execute(f'''
+                UPDATE employees SET {column} = (SELECT old_value FROM bulk_batch_rows r
+                                                 WHERE r.batch_id=? AND r.emp_id=employees.emp_id),
+                                     updated_at=CURRENT_TIMESTAMP
+                WHERE emp_id IN (SELECT emp_id FROM bulk_batch_rows r
+                                 WHERE r.batch_id=? AND r.new_value IS employees.{column})
+            ''', (batch_id, batch_id))
+            # Read inside the same transaction, so no edit can slip in between the restore and this check
+            self.cursor.execute(f'''
+                SELECT r.emp_id FROM bulk_batch_rows r JOIN employees e ON e.emp_id = r.emp_id
+                WHERE r.batch_id=? AND e.{column} IS NOT r.old_value ORDER BY r.emp_id
+            ''', (batch_id,))
+            conflicts = [emp_id for (emp_id,) in self.cursor.fetchall()]
+            self.cursor.execute("UPDATE bulk_batches SET rolled_back_at=CURRENT_TIMESTAMP WHERE batch_id=?", (batch_id,))
+            self.connection.commit()
+        except sqlite3.Error:
+            self.connection.rollback()
+            raise
+        self.after_bulk_change(batch_id, column)
+        return conflicts
+
+    def after_bulk_change(self, batch_id, column):
+        """Invalidate the caches touched by a bulk batch and announce its rows"""
+        self.cursor.execute('''
+            SELECT e.emp_id, e.department FROM bulk_batch_rows r JOIN employees e ON e.emp_id = r.emp_id
+            WHERE r.batch_id=?
+        ''', (batch_id,))
+        rows = self.cursor.fetchall()
+        emp_ids = [emp_id for emp_id, _ in rows]
+        self.record_cache.invalidate(emp_ids)
+        if column == 'department':
+            for emp_id, department in rows:
+                self.skill_index.departments[emp_id] = department
+        if column in ('salary', 'department', 'position'):
+            self.salary_bands.invalidate_all()
+        self.events.publish('employees', action='update', emp_ids=emp_ids)
+
+    def refresh_tree_rows(self, emp_ids):
+        """Update only the given directory rows in place and return their fresh values"""
+        records = [EmployeeRecord(row) for row in self.fetch_employee_rows(emp_ids)]
+        self.record_cache.invalidate(emp_ids)
+        for record in records:
+            if self.tree.exists(str(record.emp_id)):
+                self.tree.item(str(record.emp_id), values=self.directory_row(record.directory_values()))
+                self.record_cache.put(record)
+        return records
+
+    def open_bulk_update_dialog(self):
+        """Dialog to preview, apply and roll back bulk updates"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Bulk Update")
+        dialog.geometry("820x640")
+
+        form = ttk.LabelFrame(dialog, text="Operation", padding=15)
+        form.pack(fill='x', padx=15, pady=10)
+
+        selected_count = len(self.tree.selection())
+        scope_var = tk.StringVar(value='selection' if selected_count else 'filters')
+        ttk.Label(form, text="Apply to:").grid(row=0, column=0, sticky='w', pady=5)
+        ttk.Radiobutton(form, text=f"Selected rows ({selected_count})", variable=scope_var,
+                        value='selection').grid(row=0, column=1, sticky='w')
+        ttk.Radiobutton(form, text="All rows matching current search filters", variable=scope_var,
+                        value='filters').grid(row=0, column=2, sticky='w')
+
+        ttk.Label(form, text="Operation:").grid(row=1, column=0, sticky='w', pady=5)
+        operation_combo = ttk.Combobox(form, values=list(BULK_OPERATIONS), state='readonly', width=25)
+        operation_combo.set(next(iter(BULK_OPERATIONS)))
+        operation_combo.grid(row=1, column=1, sticky='w')
+
+        ttk.Label(form, text="Value:").grid(row=2, column=0, sticky='w', pady=5)
+        value_combo = ttk.Combobox(form, width=25)
+        value_combo.grid(row=2, column=1, sticky='w')
+
+        def on_operation_change(event=None):
+            column = BULK_OPERATIONS[operation_combo.get()][0]
+            if column in ('department', 'status'):
+                value_combo['values'] = self.form_widgets[column]['values']
+            else:
+                value_combo['values'] = ()
+        operation_combo.bind("<<ComboboxSelected>>", on_operation_change)
+        on_operation_change()
+
+        ttk.Label(form, text="Min. rating (optional):").grid(row=3, column=0, sticky='w', pady=5)
+        rating_var = tk.StringVar()
+        ttk.Entry(form, textvariable=rating_var, width=10).grid(row=3, column=1, sticky='w')
+
+        ttk.Label(form, text="Description:").grid(row=4, column=0, sticky='w', pady=5)
+        description_var = tk.StringVar()
+        ttk.Entry(form, textvariable=description_var, width=50).grid(row=4, column=1, columnspan=2, sticky='w')
+
+        summary_var = tk.StringVar(value="Click Preview to see the impact.")
+        ttk.Label(dialog, textvariable=summary_var, font=('Segoe UI', 10, 'bold')).pack(anchor='w', padx=15)
+
+        preview_tree = ttk.Treeview(dialog, columns=('ID', 'Name', 'Department', 'Current', 'New'), show='headings', height=8)
+        for col in ('ID', 'Name', 'Department', 'Current', 'New'):
+            preview_tree.heading(col, text=col)
+            preview_tree.column(col, width=120, anchor='center')
+        preview_tree.pack(fill='x', padx=15, pady=5)
+
+        def read_inputs():
+            operation = operation_combo.get()
+            raw = value_combo.get().strip()
+            if not raw:
+                raise ValueError("Enter a value for the operation.")
+            value = float(raw) if BULK_OPERATIONS[operation][0] == 'salary' else raw
+            min_rating = float(rating_var.get()) if rating_var.get().strip() else None
+            return operation, value, scope_var.get(), min_rating
+
+        def preview():
+            try:
+                operation, value, scope, min_rating = read_inputs()
+                count, payroll_delta, sample = self.preview_bulk_update(operation, value, scope, min_rating)
+            except (ValueError, sqlite3.Error) as e:
+                messagebox.showerror("Bulk Update", str(e), parent=dialog)
+                return
+            summary = f"{count} employees will be updated."
+            if payroll_delta:
+                summary += f" Annual payroll change: ${payroll_delta:+,.2f}"
+            summary_var.set(summary)
+            preview_tree.delete(*preview_tree.get_children())
+            for row in sample:
+                preview_tree.insert('', 'end', values=row)
+
+        def apply():
+            try:
+                operation, value, scope, min_rating = read_inputs()
+                count, _, _ = self.preview_bulk_update(operation, value, scope, min_rating)
+                if not messagebox.askyesno("Bulk Update", f"Apply '{operation}' to {count} employees?", parent=dialog):
+                    return
+                batch_id, row_count = self.apply_bulk_update(operation, value, scope, min_rating, description_var.get().strip())
+            except (ValueError, sqlite3.Error) as e:
+                messagebox.showerror("Bulk Update", f"Bulk update failed and was rolled back: {e}", parent=dialog)
+                return
+            summary_var.set(f"Batch #{batch_id} applied to {row_count} employees.")
+            load_batches()
+
+        button_row = ttk.Frame(dialog)
+        button_row.pack(fill='x', padx=15, pady=5)
+        ttk.Button(button_row, text="Preview", command=preview, style='Modern.TButton').pack(side='left', padx=5)
+        ttk.Button(button_row, text="Apply", command=apply, style='Success.TButton').pack(side='left', padx=5)
+
+        batches_frame = ttk.LabelFrame(dialog, text="Recent Batches", padding=10)
+        batches_frame.pack(fill='both', expand=True, padx=15, pady=10)
+        batches_tree = ttk.Treeview(batches_frame, columns=('Batch', 'Description', 'Rows', 'Applied', 'Rolled Back'),
+                                    show='headings', height=6)
+        for col, width in (('Batch', 60), ('Description', 280), ('Rows', 60), ('Applied', 140), ('Rolled Back', 140)):
+            batches_tree.heading(col, text=col)
+            batches_tree.column(col, width=width, anchor='center')
+        batches_tree.pack(fill='both', expand=True)
+
+        def load_batches():
+            batches_tree.delete(*batches_tree.get_children())
+            self.cursor.execute('''
+                SELECT batch_id, description, row_count, applied_at, COALESCE(rolled_back_at, '')
+                FROM bulk_batches ORDER BY batch_id DESC LIMIT 50
+            ''')
+            for row in self.cursor.fetchall():
+                batches_tree.insert('', 'end', values=row)
+
+        def rollback():
+            selected = batches_tree.selection()
+            if not selected:
+                return
+            batch_id = batches_tree.item(selected[0], 'values')[0]
+            if not messagebox.askyesno("Rollback", f"Restore all values overwritten by batch #{batch_id}?", parent=dialog):
+                return
+            try:
+                conflicts = self.rollback_bulk_batch(batch_id)
+            except (ValueError, sqlite3.Error) as e:
+                messagebox.showerror("Rollback", str(e), parent=dialog)
+                return
+            summary_var.set(f"Batch #{batch_id} rolled back.")
+            if conflicts:
+                shown = ", ".join(f"#{emp_id}" for emp_id in conflicts[:20]) + (" …" if len(conflicts) > 20 else "")
+                summary_var.set(f"Batch #{batch_id} rolled back; {len(conflicts)} employees edited since kept their values.")
+                messagebox.showwarning("Rollback", f"{len(conflicts)} employees were edited after batch #{batch_id} "
+                                                   f"and kept their current values: {shown}", parent=dialog)
+            load_batches()
+
+        ttk.Button(batches_frame, text="Rollback Selected Batch", command=rollback,
+                   style='Danger.TButton').pack(anchor='e', pady=(10, 0))
+        load_batches()
+
+    # --- Duplicate Detection ---
+    def sync_match_keys(self, emp_id, name, email, phone):
+        """Rewrite the blocking keys of one employee (caller commits)"""
+        write_match_keys(self.cursor, emp_id, name, email, phone)
+
+    def remove_match_keys(self, emp_id):
+        """Drop an employee from the blocking index and review queue (caller commits)"""
+        self.cursor.execute("DELETE FROM employee_match_keys WHERE emp_id=?", (emp_id,))
+        self.cursor.execute("DELETE FROM duplicate_candidates WHERE status='pending' AND (emp_id_a=? OR emp_id_b=?)",
+                            (emp_id, emp_id))
+
+    def merge_employees(self, keep_id, drop_id):
+        """Merge drop_id into keep_id: fill empty fields, union skills, re-point reviews, delete drop_id"""
+        self.cursor.execute(QUERIES['employees_by_ids'], (json.dumps([int(keep_id), int(drop_id)]),))
+        records = {row[0]: EmployeeRecord(row) for row in self.cursor.fetchall()}
+        keep, drop = records.get(int(keep_id)), records.get(int(drop_id))
+        if not keep or not drop:
+            raise ValueError("Both employees must still exist to merge them.")
+        merged = {col: getattr(keep, col) if getattr(keep, col) not in (None, '') else getattr(drop, col)
+                  for col in ('email', 'phone', 'address', 'manager_id', 'last_promotion')}
+        merged['skills'] = ", ".join(parse_skills(f"{keep.skills or ''},{drop.skills or ''}"))
+        try:
+            self.cursor.execute('''
+                UPDATE employees SET email=?, phone=?, address=?, manager_id=?, last_promotion=?, skills=?, updated_at=CURRENT_TIMESTAMP
+                WHERE emp_id=?
+            ''', (merged['email'], merged['phone'], merged['address'], merged['manager_id'], merged['last_promotion'],
+                  merged['skills'], keep.emp_id))
+            self.cursor.execute("UPDATE performance_reviews SET emp_id=? WHERE emp_id=?", (keep.emp_id, drop.emp_id))
+            self.cursor.execute(QUERIES['delete_employee'], (drop.emp_id,))
+            self.cursor.execute("UPDATE duplicate_candidates SET status='merged' WHERE emp_id_a=? AND emp_id_b=?",
+                                (min(keep.emp_id, drop.emp_id), max(keep.emp_id, drop.emp_id)))
+            self.remove_match_keys(drop.emp_id)
+            self.remove_employee_skills(drop.emp_id)
+            self.sync_match_keys(keep.emp_id, keep.name, merged['email'], merged['phone'])
+            self.sync_employee_skills(keep.emp_id, merged['skills'], keep.department)
+            self.connection.commit()
+        except sqlite3.Error:
+            self.connection.rollback()
+            raise
+        self.salary_bands.invalidate(drop.department, drop.position, drop.joining_date)
+        self.record_cache.invalidate([keep.emp_id, drop.emp_id])
+        self.events.publish('employees', action='delete', emp_ids=[drop.emp_id])
+        self.events.publish('employees', action='update', emp_ids=[keep.emp_id])
+
+    def open_duplicate_review(self):
+        """Merge-review dialog for possible duplicate employees"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Duplicate Review")
+        dialog.geometry("1100x560")
+
+        top_row = ttk.Frame(dialog)
+        top_row.pack(fill='x', padx=15, pady=10)
+        status_var = tk.StringVar(value="Pending candidates from imports and previous scans.")
+        ttk.Label(top_row, textvariable=status_var, font=('Segoe UI', 10, 'bold')).pack(side='left')
+
+        columns = ('Score', 'ID A', 'Name A', 'Email A', 'Phone A', 'ID B', 'Name B', 'Email B', 'Phone B')
+        review_tree = ttk.Treeview(dialog, columns=columns, show='headings', height=18)
+        for col in columns:
+            review_tree.heading(col, text=col)
+            review_tree.column(col, width=60 if col.startswith(('Score', 'ID')) else 140, anchor='center')
+        review_tree.pack(fill='both', expand=True, padx=15)
+
+        def load_candidates():
+            review_tree.delete(*review_tree.get_children())
+            self.cursor.execute('''
+                SELECT printf('%.2f', d.score), a.emp_id, a.name, a.email, a.phone, b.emp_id, b.name, b.email, b.phone
+                FROM duplicate_candidates d
+                JOIN employees a ON a.emp_id = d.emp_id_a
+                JOIN employees b ON b.emp_id = d.emp_id_b
+                WHERE d.status = 'pending'
+                ORDER BY d.score DESC LIMIT 500
+            ''')
+            for row in self.cursor.fetchall():
+                review_tree.insert('', 'end', values=row)
+
+        def selected_pair():
+            selected = review_tree.selection()
+            if not selected:
+                messagebox.showwarning("Duplicate Review", "Select a candidate pair first.", parent=dialog)
+                return None
+            values = review_tree.item(selected[0], 'values')
+            return int(values[1]), int(values[5])
+
+        def merge(keep_first):
+            pair = selected_pair()
+            if not pair:
+                return
+            keep_id, drop_id = pair if keep_first else pair[::-1]
+            if not messagebox.askyesno("Merge", f"Merge employee #{drop_id} into #{keep_id} and delete #{drop_id}?", parent=dialog):
+                return
+            try:
+                self.merge_employees(keep_id, drop_id)
+            except (ValueError, sqlite3.Error) as e:
+                messagebox.showerror("Merge", str(e), parent=dialog)
+                return
+            load_candidates()
+
+        def dismiss():
+            pair = selected_pair()
+            if not pair:
+                return
+            self.cursor.execute("UPDATE duplicate_candidates SET status='dismissed' WHERE emp_id_a=? AND emp_id_b=?", pair)
+            self.connection.commit()
+            load_candidates()
+
+        def scan():
+            # Full scans run on their own connection so the window stays responsive
+            scan_button.state(['disabled'])
+            status_var.set("Scanning directory for duplicates...")
+            result = {}
+
+            def worker():
+                connection = connect_database(self.db_path, 'write_heavy')
+                try:
+                    result['found'] = find_duplicate_candidates(
+                        connection, progress=lambda done, total: result.update(progress=(done, total)))
+                except sqlite3.Error as e:
+                    result['error'] = e
+                finally:
+                    connection.close()
+
+            def poll():
+                if thread.is_alive():
+                    if 'progress' in result:
+                        status_var.set("Scoring candidate pairs: {}/{}".format(*result['progress']))
+                    dialog.after(200, poll)
+                    return
+                scan_button.state(['!disabled'])
+                if 'error' in result:
+                    status_var.set(f"Scan failed: {result['error']}")
+                else:
+                    status_var.set(f"Scan complete: {result['found']} possible duplicate pairs.")
+                load_candidates()
+
+            thread = threading.Thread(target=worker, daemon=True)
+            thread.start()
+            poll()
+
+        button_row = ttk.Frame(dialog)
+        button_row.pack(fill='x', padx=15, pady=10)
+        scan_button = ttk.Button(button_row, text="Scan Directory", command=scan, style='Primary.TButton')
+        scan_button.pack(side='left', padx=5)
+        ttk.Button(button_row, text="Merge into A", command=lambda: merge(True), style='Success.TButton').pack(side='left', padx=5)
+        ttk.Button(button_row, text="Merge into B", command=lambda: merge(False), style='Success.TButton').pack(side='left', padx=5)
+        ttk.Button(button_row, text="Not a Duplicate", command=dismiss, style='Modern.TButton').pack(side='left', padx=5)
+        load_candidates()
+
+    # --- Skill Inventory ---
+    def sync_employee_skills(self, emp_id, skills_text, department=None):
+        """Rewrite the employee-skill mapping for one employee (caller commits)"""
+        names = parse_skills(skills_text)
+        write_employee_skills(self.cursor, emp_id, names)
+        self.skill_index.set_employee(int(emp_id), names, department)
+
+    def remove_employee_skills(self, emp_id):
+        """Remove an employee from the skill mapping and index (caller commits)"""
+        self.cursor.execute("DELETE FROM employee_skills WHERE emp_id=?", (emp_id,))
+        self.skill_index.remove_employee(int(emp_id))
+
+    def load_skill_index(self):
+        """Load the in-memory skill index from employee_skills (or a snapshot's skills column)"""
+        if self.columnar is not None:
+            self.skill_index = SkillIndex()
+            for emp_id, department, skills in zip(*(self.columnar.values('employees', column)
+                                                    for column in ('emp_id', 'department', 'skills'))):
+                self.skill_index.set_employee(emp_id, parse_skills(skills), department)
+            return
+        if not self.cursor:
+            return
+        employees = {}
+        self.cursor.execute('''
+            SELECT e.emp_id, e.department, s.name FROM employees e
+            LEFT JOIN employee_skills es ON es.emp_id = e.emp_id
+            LEFT JOIN skills s ON s.skill_id = es.skill_id
+        ''')
+        for emp_id, department, skill in self.cursor.fetchall():
+            entry = employees.setdefault(emp_id, (department, []))
+            if skill:
+                entry[1].append(skill)
+        self.skill_index = SkillIndex()
+        for emp_id, (department, skills) in employees.items():
+            self.skill_index.set_employee(emp_id, skills, department)
+
+    def fetch_employee_summaries(self, emp_ids):
+        """Fetch (emp_id, name, department, skills) rows keyed by emp_id"""
+        if self.columnar is not None:
+            return {row[0]: (row[0], row[1], row[3], row[11]) for row in self.columnar.employee_rows(emp_ids)}
+        self.cursor.execute(QUERIES['employee_summaries_by_ids'], (json.dumps([int(i) for i in emp_ids]),))
+        return {row[0]: row for row in self.cursor.fetchall()}
+
+    def create_skills_view(self):
+        """Create skill inventory view with boolean search, role matching and coverage gaps"""
+        self.skills_frame = ttk.Frame(self.main_content)
+
+        # Header
+        header_frame = ttk.Frame(self.skills_frame, style='Card.TFrame')
+        header_frame.pack(fill='x', pady=(0, 20))
+
+        ttk.Label(header_frame, text="🧠 Skill Inventory", style='Title.TLabel').pack(pady=20)
+
+        content_frame = ttk.Frame(self.skills_frame)
+        content_frame.pack(fill='both', expand=True)
+
+        # Left panel - boolean skill search and role matching
+        left_panel = ttk.Frame(content_frame)
+        left_panel.pack(side='left', fill='both', expand=True, padx=(0, 10))
+
+        query_frame = ttk.LabelFrame(left_panel, text="Skill Search (e.g. Docker AND AWS)", padding=15)
+        query_frame.pack(fill='both', expand=True, pady=(0, 10))
+
+        query_row = ttk.Frame(query_frame)
+        query_row.pack(fill='x', pady=(0, 10))
+        self.skill_query_var = tk.StringVar()
+        ttk.Entry(query_row, textvariable=self.skill_query_var, width=40, style='Modern.TEntry').pack(side='left')
+        ttk.Button(query_row, text="Search", command=self.run_skill_query, style='Primary.TButton').pack(side='left', padx=5)
+
+        self.skill_results = ttk.Treeview(query_frame, columns=('ID', 'Name', 'Department', 'Skills'),
+                                          show='headings', height=8)
+        for col, width in (('ID', 50), ('Name', 150), ('Department', 100), ('Skills', 250)):
+            self.skill_results.heading(col, text=col)
+            self.skill_results.column(col, width=width, anchor='center')
+        self.skill_results.pack(fill='both', expand=True)
+
+        match_frame = ttk.LabelFrame(left_panel, text="Closest Match for a Role", padding=15)
+        match_frame.pack(fill='both', expand=True)
+
+        match_row = ttk.Frame(match_frame)
+        match_row.pack(fill='x', pady=(0, 10))
+        ttk.Label(match_row, text="Required skills:").pack(side='left')
+        self.role_skills_var = tk.StringVar()
+        ttk.Entry(match_row, textvariable=self.role_skills_var, width=30, style='Modern.TEntry').pack(side='left', padx=5)
+        ttk.Label(match_row, text="Top K:").pack(side='left')
+        self.role_top_k = ttk.Spinbox(match_row, from_=1, to=100, width=5)
+        self.role_top_k.set(10)
+        self.role_top_k.pack(side='left', padx=5)
+        ttk.Button(match_row, text="Rank", command=self.run_role_match, style='Primary.TButton').pack(side='left', padx=5)
+
+        self.role_results = ttk.Treeview(match_frame, columns=('ID', 'Name', 'Department', 'Match', 'Missing'),
+                                         show='headings', height=8)
+        for col, width in (('ID', 50), ('Name', 150), ('Department', 100), ('Match', 70), ('Missing', 200)):
+            self.role_results.heading(col, text=col)
+            self.role_results.column(col, width=width, anchor='center')
+        self.role_results.pack(fill='both', expand=True)
+
+        # Right panel - coverage gaps per department
+        right_panel = ttk.LabelFrame(content_frame, text="Coverage Gaps by Department", padding=15)
+        right_panel.pack(side='right', fill='both', expand=True, padx=(10, 0))
+
+        target_row = ttk.Frame(right_panel)
+        target_row.pack(fill='x', pady=(0, 10))
+        ttk.Label(target_row, text="Target skills (blank = most common):").pack(side='left')
+        self.coverage_skills_var = tk.StringVar()
+        ttk.Entry(target_row, textvariable=self.coverage_skills_var, width=30, style='Modern.TEntry').pack(side='left', padx=5)
+        ttk.Button(target_row, text="Refresh", command=self.refresh_skill_coverage, style='Modern.TButton').pack(side='left')
+
+        self.coverage_tree = ttk.Treeview(right_panel, columns=('Department', 'Headcount', 'Covered', 'Missing'),
+                                          show='headings', height=20)
+        for col, width in (('Department', 100), ('Headcount', 80), ('Covered', 80), ('Missing', 300)):
+            self.coverage_tree.heading(col, text=col)
+            self.coverage_tree.column(col, width=width, anchor='center')
+        self.coverage_tree.pack(fill='both', expand=True)
+
+    def run_skill_query(self):
+        """Run a boolean skill query against the in-memory index"""
+        self.skill_results.delete(*self.skill_results.get_children())
+        expression = self.skill_query_var.get().strip()
+        if not expression:
+            return
+        rows = self.fetch_employee_summaries(self.skill_index.query(expression))
+        for emp_id in sorted(rows):
+            self.skill_results.insert('', 'end', values=rows[emp_id])
+
+    def run_role_match(self):
+        """Rank employees by how closely they cover a role's required skills"""
+        self.role_results.delete(*self.role_results.get_children())
+        required = parse_skills(self.role_skills_var.get())
+        try:
+            k = int(self.role_top_k.get())
+        except ValueError:
+            k = 10
+        matches = self.skill_index.closest_matches(required, k)
+        rows = self.fetch_employee_summaries(emp_id for emp_id, _, _ in matches)
+        for emp_id, score, missing in matches:
+            row = rows.get(emp_id)
+            if row:
+                self.role_results.insert('', 'end', values=(emp_id, row[1], row[2], f"{score:.0%}",
+                                                            ", ".join(missing) or "—"))
+
+    def refresh_skill_coverage(self):
+        """Show which target skills each department is missing"""
+        self.coverage_tree.delete(*self.coverage_tree.get_children())
+        target = parse_skills(self.coverage_skills_var.get()) or self.skill_index.top_skills()
+        for dept, (headcount, covered, missing) in self.skill_index.coverage_by_department(target).items():
+            self.coverage_tree.insert('', 'end', values=(dept, headcount, f"{len(covered)}/{len(target)}",
+                                                         ", ".join(missing) or "—"))
+
     # --- Settings View with More Features ---
     def create_settings_view(self):
         """Create settings view with more features"""
@@ -1094,6 +5525,19 @@ class ModernEmployeeManagementSystem:
         retention_spin.set(self.settings['data_retention_days'])
         retention_spin.grid(row=4, column=1, sticky='w', padx=10)
 
+        # Database connection profile
+        ttk.Label(content, text="Database Profile:", style='Subheading.TLabel').grid(row=5, column=0, sticky='w', pady=10)
+        # 'default' applies no PRAGMAs, so it could not undo a tuned profile on the open connection
+        profile_combo = ttk.Combobox(content, values=[name for name in CONNECTION_PROFILES if name != 'default'],
+                                     state='readonly', width=15)
+        profile_combo.set(self.settings['db_profile'])
+        profile_combo.grid(row=5, column=1, sticky='w', padx=10)
+
+        # Chart rendering mode
+        ttk.Label(content, text="Chart Rendering:", style='Subheading.TLabel').grid(row=6, column=0, sticky='w', pady=10)
+        chart_combo = ttk.Combobox(content, values=list(CHART_RENDER_MODES), state='readonly', width=15)
+        chart_combo.set(self.settings['chart_rendering'])
+        chart_combo.grid(row=6, column=1, sticky='w', padx=10)
         # Save button
         def save_settings():
             self.settings['theme'] = theme_combo.get()
@@ -1101,10 +5545,16 @@ class ModernEmployeeManagementSystem:
             self.settings['notification_sound'] = notif_var.get()
             self.settings['show_tooltips'] = tooltip_var.get()
             self.settings['data_retention_days'] = int(retention_spin.get())
+            if profile_combo.get() != self.settings['db_profile']:
+                self.settings['db_profile'] = profile_combo.get()
+                if self.connection:
+                    apply_connection_profile(self.connection, self.settings['db_profile'])
+            if chart_combo.get() != self.settings['chart_rendering']:
+                self.set_chart_rendering(chart_combo.get())
             messagebox.showinfo("Settings", "Settings saved successfully!")
             self.change_theme(self.settings['theme'])
 
-        ttk.Button(content, text="Save Settings", command=save_settings, style='Success.TButton').grid(row=5, column=0, columnspan=2, pady=20)
+        ttk.Button(content, text="Save Settings", command=save_settings, style='Success.TButton').grid(row=7, column=0, columnspan=2, pady=20)
 
         # Add more settings features as needed
 
@@ -1119,7 +5569,7 @@ class ModernEmployeeManagementSystem:
     # --- Navigation ---
     def show_view(self, view_name):
         """Show the selected view in the main content area"""
-        for frame in [getattr(self, f"{v}_frame", None) for v in ["dashboard", "employee", "analytics", "ai_insights", "settings"]]:
+        for frame in [getattr(self, f"{v}_frame", None) for v in ["dashboard", "employee", "analytics", "ai_insights", "skills", "settings"]]:
             if frame:
                 frame.pack_forget()
         if view_name == "dashboard":
@@ -1130,14 +5580,280 @@ class ModernEmployeeManagementSystem:
             self.analytics_frame.pack(fill='both', expand=True)
         elif view_name == "ai_insights":
             self.ai_insights_frame.pack(fill='both', expand=True)
+        elif view_name == "skills":
+            self.skills_frame.pack(fill='both', expand=True)
         elif view_name == "settings":
             self.settings_frame.pack(fill='both', expand=True)
+        self.refresh_scheduler.show(view_name)
+
+    # --- Change Events ---
+    def register_view_refreshes(self):
+        """Subscribe each view's refresh to the change topics it displays"""
+        self.refresh_scheduler.register("dashboard", lambda events: self.update_dashboard(), ['employees'])
+        self.refresh_scheduler.register("employees", self.apply_directory_changes, ['employees'])
+        self.refresh_scheduler.register("analytics", lambda events: self.update_analytics_charts(), ['employees'])
+        self.refresh_scheduler.register("skills", lambda events: self.refresh_skill_coverage(), ['employees'], stale=True)
+
+    def apply_directory_changes(self, events):
+        """Apply coalesced employee changes to the directory, reloading only for untargeted imports"""
+        self.refresh_anomalies()
+        if any(not event['emp_ids'] for event in events):
+            self.refresh_employee_list()
+            return
+        changed = {action: {int(emp_id) for event in events if event['action'] == action for emp_id in event['emp_ids']}
+                   for action in ('insert', 'update', 'delete')}
+        deleted = changed['delete']
+        self.tree.delete(*[str(emp_id) for emp_id in deleted if self.tree.exists(str(emp_id))])
+        inserted = sorted(emp_id for emp_id in changed['insert'] - deleted if not self.tree.exists(str(emp_id)))
+        if inserted:
+            records = [EmployeeRecord(row) for row in self.fetch_employee_rows(inserted)]
+            self.record_cache.put_many(records)
+            self.populate_tree(record.directory_values() for record in records)
+        updated = (changed['update'] | changed['insert']) - deleted - set(inserted)
+        if updated:
+            self.refresh_tree_rows(sorted(updated))
+
+    def on_local_change(self, event):
+        if event.get('source') != 'remote':
+            self.change_watcher.acknowledge_local()
+
+    def poll_external_changes(self):
+        """Cheap periodic check for commits by other instances"""
+        try:
+            rows = self.change_watcher.poll()
+        except sqlite3.Error as e:
+            self.status_var.set(f"Could not check for changes from other windows: {e}")
+            rows = []
+        if rows:
+            self.apply_external_changes(rows)
+        try:
+            # Bulk batches journal a row per employee, so a long session trims as it goes, not only at startup
+            self.change_watcher.prune()
+        except sqlite3.Error as e:
+            self.status_var.set(f"Could not trim the change journal: {e}")
+        self.root.after(CHANGE_POLL_MS, self.poll_external_changes)
+
+    def apply_external_changes(self, rows):
+        """Pull just the rows another instance changed into the caches, indexes and views"""
+        emp_ids = sorted({row[1] for row in rows})
+        inserted = {row[1] for row in rows if row[2] == 'insert'}
+        for old_segment in {tuple(row[3:]) for row in rows if row[2] != 'insert'}:
+            self.salary_bands.invalidate(*old_segment)
+        self.cursor.execute(QUERIES['employees_by_ids'], (json.dumps(emp_ids),))
+        records = {row[0]: EmployeeRecord(row) for row in self.cursor.fetchall()}
+        self.record_cache.invalidate(emp_ids)
+        for record in records.values():
+            self.salary_bands.invalidate(record.department, record.position, record.joining_date)
+            self.skill_index.set_employee(record.emp_id, parse_skills(record.skills or ""), record.department)
+        deleted = [emp_id for emp_id in emp_ids if emp_id not in records]
+        for emp_id in deleted:
+            self.skill_index.remove_employee(emp_id)
+        if deleted:
+            self.events.publish('employees', action='delete', emp_ids=deleted, source='remote')
+        for action, ids in (('insert', [i for i in records if i in inserted]),
+                            ('update', [i for i in records if i not in inserted])):
+            if ids:
+                self.events.publish('employees', action=action, emp_ids=ids, source='remote')
+
+    # --- Schema Migrations ---
+    def run_migrations_in_background(self):
+        """Run pending backfills and index builds on a worker connection; structural swaps wait for the Tk thread"""
+        if not self.migrator.pending():
+            return
+        state = {}
+
+        def worker():
+            connection = connect_database(self.db_path, 'write_heavy')
+            try:
+                state['complete'] = SchemaMigrator(connection).run_pending(
+                    progress=lambda migration, done: state.update(progress=(migration, done)),
+                    should_stop=self.migration_stop.is_set, defer_finalize=True)
+            except sqlite3.Error as e:
+                state['error'] = e
+            finally:
+                connection.close()
+
+        def poll():
+            if self.migration_thread.is_alive():
+                if 'progress' in state:
+                    migration, done = state['progress']
+                    self.status_var.set(f"Upgrading database: {migration.description} ({done:,} rows)")
+                self.root.after(500, poll)
+            elif 'error' in state:
+                self.status_var.set("Database upgrade failed; it resumes on the next start")
+                messagebox.showerror("Migration Error", f"Database upgrade failed: {state['error']}")
+            elif state.get('complete'):
+                self.migrations_finished()
+            elif not self.migration_stop.is_set() and self.finish_schema_swaps():
+                if self.migrator.pending():
+                    self.run_migrations_in_background()
+                else:
+                    self.migrations_finished()
+
+        self.status_var.set("Upgrading database schema in the background")
+        self.migration_thread = threading.Thread(target=worker, daemon=True)
+        self.migration_thread.start()
+        poll()
+
+    def finish_schema_swaps(self):
+        """Run ready structural swaps (table drops, view creation) on the main connection, between Tk events,
+        so no write from this window interleaves with them"""
+        try:
+            swapped = self.migrator.finalize_ready()
+        except sqlite3.Error as e:
+            messagebox.showerror("Migration Error", f"Could not finish the database upgrade: {e}")
+            return 0
+        if swapped:
+            self.status_var.set(f"Database schema at version {self.migrator.current_version()}")
+        return swapped
+
+    def migrations_finished(self):
+        """Reload what the backfills rebuilt"""
+        self.status_var.set(f"Database schema at version {self.migrator.current_version()}")
+        self.load_skill_index()
+        self.refresh_scheduler.stale.add("skills")
+        # The status history backfill bypasses the change journal, so rebuild every cohort
+        self.cohort_rollup.refresh(full=True)
+        self.refresh_scheduler.stale.add("analytics")
 
     # --- Main loop ---
     def run(self):
         self.root.mainloop()
+        self.migration_stop.set()
+        if self.migration_thread is not None:
+            # Backfills stop between batches and resume from schema_version next start
+            self.migration_thread.join(timeout=5)
+        self.chart_renderer.shutdown()
+        if self.report_runner is not None:
+            self.report_runner.shutdown()
+        if self.federation:
+            self.federation.shutdown()
+        self.workforce_projection.shutdown()
 
 # Entry point
 if __name__ == "__main__":
-    app = ModernEmployeeManagementSystem()
-    app.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="AI-Powered Employee Management System")
+    parser.add_argument('--db', dest='primary_db', default="advanced_employee_management.db",
+                        help="primary database the app opens and writes new employees to")
+    parser.add_argument('--shard', action='append', default=[], metavar='NAME=PATH',
+                        help="federate another business unit's database (repeatable)")
+    parser.add_argument('--snapshot', dest='snapshot_path', metavar='PATH',
+                        help="open a columnar snapshot read-only instead of a database")
+    subparsers = parser.add_subparsers(dest='command')
+    bench_parser = subparsers.add_parser('benchmark', help="compare SQLite connection profiles or the dictionary encoding")
+    bench_parser.add_argument('--suite', choices=('profiles', 'encoding'), default='profiles',
+                              help="connection profiles, or file size and grouped queries before/after migration 7")
+    bench_parser.add_argument('--rows', type=int, default=None,
+                              help="rows to load into the scratch database (default 100,000; 1,000,000 for encoding)")
+    bench_parser.add_argument('--searches', type=int, default=500, help="directory searches to time")
+    bench_parser.add_argument('--commits', type=int, default=300, help="single-row commits to time")
+    dedup_parser = subparsers.add_parser('dedup', help="scan the employee database for possible duplicates")
+    dedup_parser.add_argument('--db', default="advanced_employee_management.db", help="database file to scan")
+    load_parser = subparsers.add_parser('loadtest', help="simulate concurrent HR users against a database")
+    load_parser.add_argument('--db', default="advanced_employee_management.db", help="database to test (copied unless --in-place)")
+    load_parser.add_argument('--clients', default="1,4,8", help="comma-separated client counts to run")
+    load_parser.add_argument('--mix', default="editing", help=f"comma-separated mixes: {', '.join(LOAD_TEST_MIXES)}")
+    load_parser.add_argument('--duration', type=float, default=10, help="seconds per run")
+    load_parser.add_argument('--profile', choices=list(CONNECTION_PROFILES), default='read_heavy', help="client connection profile")
+    load_parser.add_argument('--rows', type=int, default=0, help="top the copy up to this many employees first")
+    load_parser.add_argument('--in-place', action='store_true', help="write to the database itself instead of a copy")
+    migrate_parser = subparsers.add_parser('migrate', help="apply pending schema migrations")
+    migrate_parser.add_argument('--db', default="advanced_employee_management.db", help="database file to migrate")
+    migrate_parser.add_argument('--batch-size', type=int, default=MIGRATION_BATCH_SIZE, help="rows per backfill transaction")
+    migrate_parser.add_argument('--dry-run', action='store_true', help="estimate duration on the current data without changing it")
+    report_parser = subparsers.add_parser('report', help="generate reports, optionally on a schedule")
+    report_parser.add_argument('templates', nargs='+', choices=list(REPORT_TEMPLATES), help="report templates to run")
+    report_parser.add_argument('--format', choices=REPORT_FORMATS, default='pdf', help="output format")
+    report_parser.add_argument('--db', default="advanced_employee_management.db", help="database file to report on")
+    report_parser.add_argument('--output-dir', default=".", help="directory for the generated files")
+    report_parser.add_argument('--every', type=float, default=0, help="repeat every N minutes (0 runs once)")
+    snapshot_parser = subparsers.add_parser('snapshot', help="write a read-only columnar snapshot for offline analysis")
+    snapshot_parser.add_argument('--db', default="advanced_employee_management.db", help="database file to snapshot")
+    snapshot_parser.add_argument('--output', help="snapshot directory (default: <db name>_<date>.snapshot)")
+    project_parser = subparsers.add_parser('project', help="Monte Carlo headcount and payroll projection")
+    project_parser.add_argument('--db', default="advanced_employee_management.db", help="database file to project from")
+    for key, value in PROJECTION_DEFAULTS.items():
+        project_parser.add_argument(f"--{key.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args()
+
+    if args.command == 'benchmark':
+        if args.suite == 'encoding':
+            benchmark_dictionary_encoding(args.rows or 1000000)
+        else:
+            benchmark_connection_profiles(args.rows or 100000, args.searches, args.commits)
+    elif args.command == 'dedup':
+        connection = connect_current_schema(args.db)
+        start = time.perf_counter()
+        found = find_duplicate_candidates(connection)
+        connection.close()
+        print(f"{found} possible duplicate pairs queued for review ({time.perf_counter() - start:.1f}s)")
+    elif args.command == 'loadtest':
+        mixes = [mix.strip() for mix in args.mix.split(',')]
+        unknown = [mix for mix in mixes if mix not in LOAD_TEST_MIXES]
+        if unknown or not os.path.exists(args.db):
+            parser.error(f"unknown mix {unknown[0]}" if unknown else f"database {args.db} not found; run the app once or pass --db")
+        run_load_test(args.db, [int(n) for n in args.clients.split(',')], mixes, args.duration, args.profile,
+                      args.rows, args.in_place)
+    elif args.command == 'migrate':
+        connection = connect_database(args.db, 'write_heavy')
+        migrator = SchemaMigrator(connection)
+        if args.dry_run:
+            for version, description, rows, backfill_seconds, index_seconds in migrator.estimate(args.batch_size):
+                print(f"v{version} {description}: {rows:,} rows to backfill, ~{backfill_seconds:.1f}s backfill, "
+                      f"~{index_seconds:.1f}s indexes")
+        else:
+            migrator.run_pending(args.batch_size, progress=lambda migration, done: print(
+                f"\rv{migration.version} {migration.description}: {done:,} rows", end="", flush=True))
+            print(f"\nDatabase schema at version {migrator.current_version()}")
+        connection.close()
+    elif args.command == 'snapshot':
+        if not os.path.exists(args.db):
+            parser.error(f"database {args.db} not found")
+        output = args.output or f"{os.path.splitext(args.db)[0]}_{datetime.now():%Y%m%d}.snapshot"
+        start = time.perf_counter()
+        connect_current_schema(args.db).close()
+        manifest = write_columnar_snapshot(args.db, output, progress=lambda table, done, rows: print(
+            f"\r{table}: {done:,}/{rows:,} rows", end="", flush=True))
+        size = sum(os.path.getsize(os.path.join(output, name)) for name in os.listdir(output))
+        print(f"\nWrote {output} ({size / 2**20:.1f} MB, " + ", ".join(
+            f"{table} {info['rows']:,}" for table, info in manifest['tables'].items())
+              + f") in {time.perf_counter() - start:.1f}s")
+    elif args.command == 'project':
+        connection = connect_current_schema(args.db)
+        inputs = projection_inputs(connection.cursor())
+        connection.close()
+        engine = WorkforceProjection()
+        result = engine.project(inputs, {key: getattr(args, key) for key in PROJECTION_DEFAULTS})
+        engine.shutdown()
+        print("Month  " + "  ".join(f"{'Headcount P' + str(p):>15}" for p in PROJECTION_PERCENTILES)
+              + "  " + "  ".join(f"{'Cost P' + str(p):>16}" for p in PROJECTION_PERCENTILES))
+        for month in range(1, args.months + 1):
+            print(f"{month:>5}  " + "  ".join(f"{value:>15,.0f}" for value in result['headcount'][:, month])
+                  + "  " + "  ".join(f"{value:>16,.0f}" for value in result['cost'][:, month - 1]))
+    elif args.command == 'report':
+        connect_current_schema(args.db).close()
+        runner = ReportRunner()
+        try:
+            while True:
+                stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                jobs = {runner.submit(args.db, template, args.format,
+                                      os.path.join(args.output_dir, f"{template}_{stamp}.{args.format}")): template
+                        for template in args.templates}
+                for job_id, template in jobs.items():
+                    future, _ = runner.jobs[job_id]
+                    try:
+                        print(f"{template}: wrote {future.result()}")
+                    except Exception as e:
+                        print(f"{template}: failed ({e})")
+                if not args.every:
+                    break
+                time.sleep(args.every * 60)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            runner.shutdown()
+    else:
+        shards = [tuple(spec.split('=', 1)) if '=' in spec else (os.path.splitext(os.path.basename(spec))[0], spec)
+                  for spec in args.shard]
+        app = ModernEmployeeManagementSystem(args.primary_db, shards, args.snapshot_path)
+        app.run()
\ No newline at end of file
@@ -0,0 +1,174 @@
+import os
+import random
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+
+
+# Schema of a database created before any versioned migration existed
+BASELINE_SQL = (
+    '''
+    CREATE TABLE employees (
+        emp_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        age INTEGER NOT NULL,
+        department TEXT NOT NULL,
+        position TEXT NOT NULL,
+        salary REAL NOT NULL,
+        joining_date DATE NOT NULL,
+        email TEXT,
+        phone TEXT,
+        address TEXT,
+        performance_rating REAL DEFAULT 0.0,
+        skills TEXT,
+        manager_id INTEGER,
+        status TEXT DEFAULT 'Active',
+        last_promotion DATE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE TABLE performance_reviews (
+        review_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        emp_id INTEGER,
+        review_date DATE NOT NULL,
+        rating REAL NOT NULL,
+        feedback TEXT,
+        goals TEXT,
+        reviewer TEXT,
+        FOREIGN KEY (emp_id) REFERENCES employees (emp_id)
+    )
+    ''',
+    '''
+    CREATE TABLE ai_insights (
+        insight_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        insight_type TEXT NOT NULL,
+        insight_data TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+)
+
+DEPARTMENTS = ['HR', 'IT', 'Finance', 'Engineering']
+POSITIONS = ['Developer', 'Manager', 'Analyst']
+SKILL_SETS = ['Python, SQL', 'Docker, AWS', 'Excel', 'python,Machine Learning']
+STATUSES = ['Active', 'Active', 'Active', 'Terminated', 'On Leave']
+
+INSERT_SQL = '''
+    INSERT INTO employees (name, age, department, position, salary, joining_date, email, phone,
+                           address, performance_rating, skills, status)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def employee_rows(count, seed=7):
+    """Deterministic employee tuples in INSERT_SQL column order"""
+    rng = random.Random(seed)
+    return [(f"Employee {i}", rng.randint(22, 60), rng.choice(DEPARTMENTS), rng.choice(POSITIONS),
+             round(rng.gauss(70000, 15000), 2),
+             f"{rng.randint(2015, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+             f"employee{i}@example.com", f"98{i:08d}", "Street 1",
+             round(rng.uniform(1, 5), 1), rng.choice(SKILL_SETS), rng.choice(STATUSES))
+            for i in range(count)]
+
+
+def seed_employees(connection, count=200, seed=7):
+    connection.executemany(INSERT_SQL, employee_rows(count, seed))
+    connection.commit()
+
+
+def make_baseline_db(path, count=200):
+    """A pre-migration database holding `count` employees"""
+    connection = sqlite3.connect(path)
+    for statement in BASELINE_SQL:
+        connection.execute(statement)
+    seed_employees(connection, count)
+    connection.close()
+    return path
+
+
+class FakeTree:
+    """Just enough of ttk.Treeview for the directory and bulk-operation helpers"""
+
+    def __init__(self):
+        self.items = {}
+        self.selected = ()
+
+    def item(self, iid, option=None, values=None):
+        if values is not None:
+            self.items[iid] = tuple(values)
+            return None
+        return self.items[iid] if option == 'values' else {'values': self.items[iid]}
+
+    def exists(self, iid):
+        return iid in self.items
+
+    def next(self, iid):
+        order = list(self.items)
+        position = order.index(iid) + 1
+        return order[position] if position < len(order) else ''
+
+    def selection(self):
+        return self.selected
+
+    def select(self, emp_ids):
+        for emp_id in emp_ids:
+            self.items.setdefault(str(emp_id), (emp_id,))
+        self.selected = tuple(str(emp_id) for emp_id in emp_ids)
+
+
+class FakeVar:
+    """tk.StringVar stand-in"""
+
+    def __init__(self, value=""):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+def headless_system(db_path):
+    """ModernEmployeeManagementSystem with its database layer set up but no Tk window"""
+    system = app.ModernEmployeeManagementSystem.__new__(app.ModernEmployeeManagementSystem)
+    system.db_path = str(db_path)
+    system.settings = {'db_profile': 'read_heavy'}
+    system.columnar = None
+    system.federation = None
+    system.skill_index = app.SkillIndex()
+    system.salary_bands = app.SalaryBandEngine()
+    system.anomaly_scores = {}
+    system.record_cache = app.RecordCache()
+    system.events = app.EventBus()
+    system.tree = FakeTree()
+    system.status_var = FakeVar()
+    system.setup_database()
+    return system
+
+
+def migrate(connection):
+    assert app.SchemaMigrator(connection).run_pending()
+
+
+@pytest.fixture
+def baseline_db(tmp_path):
+    return make_baseline_db(str(tmp_path / "baseline.db"))
+
+
+@pytest.fixture
+def system(tmp_path):
+    """Headless app on a fresh, fully migrated database with seeded employees"""
+    instance = headless_system(tmp_path / "employees.db")
+    seed_employees(instance.connection)
+    migrate(instance.connection)
+    yield instance
+    instance.read_connection.close()
+    instance.connection.close()
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+import app
+from conftest import headless_system
+
+SALARIES = [60000, 61000, 59000, 62000, 58000, 60500, 59500, 61500, 58500, 60000, 200000]
+RATINGS = [3.0, 3.2, 2.8, 3.4, 2.6, 3.1, 2.9, 3.3, 2.7, 3.0, 3.0]
+
+
+@pytest.fixture
+def analysts(tmp_path):
+    """Migrated database with eleven analysts hired the same day, the last one paid far above the rest"""
+    system = headless_system(tmp_path / "anomalies.db")
+    app.SchemaMigrator(system.connection).run_pending()
+    for i, (salary, rating) in enumerate(zip(SALARIES, RATINGS)):
+        app.insert_employee(system.cursor, (f"Analyst {i}", 30, 'IT', 'Analyst', float(salary), '2020-03-01',
+                                            f"analyst{i}@example.com", '', '', rating, '', 'Active'))
+    system.connection.commit()
+    yield system
+    system.read_connection.close()
+    system.connection.close()
+
+
+def test_robust_z_on_fixed_values():
+    values = np.array([10.0, 11.0, 12.0, 13.0, 14.0, 100.0])
+    z = app.robust_z(np.zeros(6, dtype=int), values, 1)
+    # Median 12.5, MAD 1.5
+    assert z == pytest.approx((values - 12.5) / (1.5 / app.MAD_SCALE))
+
+
+def test_robust_z_falls_back_to_mean_deviation():
+    values = np.array([5.0, 5.0, 5.0, 5.0, 9.0])
+    z = app.robust_z(np.zeros(5, dtype=int), values, 1)
+    assert z[-1] == pytest.approx(4.0 / (0.8 * app.MEAN_AD_SCALE))
+    assert z[:4] == pytest.approx(0.0)
+
+
+def test_scores_are_per_segment_and_skip_thin_segments():
+    codes = np.array([0] * 11 + [1] * 3)
+    salary = np.array(SALARIES + [10.0, 20.0, 1000.0], dtype=float)
+    rating = np.array(RATINGS + [1.0, 2.0, 5.0])
+
+    salary_z, rating_z, score = app.anomaly_scores(codes, salary, rating, 2)
+
+    assert score[10] >= app.ANOMALY_THRESHOLD
+    assert np.all(score[:10] < app.ANOMALY_THRESHOLD)
+    assert np.all(score[11:] == 0) and np.all(salary_z[11:] == 0) and np.all(rating_z[11:] == 0)
+
+
+def test_reason_names_the_dominant_dimension():
+    assert app.anomaly_reason(1.0, 1.0, 2.0) is None
+    assert app.anomaly_reason(5.0, 0.1, 5.0) == "salary far above position/tenure peers"
+    assert app.anomaly_reason(0.2, -4.0, 4.0) == "rating far below position/tenure peers"
+    assert app.anomaly_reason(-2.5, 2.5, 4.0) == "low pay for a high rating"
+
+
+def test_detector_flags_the_outlier(analysts):
+    detector = app.AnomalyDetector(analysts.connection)
+    scores = detector.refresh(full=True)
+
+    assert len(scores) == len(SALARIES)
+    flagged = detector.flagged()
+    assert [row[0] for row in flagged] == [len(SALARIES)]
+    emp_id, name, position, segment, salary, rating, score, reason = flagged[0]
+    assert segment == f"Analyst|{app.tenure_bucket('2020-03-01')}"
+    assert reason == "salary far above position/tenure peers"
+
+
+def test_incremental_refresh_rescores_touched_segments_only(analysts):
+    for i in range(5):
+        app.insert_employee(analysts.cursor, (f"Manager {i}", 45, 'IT', 'Manager', 90000.0 + i * 1000, '2012-01-01',
+                                              f"manager{i}@example.com", '', '', 4.0, '', 'Active'))
+    analysts.connection.commit()
+    detector = app.AnomalyDetector(analysts.connection)
+    detector.refresh(full=True)
+    assert detector.refresh() == {}
+
+    analysts.cursor.execute("UPDATE employees SET salary = 60000 WHERE emp_id = ?", (len(SALARIES),))
+    analysts.connection.commit()
+    rescored = detector.refresh()
+
+    assert set(rescored) == set(range(1, len(SALARIES) + 1))
+    assert not detector.flagged()
+    assert max(detector.scores().values()) < app.ANOMALY_THRESHOLD
+    assert len(detector.scores()) == len(SALARIES) + 5
@@ -0,0 +1,104 @@
+import pytest
+
+import app
+from conftest import headless_system, seed_employees
+
+
+def salaries(connection, emp_ids):
+    marks = ",".join("?" * len(emp_ids))
+    return dict(connection.execute(f"SELECT emp_id, salary FROM employees WHERE emp_id IN ({marks})", emp_ids))
+
+
+def test_employees_is_encoded_view_after_migration(system):
+    kind = system.connection.execute("SELECT type FROM sqlite_master WHERE name='employees'").fetchone()[0]
+    assert kind == 'view'
+
+
+def test_bulk_update_counts_selected_rows(system):
+    emp_ids = [1, 2, 3, 5, 8]
+    before = salaries(system.connection, emp_ids)
+    system.tree.select(emp_ids)
+
+    batch_id, row_count = system.apply_bulk_update('Salary change (%)', 10, 'selection')
+
+    assert row_count == len(emp_ids)
+    stored = system.connection.execute("SELECT row_count FROM bulk_batches WHERE batch_id=?", (batch_id,)).fetchone()[0]
+    assert stored == len(emp_ids)
+    after = salaries(system.connection, emp_ids)
+    for emp_id in emp_ids:
+        assert after[emp_id] == pytest.approx(before[emp_id] * 1.1)
+
+
+def test_bulk_update_respects_min_rating(system):
+    system.tree.select(range(1, 51))
+    expected = system.connection.execute(
+        "SELECT COUNT(*) FROM employees WHERE emp_id <= 50 AND performance_rating >= 4").fetchone()[0]
+
+    _, row_count = system.apply_bulk_update('Salary change (%)', 5, 'selection', min_rating=4)
+
+    assert row_count == expected
+
+
+def test_bulk_rollback_restores_values(system):
+    emp_ids = [4, 6, 7]
+    before = salaries(system.connection, emp_ids)
+    system.tree.select(emp_ids)
+    batch_id, _ = system.apply_bulk_update('Salary change (%)', 25, 'selection')
+
+    assert system.rollback_bulk_batch(batch_id) == []
+
+    assert salaries(system.connection, emp_ids) == pytest.approx(before)
+    with pytest.raises(ValueError):
+        system.rollback_bulk_batch(batch_id)
+
+
+def test_rollback_keeps_rows_edited_after_the_batch(system):
+    emp_ids = [10, 11, 12]
+    before = salaries(system.connection, emp_ids)
+    system.tree.select(emp_ids)
+    batch_id, _ = system.apply_bulk_update('Salary change (%)', 10, 'selection')
+    system.cursor.execute("UPDATE employees SET salary = 12345 WHERE emp_id = 11")
+    system.connection.commit()
+
+    conflicts = system.rollback_bulk_batch(batch_id)
+
+    assert conflicts == [11]
+    after = salaries(system.connection, emp_ids)
+    assert after[11] == 12345
+    assert after[10] == pytest.approx(before[10]) and after[12] == pytest.approx(before[12])
+
+
+def test_preview_leaves_the_connection_untouched(system):
+    system.tree.select([1, 2, 3])
+    system.cursor.execute("UPDATE employees SET age = 99 WHERE emp_id = 4")
+    assert system.connection.in_transaction
+
+    count, payroll_delta, sample = system.preview_bulk_update('Salary change (%)', 10, 'selection')
+
+    assert count == 3 and len(sample) == 3 and payroll_delta > 0
+    assert system.connection.in_transaction
+    system.connection.commit()
+    assert system.connection.execute("SELECT age FROM employees WHERE emp_id = 4").fetchone()[0] == 99
+
+
+def test_bulk_move_to_new_department_reaches_salary_bands(system):
+    system.load_salary_bands()
+    system.tree.select([1, 2, 3, 4, 5])
+
+    system.apply_bulk_update('Move to department', 'Research', 'selection')
+
+    bands = system.current_salary_bands()
+    assert 'Research' in bands
+    assert sum(sketch.n for (dimension, _), sketch in system.salary_bands.sketches.items() if dimension == 'department') == 200
+
+
+def test_bulk_update_on_plain_table(tmp_path):
+    system = headless_system(tmp_path / "plain.db")
+    seed_employees(system.connection, 20)
+    system.tree.select([1, 2])
+
+    _, row_count = system.apply_bulk_update('Salary change (%)', 10, 'selection')
+
+    assert row_count == 2
+    system.connection.close()
+    system.read_connection.close()
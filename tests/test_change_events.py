@@ -0,0 +1,78 @@
+import app
+
+
+class FakeRoot:
+    """Tk after() stand-in that runs scheduled callbacks only when told to"""
+
+    def __init__(self):
+        self.jobs = []
+
+    def after(self, ms, callback):
+        self.jobs.append(callback)
+        return len(self.jobs)
+
+    def run_pending(self):
+        jobs, self.jobs = self.jobs, []
+        for callback in jobs:
+            callback()
+
+
+def scheduler_with_views(root, bus):
+    scheduler = app.RefreshScheduler(root, bus)
+    refreshed = {'directory': [], 'dashboard': []}
+    scheduler.register('directory', refreshed['directory'].append, ['employees'])
+    scheduler.register('dashboard', refreshed['dashboard'].append, ['employees', 'reviews'], stale=True)
+    return scheduler, refreshed
+
+
+def test_bus_delivers_events_with_their_topic():
+    bus = app.EventBus()
+    received = []
+    bus.subscribe('employees', received.append)
+    bus.publish('employees', action='update', emp_ids=[1])
+    bus.publish('reviews', emp_ids=[1])
+
+    assert received == [{'action': 'update', 'emp_ids': [1], 'topic': 'employees'}]
+
+
+def test_events_for_the_visible_view_coalesce_into_one_refresh():
+    root, bus = FakeRoot(), app.EventBus()
+    scheduler, refreshed = scheduler_with_views(root, bus)
+    scheduler.show('directory')
+
+    for emp_id in (1, 2, 3):
+        bus.publish('employees', action='update', emp_ids=[emp_id])
+    assert len(root.jobs) == 1 and refreshed['directory'] == []
+
+    root.run_pending()
+    assert [[event['emp_ids'] for event in events] for events in refreshed['directory']] == [[[1], [2], [3]]]
+    root.run_pending()
+    assert len(refreshed['directory']) == 1
+
+
+def test_hidden_view_refreshes_once_when_shown():
+    root, bus = FakeRoot(), app.EventBus()
+    scheduler, refreshed = scheduler_with_views(root, bus)
+    scheduler.show('directory')
+    root.run_pending()
+
+    bus.publish('reviews', emp_ids=[4])
+    bus.publish('employees', action='delete', emp_ids=[5])
+    root.run_pending()
+    assert refreshed['dashboard'] == []
+
+    scheduler.show('dashboard')
+    assert [event['topic'] for event in refreshed['dashboard'][0]] == ['reviews', 'employees']
+    scheduler.show('directory')
+    scheduler.show('dashboard')
+    assert len(refreshed['dashboard']) == 1
+
+
+def test_stale_view_refreshes_on_first_show_without_events():
+    root, bus = FakeRoot(), app.EventBus()
+    scheduler, refreshed = scheduler_with_views(root, bus)
+
+    scheduler.show('dashboard')
+    scheduler.show('directory')
+
+    assert refreshed['dashboard'] == [[]] and refreshed['directory'] == []
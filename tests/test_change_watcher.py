@@ -0,0 +1,57 @@
+import sqlite3
+
+import app
+
+
+def other_window(system):
+    """A second connection to the same database, like another running copy of the app"""
+    return sqlite3.connect(system.db_path)
+
+
+def test_poll_sees_a_commit_from_another_connection(system):
+    watcher = app.ChangeWatcher(system.connection)
+    assert watcher.poll() == []
+
+    other = other_window(system)
+    before = other.execute("SELECT department, position, joining_date FROM employees WHERE emp_id = 7").fetchone()
+    other.execute("UPDATE employees SET department = 'Legal' WHERE emp_id = 7")
+    other.commit()
+    other.close()
+
+    rows = watcher.poll()
+    assert len(rows) == 1
+    change_id, emp_id, action, *old = rows[0]
+    assert (emp_id, action) == (7, 'update')
+    assert tuple(old) == before
+    assert watcher.last_change_id == change_id
+    assert watcher.poll() == []
+
+
+def test_own_commits_are_not_reported(system):
+    watcher = app.ChangeWatcher(system.connection)
+    system.cursor.execute("UPDATE employees SET salary = salary + 1 WHERE emp_id = 3")
+    system.connection.commit()
+    watcher.acknowledge_local()
+
+    assert watcher.poll() == []
+
+
+def test_prune_trims_the_journal_once_enough_changes_arrived(system, monkeypatch):
+    monkeypatch.setattr(app, 'CHANGE_PRUNE_STEP', 5)
+    monkeypatch.setattr(app, 'CHANGE_JOURNAL_RETENTION', 3)
+    watcher = app.ChangeWatcher(system.connection)
+    other = other_window(system)
+    other.execute("UPDATE employees SET salary = salary + 1 WHERE emp_id <= 4")
+    other.commit()
+    watcher.poll()
+    assert watcher.prune() == 0
+
+    other.execute("UPDATE employees SET salary = salary + 1 WHERE emp_id <= 4")
+    other.commit()
+    other.close()
+    watcher.poll()
+
+    assert watcher.prune() > 0
+    remaining = system.connection.execute("SELECT COUNT(*) FROM employee_changes").fetchone()[0]
+    assert remaining == app.CHANGE_JOURNAL_RETENTION
+    assert watcher.prune() == 0
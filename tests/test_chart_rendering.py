@@ -0,0 +1,119 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import pytest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import app
+
+DEPARTMENTS = [('IT', 3), ('HR', 2)]
+
+
+class FakeRoot:
+    def __init__(self):
+        self.jobs = []
+
+    def after(self, ms, callback):
+        self.jobs.append(callback)
+        return len(self.jobs)
+
+
+class FakeWidget:
+    def __init__(self):
+        self.deleted = []
+
+    def delete(self, tag):
+        self.deleted.append(tag)
+
+    def winfo_width(self):
+        return 1
+
+    def winfo_height(self):
+        return 1
+
+
+class FakeCanvas(FigureCanvasAgg):
+    """Agg canvas answering get_tk_widget like FigureCanvasTkAgg"""
+
+    def __init__(self, figure):
+        super().__init__(figure)
+        self.widget = FakeWidget()
+        self.draws = 0
+
+    def get_tk_widget(self):
+        return self.widget
+
+    def draw(self):
+        self.draws += 1
+        super().draw()
+
+
+@pytest.fixture
+def renderer():
+    # Threads instead of spawned processes: same futures, and monkeypatched renders stay visible
+    renderer = app.ChartRenderer(FakeRoot())
+    renderer.executor = ThreadPoolExecutor(max_workers=2)
+    yield renderer
+    renderer.shutdown()
+
+
+def finish(renderer):
+    wait([future for _, future, *_ in renderer.pending.values()])
+    renderer.poll()
+
+
+def test_finished_render_is_delivered_once(renderer):
+    images = []
+    assert renderer.request('department', 'department_pie', DEPARTMENTS, (200, 150), 100, images.append)
+    assert not renderer.request('department', 'department_pie', DEPARTMENTS, (200, 150), 100, images.append)
+    finish(renderer)
+
+    assert [image.size for image in images] == [(200, 150)]
+    assert not renderer.pending and not renderer.polling
+    assert not renderer.request('department', 'department_pie', DEPARTMENTS, (200, 150), 100, images.append)
+
+
+def test_newer_request_supersedes_the_one_in_flight(renderer):
+    images = []
+    renderer.request('department', 'department_pie', DEPARTMENTS, (200, 150), 100, images.append)
+    renderer.request('department', 'department_pie', DEPARTMENTS, (320, 200), 100, images.append)
+    finish(renderer)
+
+    assert [image.size for image in images] == [(320, 200)]
+
+
+def test_failed_render_reports_its_error(renderer, monkeypatch):
+    def broken(*args):
+        raise ValueError("no data")
+
+    monkeypatch.setattr(app, 'render_chart_image', broken)
+    images, errors = [], []
+    renderer.request('salary', 'salary_bars', [], (200, 150), 100, images.append, errors.append)
+    finish(renderer)
+
+    assert images == [] and [str(e) for e in errors] == ["no data"]
+    assert 'salary' not in renderer.applied
+
+
+def test_failed_render_falls_back_to_inline_drawing(renderer, monkeypatch):
+    def broken(*args):
+        raise MemoryError("worker out of memory")
+
+    monkeypatch.setattr(app, 'render_chart_image', broken)
+    system = app.ModernEmployeeManagementSystem.__new__(app.ModernEmployeeManagementSystem)
+    system.settings = {'chart_rendering': 'process'}
+    system.chart_renderer = renderer
+    system.chart_slots, system.chart_data = {}, {}
+    figure = Figure(figsize=(4, 3))
+    ax = figure.add_subplot()
+    canvas = FakeCanvas(figure)
+    ax.set_axis_off()
+    system.chart_slots['department'] = (figure, ax, canvas)
+
+    system.render_chart('department', 'department_pie', DEPARTMENTS)
+    assert canvas.draws == 0
+    finish(renderer)
+
+    assert canvas.draws == 1 and ax.axison
+    assert [text.get_text() for text in ax.texts if text.get_text() in ('IT', 'HR')] == ['IT', 'HR']
+    assert 'rendered' in canvas.widget.deleted
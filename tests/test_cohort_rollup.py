@@ -0,0 +1,101 @@
+from datetime import datetime
+
+import pytest
+
+import app
+from conftest import headless_system
+
+JANUARY_2024 = 2024 * 12
+
+
+def months_ago(count):
+    """First day of the month count months before the current one, and its cohort label"""
+    today = datetime.now()
+    index = today.year * 12 + today.month - 1 - count
+    return f"{app.month_label(index)}-01", app.month_label(index)
+
+
+@pytest.fixture
+def staff(tmp_path):
+    system = headless_system(tmp_path / "cohorts.db")
+    app.SchemaMigrator(system.connection).run_pending()
+    yield system
+    system.read_connection.close()
+    system.connection.close()
+
+
+def hire(system, name, joined, rating=3.0):
+    emp_id = app.insert_employee(system.cursor, (name, 30, 'IT', 'Analyst', 60000.0, joined, f"{name}@example.com",
+                                                 '', '', rating, '', 'Active'))
+    system.connection.commit()
+    return emp_id
+
+
+def test_rollup_rows_on_fixed_history():
+    rows = [
+        (1, JANUARY_2024, JANUARY_2024, 'Active', 3.0),
+        (1, JANUARY_2024, JANUARY_2024 + 2, 'Terminated', 3.0),
+        (2, JANUARY_2024, JANUARY_2024, 'Active', 4.0),
+    ]
+
+    rollup = app.cohort_rollup_rows(rows, JANUARY_2024 + 4)
+
+    assert rollup == [
+        ('2024-01', 0, 2, 0, 0, 0, 7.0),
+        ('2024-01', 1, 2, 0, 0, 0, 7.0),
+        ('2024-01', 2, 1, 0, 1, 0, 4.0),
+        ('2024-01', 3, 1, 0, 1, 0, 4.0),
+        ('2024-01', 4, 1, 0, 1, 0, 4.0),
+    ]
+    assert app.cohort_rollup_rows([], JANUARY_2024) == []
+
+
+def test_matrix_metrics():
+    rows = [('2024-01', 0, 3, 1, 0, 0, 9.0), ('2024-01', 1, 2, 1, 1, 0, 7.0), ('2024-02', 0, 0, 0, 2, 0, 0.0)]
+    assert app.cohort_matrix(rows, 'Retention %', months=2)['values'] == [[75.0, 50.0], [0.0, None]]
+    assert app.cohort_matrix(rows, 'Avg Rating', months=2)['values'] == [[3.0, 3.5], [None, None]]
+    assert app.cohort_matrix(rows, 'Terminated', cohorts=1, months=2) == {
+        'metric': 'Terminated', 'cohorts': ['2024-02'], 'values': [[2, None]]}
+
+
+def test_rollup_follows_status_changes(staff):
+    joined, cohort = months_ago(3)
+    other_joined, other_cohort = months_ago(6)
+    leaver = hire(staff, 'Leaver', joined)
+    hire(staff, 'Stayer', joined, rating=4.0)
+    hire(staff, 'Veteran', other_joined)
+    rollup = app.CohortRollup(staff.connection)
+    assert rollup.refresh(full=True) == 2
+    before = app.CohortRollup.matrix(staff.connection, 'Active', months=7)
+    assert before['cohorts'] == [other_cohort, cohort]
+    assert before['values'][1][:4] == [2, 2, 2, 2]
+
+    staff.cursor.execute("UPDATE employees SET status = 'Terminated' WHERE emp_id = ?", (leaver,))
+    staff.connection.commit()
+
+    # Only the leaver's hiring month is rebuilt
+    assert rollup.refresh() == 1
+    assert rollup.refresh() == 0
+    active = app.CohortRollup.matrix(staff.connection, 'Active', months=7)['values']
+    terminated = app.CohortRollup.matrix(staff.connection, 'Terminated', months=7)['values']
+    rating = app.CohortRollup.matrix(staff.connection, 'Avg Rating', months=7)['values']
+    assert active[1][:4] == [2, 2, 2, 1]
+    assert terminated[1][:4] == [0, 0, 0, 1]
+    assert rating[1][3] == pytest.approx(4.0)
+    assert active[0][:7] == [1] * 7
+
+
+def test_deleted_employee_leaves_the_rollup(staff):
+    joined, cohort = months_ago(2)
+    first = hire(staff, 'First', joined)
+    hire(staff, 'Second', joined)
+    rollup = app.CohortRollup(staff.connection)
+    rollup.refresh(full=True)
+
+    staff.cursor.execute("DELETE FROM employees WHERE emp_id = ?", (first,))
+    staff.connection.commit()
+    rollup.refresh()
+
+    matrix = app.CohortRollup.matrix(staff.connection, 'Active', months=3)
+    assert matrix['cohorts'] == [cohort]
+    assert matrix['values'][0] == [1, 1, 1]
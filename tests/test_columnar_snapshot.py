@@ -0,0 +1,134 @@
+import json
+import os
+import sqlite3
+
+import numpy as np
+import pytest
+
+import app
+from conftest import make_baseline_db
+
+
+def live_rows(db_path, sql, params=()):
+    connection = sqlite3.connect(db_path)
+    rows = connection.execute(sql, params).fetchall()
+    connection.close()
+    return rows
+
+
+def normalized(rows):
+    """Database rows as a snapshot reads them back: text NULLs as '' and dates as their ISO day"""
+    kinds = app.SNAPSHOT_TABLES['employees'][1]
+    out = []
+    for row in rows:
+        values = []
+        for (column, kind), value in zip(kinds.items(), row):
+            if kind == 'text' and value is None:
+                value = ''
+            elif kind == 'text':
+                value = str(value)
+            elif kind == 'date' and value is not None:
+                value = str(value)[:10]
+            values.append(value)
+        out.append(tuple(values))
+    return out
+
+
+@pytest.fixture
+def bundle(system, tmp_path):
+    """Snapshot of the migrated fixture database with scores and a cohort rollup"""
+    app.AnomalyDetector(system.connection).refresh(full=True)
+    app.CohortRollup(system.connection).refresh(full=True)
+    path = str(tmp_path / "snapshot")
+    app.write_columnar_snapshot(system.db_path, path)
+    return system, app.ColumnarSnapshot(path)
+
+
+def test_snapshot_round_trips_employee_rows(bundle):
+    system, snapshot = bundle
+    expected = normalized(live_rows(system.db_path, f"{app.EMPLOYEE_SELECT} ORDER BY emp_id"))
+
+    assert snapshot.rows('employees') == 200
+    assert snapshot.employee_rows() == expected
+    assert snapshot.employee_rows(emp_ids=[5, 3, 999]) == [expected[2], expected[4]]
+    assert snapshot.employee_rows(positions=np.array([0])) == [expected[0]]
+
+
+def test_columns_are_memory_mapped(bundle):
+    system, snapshot = bundle
+    salaries = snapshot.column('salaries')
+
+    assert isinstance(snapshot.array('employees', 'salary'), np.memmap)
+    assert isinstance(snapshot.array('employees', 'name', '.offsets'), np.memmap)
+    assert sorted(salaries.tolist()) == sorted(s for (s,) in live_rows(system.db_path, "SELECT salary FROM employees"))
+    assert snapshot.manifest['tables']['employees']['columns']['department']['kind'] == 'category'
+
+
+def test_registry_queries_match_the_database(bundle):
+    system, snapshot = bundle
+
+    assert snapshot.scalar('count_employees') == 200
+    assert snapshot.scalar('avg_salary') == pytest.approx(live_rows(system.db_path, "SELECT AVG(salary) FROM employees")[0][0])
+    assert sorted(snapshot.fetchall('department_counts')) == sorted(
+        live_rows(system.db_path, "SELECT department, COUNT(*) FROM employees GROUP BY department"))
+    assert snapshot.scalar('count_by_status', ('Active',)) == live_rows(
+        system.db_path, "SELECT COUNT(*) FROM employees WHERE status = 'Active'")[0][0]
+    assert snapshot.scalar('count_joined_since', ('2022-01-01',)) == live_rows(
+        system.db_path, "SELECT COUNT(*) FROM employees WHERE joining_date >= '2022-01-01'")[0][0]
+    with pytest.raises(KeyError):
+        snapshot.fetchall('search_employees', ('x',))
+
+
+def test_search_matches_the_database(bundle):
+    system, snapshot = bundle
+    department = live_rows(system.db_path, "SELECT department FROM employees LIMIT 1")[0][0]
+    params = ('%an%', '%an%', '%an%', '%an%', department, department, 'Active', 'Active')
+    expected = live_rows(system.db_path, f"{app.QUERIES['search_employees']} ORDER BY emp_id", params)
+
+    assert expected
+    assert snapshot.search(params) == expected
+    assert snapshot.search((None,) * 8) == live_rows(system.db_path, f"{app.QUERIES['all_employees']} ORDER BY emp_id")
+    assert snapshot.search((None, None, None, None, 'No Such Department', 'No Such Department', None, None)) == []
+
+
+def test_scores_and_cohorts_match_the_database(bundle):
+    system, snapshot = bundle
+
+    assert snapshot.anomaly_scores() == pytest.approx(app.AnomalyDetector(system.connection).scores())
+    assert snapshot.cohort_matrix('Active') == app.CohortRollup.matrix(system.connection, 'Active')
+
+
+def test_rewrite_replaces_the_bundle(bundle, tmp_path):
+    system, snapshot = bundle
+    system.cursor.execute("DELETE FROM employees WHERE emp_id <= 10")
+    system.connection.commit()
+
+    manifest = app.write_columnar_snapshot(system.db_path, snapshot.path)
+
+    assert manifest['tables']['employees']['rows'] == 190
+    assert app.ColumnarSnapshot(snapshot.path).scalar('count_employees') == 190
+    assert not os.path.exists(f"{snapshot.path}.partial") and not os.path.exists(f"{snapshot.path}.old")
+
+
+def test_snapshot_of_baseline_database(tmp_path):
+    db_path = make_baseline_db(str(tmp_path / "baseline.db"), 50)
+    app.connect_current_schema(db_path).close()
+
+    snapshot_path = str(tmp_path / "snapshot")
+    app.write_columnar_snapshot(db_path, snapshot_path)
+    snapshot = app.ColumnarSnapshot(snapshot_path)
+
+    assert snapshot.employee_rows() == normalized(live_rows(db_path, f"{app.EMPLOYEE_SELECT} ORDER BY emp_id"))
+    assert snapshot.anomaly_scores() == {}
+    assert snapshot.cohort_matrix('Active')['cohorts'] == []
+
+
+def test_unknown_format_is_rejected(bundle):
+    _, snapshot = bundle
+    manifest_path = os.path.join(snapshot.path, app.SNAPSHOT_MANIFEST)
+    manifest = dict(snapshot.manifest, format=app.SNAPSHOT_FORMAT + 1)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+
+    with pytest.raises(ValueError):
+        app.ColumnarSnapshot(snapshot.path)
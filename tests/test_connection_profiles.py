@@ -0,0 +1,37 @@
+import pytest
+
+import app
+
+TEMP_STORE = {'DEFAULT': 0, 'FILE': 1, 'MEMORY': 2}
+
+
+@pytest.mark.parametrize('profile', ['read_heavy', 'write_heavy'])
+def test_profile_pragmas_are_applied(tmp_path, profile):
+    connection = app.connect_database(str(tmp_path / "profile.db"), profile)
+    settings = app.CONNECTION_PROFILES[profile]
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+    assert connection.execute("PRAGMA temp_store").fetchone()[0] == TEMP_STORE[settings['temp_store']]
+    assert connection.execute("PRAGMA cache_size").fetchone()[0] == settings['cache_size']
+    assert connection.execute("PRAGMA busy_timeout").fetchone()[0] == settings['busy_timeout']
+    connection.close()
+
+
+def test_read_heavy_keeps_temp_tables_in_memory():
+    assert app.CONNECTION_PROFILES['read_heavy']['temp_store'] == 'MEMORY'
+
+
+def test_search_params_disable_blank_filters():
+    assert app.search_params('', 'All', None) == [None, None, None, None, None, None, None, None]
+    assert app.search_params('ann', 'IT', 'Active') == ['%ann%'] * 4 + ['IT', 'IT', 'Active', 'Active']
+
+
+def test_switching_tuned_profiles_leaves_no_settings_behind(tmp_path):
+    assert set(app.CONNECTION_PROFILES['read_heavy']) == set(app.CONNECTION_PROFILES['write_heavy'])
+    connection = app.connect_database(str(tmp_path / "profile.db"), 'write_heavy')
+
+    app.apply_connection_profile(connection, 'read_heavy')
+
+    settings = app.CONNECTION_PROFILES['read_heavy']
+    for pragma in ('cache_size', 'mmap_size', 'busy_timeout', 'wal_autocheckpoint'):
+        assert connection.execute(f"PRAGMA {pragma}").fetchone()[0] == settings[pragma]
+    connection.close()
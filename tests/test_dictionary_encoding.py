@@ -0,0 +1,119 @@
+import sqlite3
+
+import pytest
+
+import app
+from conftest import employee_rows, headless_system, seed_employees
+
+GROUPED_QUERIES = ['department_counts', 'department_avg_salary', 'department_performance', 'department_salary_totals']
+
+
+def new_employee(name, department='IT', position='Analyst', status='Active'):
+    return (name, 30, department, position, 65000.0, '2024-01-15', f"{name}@example.com", '9800000000',
+            'Street 1', 3.5, 'Python', status)
+
+
+@pytest.fixture
+def plain(tmp_path):
+    """Same seeded rows as `system`, left on the original TEXT table"""
+    instance = headless_system(tmp_path / "plain.db")
+    seed_employees(instance.connection)
+    yield instance
+    instance.read_connection.close()
+    instance.connection.close()
+
+
+def test_registry_switches_to_encoded_queries(system, plain):
+    assert app.query_registry(system.connection) is app.ENCODED_QUERIES
+    assert app.query_registry(plain.connection) is app.QUERIES
+
+
+def test_view_reads_match_original_rows(system, plain):
+    # Timestamps differ between the two seedings, so compare every other column
+    select = f"SELECT {', '.join(app.EMPLOYEE_COLUMNS[:-2])} FROM employees ORDER BY emp_id"
+    assert system.connection.execute(select).fetchall() == plain.connection.execute(select).fetchall()
+
+
+@pytest.mark.parametrize('name', GROUPED_QUERIES)
+def test_encoded_aggregates_match_base_queries(system, plain, name):
+    encoded = sorted(system.connection.execute(app.ENCODED_QUERIES[name]).fetchall())
+    base = sorted(plain.connection.execute(app.QUERIES[name]).fetchall())
+    assert len(encoded) == len(base)
+    for row, expected in zip(encoded, base):
+        assert row == pytest.approx(expected)
+
+
+def test_search_through_encoded_registry(system, plain):
+    params = app.search_params('Employee 1', 'IT', 'Active')
+    encoded = system.connection.execute(app.ENCODED_QUERIES['search_employees'], params).fetchall()
+    base = plain.connection.execute(app.QUERIES['search_employees'], params).fetchall()
+    assert sorted(encoded) == sorted(base)
+    assert encoded
+
+
+def test_writes_through_view_register_new_categories(system):
+    emp_id = app.insert_employee(system.cursor, new_employee('Newcomer', department='Research', position='Scientist'))
+    system.connection.commit()
+
+    row = system.connection.execute("SELECT name, department, position, status FROM employees WHERE emp_id=?",
+                                    (emp_id,)).fetchone()
+    assert row == ('Newcomer', 'Research', 'Scientist', 'Active')
+    assert 'Research' in app.category_names(system.cursor, 'department')
+
+    system.cursor.execute("UPDATE employees SET department='HR', status='Terminated' WHERE emp_id=?", (emp_id,))
+    system.connection.commit()
+    stored = system.connection.execute('''
+        SELECT d.name, s.name FROM employee_records r
+        JOIN departments d ON d.department_id = r.department_id JOIN statuses s ON s.status_id = r.status_id
+        WHERE r.emp_id=?
+    ''', (emp_id,)).fetchone()
+    assert stored == ('HR', 'Terminated')
+
+    system.cursor.execute(app.QUERIES['delete_employee'], (emp_id,))
+    system.connection.commit()
+    assert system.connection.execute("SELECT COUNT(*) FROM employee_records WHERE emp_id=?", (emp_id,)).fetchone()[0] == 0
+
+
+def test_null_and_blank_categories_stay_in_aggregates(system):
+    total = system.connection.execute(app.QUERIES['count_employees']).fetchone()[0]
+    app.insert_employee(system.cursor, new_employee('No Department', department=None, position=None))
+    app.insert_employee(system.cursor, new_employee('Blank Department', department=''))
+    system.connection.commit()
+
+    counts = dict(system.connection.execute(app.ENCODED_QUERIES['department_counts']).fetchall())
+    assert counts[None] == 1
+    assert counts[''] == 1
+    assert sum(counts.values()) == total + 2
+
+
+def test_insert_ids_are_unique_and_never_reused(system):
+    first = app.insert_employee(system.cursor, new_employee('First'))
+    system.connection.commit()
+    system.cursor.execute(app.QUERIES['delete_employee'], (first,))
+    system.connection.commit()
+
+    other = app.connect_database(system.db_path, 'write_heavy')
+    second = app.insert_employee(other.cursor(), new_employee('Second'))
+    other.commit()
+    third = app.insert_employee(system.cursor, new_employee('Third'))
+    system.connection.commit()
+    other.close()
+
+    assert first < second < third
+    names = dict(system.connection.execute("SELECT emp_id, name FROM employees WHERE emp_id IN (?, ?)", (second, third)))
+    assert names == {second: 'Second', third: 'Third'}
+
+
+def test_insert_holds_write_lock_until_commit(system):
+    app.insert_employee(system.cursor, new_employee('Pending'))
+    other = sqlite3.connect(system.db_path, timeout=0)
+    with pytest.raises(sqlite3.OperationalError):
+        app.insert_employee(other.cursor(), new_employee('Blocked'))
+    other.close()
+    system.connection.commit()
+
+
+def test_insert_on_plain_table_uses_lastrowid(plain):
+    emp_id = app.insert_employee(plain.cursor, employee_rows(1, seed=99)[0])
+    plain.connection.commit()
+    assert emp_id == plain.connection.execute("SELECT MAX(emp_id) FROM employees").fetchone()[0]
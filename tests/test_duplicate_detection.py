@@ -0,0 +1,72 @@
+import sqlite3
+
+import app
+from conftest import INSERT_SQL, employee_rows, make_baseline_db
+
+
+def add_duplicates(path):
+    """Seed rows plus a near-copy of employee 1 and an exact copy of employee 2"""
+    connection = sqlite3.connect(path)
+    first, second = employee_rows(2)
+    near = ("Employe 0",) + first[1:6] + ("EMPLOYEE0+hr@Example.com", "+91 " + first[7]) + first[8:]
+    connection.executemany(INSERT_SQL, [near, second])
+    connection.commit()
+    connection.close()
+
+
+def test_soundex():
+    assert app.soundex("Robert") == app.soundex("Rupert") == "R163"
+    assert app.soundex("Ashcraft") == "A261"
+    assert app.soundex("") == ""
+
+
+def test_match_keys_normalize_email_and_phone():
+    assert app.match_keys("Ann Lee", "ann.lee+work@Example.com", "(555) 123-4567") == \
+        app.match_keys("ann lee", "ANN.LEE@example.com", "+1 555 123 4567")
+    assert app.match_keys(None, None, None) == []
+
+
+def test_match_score_ranks_same_person_highest():
+    record = ("Ann Lee", "ann@example.com", "5551234567")
+    assert app.match_score(record, ("Anne Lee", "ann@example.com", "5551234567")) >= app.DUPLICATE_THRESHOLD
+    assert app.match_score(record, ("Bob Stone", "bob@example.com", "5559876543")) < app.REVIEW_THRESHOLD
+
+
+def test_dedup_on_baseline_database(tmp_path):
+    path = make_baseline_db(str(tmp_path / "dedup.db"), 100)
+    add_duplicates(path)
+    connection = app.connect_current_schema(path)
+
+    found = app.find_duplicate_candidates(connection)
+
+    pairs = connection.execute("SELECT emp_id_a, emp_id_b FROM duplicate_candidates ORDER BY score DESC").fetchall()
+    assert found == len(pairs)
+    assert (1, 101) in pairs and (2, 102) in pairs
+    keyed = connection.execute("SELECT COUNT(DISTINCT emp_id) FROM employee_match_keys").fetchone()[0]
+    assert keyed == 102
+    connection.close()
+
+
+def test_decided_pairs_are_not_requeued(tmp_path):
+    path = make_baseline_db(str(tmp_path / "decided.db"), 50)
+    add_duplicates(path)
+    connection = app.connect_current_schema(path)
+    app.find_duplicate_candidates(connection)
+    connection.execute("UPDATE duplicate_candidates SET status='dismissed' WHERE emp_id_a=2 AND emp_id_b=52")
+    connection.commit()
+
+    app.find_duplicate_candidates(connection)
+
+    statuses = dict(connection.execute(
+        "SELECT emp_id_a || '-' || emp_id_b, status FROM duplicate_candidates WHERE emp_id_a IN (1, 2)"))
+    assert statuses == {'1-51': 'pending', '2-52': 'dismissed'}
+    connection.close()
+
+
+def test_import_matches_existing_rows(system):
+    app.backfill_match_keys(system.connection)
+    first = employee_rows(1)[0]
+    matches = app.find_existing_matches(system.cursor, [(first[0], first[6].upper(), first[7]),
+                                                        ("Nobody Here", "nobody@example.org", "")])
+    assert matches[0][0] == 1 and matches[0][1] >= app.DUPLICATE_THRESHOLD
+    assert matches[1] is None
@@ -0,0 +1,122 @@
+import sqlite3
+
+import pytest
+
+import app
+from conftest import headless_system, make_baseline_db, seed_employees
+
+
+@pytest.fixture
+def federated(tmp_path):
+    """Headless app over a migrated primary with 200 employees and a baseline shard with 80"""
+    shard = make_baseline_db(str(tmp_path / "branch.db"), 80)
+    system = headless_system(tmp_path / "primary.db")
+    seed_employees(system.connection)
+    app.SchemaMigrator(system.connection).run_pending()
+    system.federation = app.Federation([('primary', system.db_path), ('branch', shard)])
+    yield system
+    system.federation.shutdown()
+    system.read_connection.close()
+    system.connection.close()
+
+
+def schema_of(path):
+    connection = sqlite3.connect(path)
+    rows = connection.execute("SELECT type, name, sql FROM sqlite_master ORDER BY name").fetchall()
+    mode = connection.execute("PRAGMA journal_mode").fetchone()[0]
+    connection.close()
+    return rows, mode
+
+
+def test_shards_are_only_read(tmp_path):
+    shard = make_baseline_db(str(tmp_path / "branch.db"), 30)
+    before = schema_of(shard)
+    federation = app.Federation([('primary', make_baseline_db(str(tmp_path / "primary.db"), 10)), ('branch', shard)])
+
+    federation.dashboard_figures('2020-01-01')
+    federation.analytics_figures()
+    with pytest.raises(sqlite3.OperationalError):
+        federation.connection(1).execute("CREATE TABLE scratch (x)")
+    federation.shutdown()
+
+    assert schema_of(shard) == before
+    assert federation.behind == {1}
+
+
+def test_rows_from_every_shard_with_global_ids(federated):
+    rows = federated.federation.rows("SELECT emp_id FROM employees", global_ids=True)
+    ids = sorted(emp_id for (emp_id,) in rows)
+    assert len(ids) == 280
+    assert ids[199] == 200
+    assert ids[200] == app.SHARD_ID_STRIDE + 1
+
+
+def test_analytics_figures_merge_shards(federated):
+    salaries, trend = federated.federation.analytics_figures()
+    assert len(salaries) == 280
+
+    expected = {}
+    for _, path in federated.federation.shards:
+        connection = sqlite3.connect(path)
+        for month, rating in connection.execute("SELECT strftime('%Y-%m', joining_date), performance_rating FROM employees"):
+            expected.setdefault(month, []).append(rating)
+        connection.close()
+    assert [month for month, _ in trend] == sorted(expected)
+    for month, average in trend:
+        assert average == pytest.approx(sum(expected[month]) / len(expected[month]))
+
+
+def test_behind_shard_is_left_out_of_the_cohort_matrix(federated):
+    app.CohortRollup(federated.connection).refresh(full=True)
+
+    merged = federated.federation.cohort_matrix('Active')
+
+    assert merged == app.CohortRollup.matrix(federated.read_connection, 'Active')
+
+
+def test_cohort_matrix_sums_shard_rollups(federated):
+    # The branch's own app brings its database up to date and maintains its rollup
+    shard = sqlite3.connect(federated.federation.shards[1][1])
+    app.SchemaMigrator(shard).run_pending()
+    app.CohortRollup(shard).refresh(full=True)
+    shard.close()
+    federated.federation.shutdown()
+    federation = federated.federation = app.Federation(federated.federation.shards)
+    assert not federation.behind
+    app.CohortRollup(federated.connection).refresh(full=True)
+    primary = app.CohortRollup.matrix(federated.read_connection, 'Active')
+
+    merged = federation.cohort_matrix('Active')
+
+    shard = federation.connection(1)
+    shard_matrix = app.CohortRollup.matrix(shard, 'Active')
+    assert primary['cohorts'] and shard_matrix['cohorts']
+    for label, row in zip(merged['cohorts'], merged['values']):
+        for offset, value in enumerate(row):
+            parts = [matrix['values'][matrix['cohorts'].index(label)][offset]
+                     for matrix in (primary, shard_matrix) if label in matrix['cohorts']]
+            parts = [part for part in parts if part is not None]
+            assert value == (sum(parts) if parts else None)
+
+
+def test_salary_bands_and_outliers_span_shards(federated):
+    federated.load_salary_bands()
+    total = sum(sketch.n for (dimension, _), sketch in federated.salary_bands.sketches.items() if dimension == 'department')
+    assert total == 280
+    outliers = federated.employees_outside_band(federated.current_salary_bands())
+    assert any(emp_id > app.SHARD_ID_STRIDE for emp_id, *_ in outliers)
+
+
+def test_shutdown_closes_worker_connections(tmp_path):
+    paths = [make_baseline_db(str(tmp_path / f"unit{i}.db"), 10) for i in range(3)]
+    federation = app.Federation([(f"unit{i}", path) for i, path in enumerate(paths)])
+    federation.rows("SELECT COUNT(*) FROM employees")
+    readers = list(federation.readers)
+    assert len(readers) >= 3
+
+    federation.shutdown()
+
+    assert not federation.readers
+    for connection in readers:
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute("SELECT 1")
@@ -0,0 +1,28 @@
+import pytest
+
+import app
+
+
+def test_summary_merges_clients_per_operation_and_in_total():
+    # (latency, lock wait, ok) per sample, one dict per client process
+    results = [
+        {'read': [(0.001, 0.0, True), (0.003, 0.0, True)], 'write': [(0.010, 0.004, True)]},
+        {'read': [(0.002, 0.0, True)], 'write': [(0.020, 0.006, False)], 'search': []},
+    ]
+
+    summary = {row[0]: row[1:] for row in app.summarize_load(results, duration=2.0)}
+
+    assert list(summary) == ['read', 'write', 'total']
+    count, rate, p50, p95, p99, wait_mean, wait_p95, errors = summary['read']
+    assert (count, rate) == (3, 1.5)
+    assert p50 == pytest.approx(2.0)
+    assert p99 == pytest.approx(2.98)
+    assert wait_mean == 0 and errors == 0
+    count, rate, p50, _, _, wait_mean, _, errors = summary['write']
+    assert (count, p50, wait_mean, errors) == (2, pytest.approx(15.0), pytest.approx(5.0), 0.5)
+    assert summary['total'][0] == 5
+    assert summary['total'][-1] == pytest.approx(0.2)
+
+
+def test_summary_of_no_samples_is_empty():
+    assert app.summarize_load([{'read': []}], duration=1.0) == []
@@ -0,0 +1,154 @@
+import sqlite3
+
+import app
+from conftest import BASELINE_SQL, headless_system, seed_employees
+
+
+def schema_snapshot(connection):
+    return sorted(connection.execute("SELECT type, name, sql FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'"))
+
+
+def table_names(connection):
+    return {name for (name,) in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def test_fresh_database_reaches_latest_version(tmp_path):
+    connection = app.connect_database(str(tmp_path / "fresh.db"), 'write_heavy')
+    migrator = app.SchemaMigrator(connection)
+    assert migrator.current_version() == 0
+
+    assert migrator.run_pending()
+
+    assert migrator.current_version() == app.MIGRATIONS[-1].version
+    assert not migrator.pending()
+    assert {'employee_skills', 'employee_match_keys', 'employee_changes', 'employee_records'} <= table_names(connection)
+    connection.close()
+
+
+def test_baseline_database_migrates_with_data(baseline_db):
+    connection = app.connect_database(baseline_db, 'write_heavy')
+    before = connection.execute(f"{app.EMPLOYEE_SELECT} ORDER BY emp_id").fetchall()
+
+    assert app.SchemaMigrator(connection).run_pending(batch_size=37)
+
+    assert connection.execute(f"{app.EMPLOYEE_SELECT} ORDER BY emp_id").fetchall() == before
+    skills = connection.execute("SELECT COUNT(DISTINCT emp_id) FROM employee_skills").fetchone()[0]
+    assert skills == len(before)
+    history = connection.execute("SELECT COUNT(DISTINCT emp_id) FROM employee_status_history").fetchone()[0]
+    assert history == len(before)
+    keys = connection.execute("SELECT COUNT(DISTINCT emp_id) FROM employee_match_keys").fetchone()[0]
+    assert keys == len(before)
+    connection.close()
+
+
+def test_migration_resumes_after_stop(baseline_db):
+    connection = app.connect_database(baseline_db, 'write_heavy')
+    batches = []
+
+    def stop_after_three():
+        batches.append(None)
+        return len(batches) > 3
+
+    assert not app.SchemaMigrator(connection).run_pending(batch_size=25, should_stop=stop_after_three)
+    state, cursor = app.SchemaMigrator(connection).states()[2]
+    assert state == 'backfill' and cursor == 75
+
+    # Writes made between runs are mirrored into employee_records by the triggers, not lost by the backfill
+    connection.execute("UPDATE employees SET department = 'Research' WHERE emp_id = 1")
+    connection.execute("UPDATE employees SET department = 'Legal' WHERE emp_id = 150")
+    connection.commit()
+    resumed = app.SchemaMigrator(connection)
+    assert resumed.run_pending(batch_size=25)
+
+    assert resumed.current_version() == app.MIGRATIONS[-1].version
+    departments = connection.execute("SELECT department FROM employees WHERE emp_id IN (1, 150) ORDER BY emp_id").fetchall()
+    assert departments == [('Research',), ('Legal',)]
+    assert connection.execute("SELECT COUNT(*) FROM employee_records").fetchone()[0] == 200
+    connection.close()
+
+
+def test_dry_run_leaves_baseline_database_untouched(baseline_db):
+    connection = app.connect_database(baseline_db, 'write_heavy')
+    before = schema_snapshot(connection)
+
+    estimates = app.SchemaMigrator(connection).estimate(batch_size=50)
+
+    assert [version for version, *_ in estimates] == [m.version for m in app.MIGRATIONS]
+    assert all(rows in (0, 200) for _, _, rows, _, _ in estimates)
+    assert schema_snapshot(connection) == before
+    assert 'schema_version' not in table_names(connection)
+    connection.close()
+
+
+def test_dry_run_on_partly_migrated_database(baseline_db):
+    connection = app.connect_database(baseline_db, 'write_heavy')
+    app.SchemaMigrator(connection).run_pending(batch_size=50, should_stop=lambda: True)
+    before = schema_snapshot(connection)
+    versions = app.SchemaMigrator(connection).states()
+
+    app.SchemaMigrator(connection).estimate()
+
+    assert schema_snapshot(connection) == before
+    assert app.SchemaMigrator(connection).states() == versions
+    connection.close()
+
+
+def test_setup_database_records_baseline_as_version_one(tmp_path):
+    system = headless_system(tmp_path / "new.db")
+    assert system.migrator.states()[1][0] in ('indexes', 'done')
+    assert 'duplicate_candidates' in table_names(system.connection)
+    system.read_connection.close()
+    system.connection.close()
+
+
+def test_baseline_schema_is_idempotent(tmp_path):
+    connection = sqlite3.connect(str(tmp_path / "twice.db"))
+    for statement in BASELINE_SQL:
+        connection.execute(statement)
+    seed_employees(connection, 5)
+    for _ in range(2):
+        for statement in app.BASELINE_SCHEMA_SQL:
+            connection.execute(statement)
+    assert connection.execute("SELECT COUNT(*) FROM employees").fetchone()[0] == 5
+    connection.close()
+
+
+def test_deferred_finalize_waits_for_finalize_ready(baseline_db):
+    worker = app.connect_database(baseline_db, 'write_heavy')
+    assert not app.SchemaMigrator(worker).run_pending(defer_finalize=True)
+    worker.close()
+
+    connection = app.connect_database(baseline_db, 'write_heavy')
+    migrator = app.SchemaMigrator(connection)
+    last = app.MIGRATIONS[-1].version
+    assert migrator.states()[last][0] == 'finalize'
+    assert app.query_registry(connection) is app.QUERIES
+
+    assert migrator.finalize_ready() == 1
+    assert migrator.current_version() == last
+    assert app.query_registry(connection) is app.ENCODED_QUERIES
+    assert connection.execute("SELECT COUNT(*) FROM employees").fetchone()[0] == 200
+    assert migrator.finalize_ready() == 0
+    connection.close()
+
+
+def test_finalize_ready_skips_unfinished_backfills(baseline_db):
+    connection = app.connect_database(baseline_db, 'write_heavy')
+    migrator = app.SchemaMigrator(connection)
+    migrator.apply_schema()
+    assert migrator.finalize_ready() == 0
+    assert migrator.current_version() == 0
+    connection.close()
+
+
+def test_startup_finishes_swap_left_by_last_session(baseline_db):
+    worker = app.connect_database(baseline_db, 'write_heavy')
+    app.SchemaMigrator(worker).run_pending(defer_finalize=True)
+    worker.close()
+
+    system = headless_system(baseline_db)
+    assert system.finish_schema_swaps() == 1
+    assert system.status_var.get() == f"Database schema at version {app.MIGRATIONS[-1].version}"
+    assert not system.migrator.pending()
+    system.read_connection.close()
+    system.connection.close()
@@ -0,0 +1,71 @@
+import sqlite3
+
+import pytest
+
+import app
+
+# (emp_id, name, email, phone, department, position, salary, age, performance_rating)
+ROWS = [(i, f"Analyst {name}", f"{name}@example.com", f"98765{i:05d}", 'IT', 'Analyst', 60000.0 + 1000 * i, 30 + i, 3.0)
+        for i, name in enumerate(('ann', 'ben', 'cal', 'dee', 'eve', 'fay'), start=1)]
+ROWS += [(7, "Hana Ito", "hana@example.com", "9000000007", 'HR', 'Recruiter', 50000.0, 40, 4.0)]
+
+
+@pytest.fixture
+def benchmarks():
+    key_rows = [(key, row[0]) for row in ROWS for key in app.match_keys(row[1], row[2], row[3])]
+    return app.PeerBenchmarks(ROWS, key_rows)
+
+
+def test_salary_outside_the_peer_range_is_flagged(benchmarks):
+    hints = benchmarks.check({'department': 'IT', 'position': 'Analyst', 'salary': '90000'})
+
+    assert len(hints) == 1
+    level, message = hints[0]
+    assert level == 'warning'
+    assert message.startswith("Salary $90,000 is above P90 of 6 Analyst peers in IT")
+
+
+def test_thin_groups_fall_back_to_the_company(benchmarks):
+    count, percentiles, label = benchmarks.peers('HR', 'Recruiter', 'salary')
+
+    assert (count, label) == (7, "company-wide")
+    assert percentiles[50] == pytest.approx(63000.0)
+    assert benchmarks.check({'department': 'HR', 'position': 'Recruiter', 'salary': '62000'}) == [
+        ('info', "Salary is within the P10–P90 range of 7 company-wide (median $63,000).")]
+
+
+def test_non_numeric_values_are_reported(benchmarks):
+    assert benchmarks.check({'age': 'thirty'}) == [('warning', "Age is not a number.")]
+
+
+def test_duplicates_come_from_email_and_phone_blocks(benchmarks):
+    assert [emp_id for emp_id, _, _ in benchmarks.duplicates("Analyst Ben", "BEN@example.com", "")] == [2]
+    assert benchmarks.duplicates("Analyst Ben", "BEN@example.com", "", exclude_id=2) == []
+    # A name alone never reaches the review threshold
+    assert benchmarks.duplicates("Analyst Ben", "", "") == []
+
+    hints = benchmarks.check({'name': "Hana Ito", 'phone': "9000000007"})
+    assert hints == [('warning', "Possible duplicate of #7 Hana Ito (65% match).")]
+
+
+def test_empty_benchmarks_give_no_hints():
+    assert app.PeerBenchmarks().check({'department': 'IT', 'position': 'Analyst', 'salary': '1', 'email': 'a@b.c'}) == []
+
+
+def test_load_reads_the_database(system):
+    benchmarks = app.PeerBenchmarks.load(system.connection)
+
+    assert len(benchmarks.records) == 200
+    assert benchmarks.peers(None, None, 'age')[0] == 200
+
+
+def test_failed_rebuild_keeps_the_last_benchmarks(system, tmp_path):
+    cache = app.BenchmarkCache(system.db_path)
+    cache.build()
+    assert cache.error is None and len(cache.current.records) == 200
+
+    cache.db_path = str(tmp_path / "missing" / "employees.db")
+    cache.build()
+
+    assert isinstance(cache.error, sqlite3.Error)
+    assert len(cache.current.records) == 200
@@ -0,0 +1,102 @@
+import threading
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+import app
+from conftest import headless_system
+
+TODAY = datetime(2026, 1, 1)
+
+
+def employee(name, joined, status='Active', department='IT'):
+    return (name, 30, department, 'Analyst', 60000.0, joined, f"{name}@example.com", '', '', 3.0, '', status)
+
+
+@pytest.fixture
+def staff(tmp_path):
+    system = headless_system(tmp_path / "projection.db")
+    app.SchemaMigrator(system.connection).run_pending()
+    yield system
+    system.read_connection.close()
+    system.connection.close()
+
+
+def test_attrition_exposure_ends_at_termination(staff):
+    app.insert_employee(staff.cursor, employee('Stayer', '2016-01-01'))
+    leaver = app.insert_employee(staff.cursor, employee('Leaver', '2016-01-01'))
+    staff.connection.commit()
+    staff.cursor.execute("UPDATE employees SET status='Terminated' WHERE emp_id=?", (leaver,))
+    staff.cursor.execute("UPDATE employee_status_history SET changed_at='2018-01-01' WHERE emp_id=? AND status='Terminated'",
+                         (leaver,))
+    staff.connection.commit()
+
+    inputs = app.projection_inputs(staff.cursor, TODAY)
+
+    # One leaver over 10 + 2 person-years, shrunk towards the identical company rate
+    assert inputs['segments'] == ['IT']
+    assert inputs['attrition'][0] == pytest.approx(1 / 12, rel=1e-3)
+    assert inputs['counts'][0] == 1
+
+
+def test_termination_without_history_counts_until_today(staff):
+    staff.connection.execute("DROP TRIGGER employees_status_update")
+    leaver = app.insert_employee(staff.cursor, employee('Leaver', '2016-01-01'))
+    staff.connection.commit()
+    staff.cursor.execute("UPDATE employees SET status='Terminated' WHERE emp_id=?", (leaver,))
+    staff.connection.commit()
+
+    inputs = app.projection_inputs(staff.cursor, TODAY)
+
+    assert inputs['attrition'][0] == pytest.approx(1 / 10, rel=1e-3)
+
+
+def projection_inputs_fixture():
+    return {
+        'segments': ['HR', 'IT'],
+        'counts': np.array([10, 40]),
+        'payroll': np.array([500000.0, 2800000.0]),
+        'salary_cv': np.array([0.1, 0.2]),
+        'hire_salary': np.array([50000.0, 70000.0]),
+        'hire_share': np.array([0.2, 0.8]),
+        'attrition': np.array([0.1, 0.15]),
+        'promotion': np.array([0.05, 0.1]),
+    }
+
+
+def test_projection_is_cached_and_reproducible():
+    engine = app.WorkforceProjection()
+    inputs = projection_inputs_fixture()
+    first = engine.project(inputs, {'trials': 500, 'months': 12})
+    assert engine.project(inputs, {'trials': 500, 'months': 12}) is first
+
+    fresh = app.WorkforceProjection().project(inputs, {'trials': 500, 'months': 12})
+    assert np.array_equal(fresh['headcount'], first['headcount'])
+    assert first['headcount'].shape == (len(app.PROJECTION_PERCENTILES), 13)
+    assert np.all(np.diff(first['headcount'][:, -1]) >= 0)
+    engine.shutdown()
+
+
+def test_concurrent_projections_share_the_cache():
+    engine = app.WorkforceProjection()
+    inputs = projection_inputs_fixture()
+    results = {}
+    errors = []
+
+    def run(seed):
+        try:
+            for _ in range(3):
+                results.setdefault(seed, []).append(engine.project(inputs, {'trials': 200, 'months': 6, 'seed': seed}))
+        except Exception as e:  # surfaced by the assertion below
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(seed % 20,)) for seed in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(engine.cache) == app.PROJECTION_CACHE_SIZE
+    engine.shutdown()
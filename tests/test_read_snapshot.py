@@ -0,0 +1,59 @@
+import sqlite3
+
+import app
+from conftest import FakeVar
+
+
+def commit_elsewhere(system, sql):
+    other = sqlite3.connect(system.db_path)
+    other.execute(sql)
+    other.commit()
+    other.close()
+
+
+def dashboard(system, monkeypatch):
+    """Headless system whose dashboard records the charts it would draw"""
+    drawn = []
+    monkeypatch.setattr(system, 'render_chart', lambda slot, kind, data: drawn.append((slot, data)), raising=False)
+    system.stats_vars = {name: FakeVar() for name in ('total_employees', 'avg_salary', 'top_department', 'new_hires')}
+    system.dashboard_version = None
+    return drawn
+
+
+def test_snapshot_keeps_one_view_while_others_commit(system):
+    with app.ReadSnapshot(system.read_connection) as snapshot:
+        before = snapshot.scalar('count_employees')
+        commit_elsewhere(system, "DELETE FROM employees WHERE emp_id <= 10")
+        assert snapshot.scalar('count_employees') == before == 200
+    with app.ReadSnapshot(system.read_connection) as snapshot:
+        assert snapshot.scalar('count_employees') == 190
+    assert not system.read_connection.in_transaction
+
+
+def test_data_version_moves_only_for_other_connections(system):
+    with app.ReadSnapshot(system.read_connection) as first:
+        pass
+    with app.ReadSnapshot(system.read_connection) as second:
+        pass
+    assert first.data_version == second.data_version
+
+    commit_elsewhere(system, "UPDATE employees SET salary = salary + 1 WHERE emp_id = 1")
+    with app.ReadSnapshot(system.read_connection) as third:
+        pass
+    assert third.data_version != second.data_version
+
+
+def test_dashboard_is_skipped_until_the_data_changes(system, monkeypatch):
+    drawn = dashboard(system, monkeypatch)
+
+    system.update_dashboard()
+    assert system.stats_vars['total_employees'].get() == '200'
+    assert len(drawn) == 2
+
+    system.update_dashboard()
+    assert len(drawn) == 2
+
+    commit_elsewhere(system, "DELETE FROM employees WHERE emp_id = 1")
+    system.update_dashboard()
+    assert system.stats_vars['total_employees'].get() == '199'
+    assert len(drawn) == 4
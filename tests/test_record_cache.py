@@ -0,0 +1,41 @@
+import app
+
+
+def record(emp_id):
+    return app.EmployeeRecord((emp_id,) + (None,) * (len(app.EMPLOYEE_COLUMNS) - 1))
+
+
+def test_least_recently_used_record_is_evicted():
+    cache = app.RecordCache(capacity=3)
+    cache.put_many(record(emp_id) for emp_id in (1, 2, 3))
+
+    assert cache.get(1).emp_id == 1
+    cache.put(record(4))
+
+    assert cache.get(2) is None
+    assert [emp_id for emp_id in cache.records] == [3, 1, 4]
+
+
+def test_invalidate_drops_ids_or_everything():
+    cache = app.RecordCache()
+    cache.put_many(record(emp_id) for emp_id in (1, 2, 3))
+
+    cache.invalidate(['2'])
+    assert cache.get(2) is None and cache.get(1) is not None
+
+    cache.invalidate()
+    assert not cache.records
+
+
+def test_record_miss_loads_the_following_directory_page(system):
+    system.record_cache = app.RecordCache(capacity=50)
+    system.record_cache.PAGE_SIZE = 10
+    for emp_id in range(1, 31):
+        system.tree.item(str(emp_id), values=(emp_id,))
+
+    opened = system.get_employee_record('5')
+
+    assert opened.emp_id == 5 and opened.name == "Employee 4"
+    assert sorted(system.record_cache.records) == list(range(5, 15))
+    assert next(reversed(system.record_cache.records)) == 5
+    assert system.get_employee_record(14) is system.record_cache.get(14)
@@ -0,0 +1,57 @@
+import sqlite3
+
+import pytest
+
+import app
+
+
+def database_counts(db_path, sql):
+    connection = sqlite3.connect(db_path)
+    rows = dict(connection.execute(sql).fetchall())
+    connection.close()
+    return rows
+
+
+def test_headcount_totals_match_the_database(system, monkeypatch):
+    monkeypatch.setattr(app, 'REPORT_CHUNK_SIZE', 64)
+    progress = []
+
+    title, sections = app.collect_report(system.db_path, 'headcount', progress=lambda done, total: progress.append(done))
+
+    by_department = {row[0]: row[1] for row in sections[0]['rows']}
+    by_status = dict(sections[1]['rows'])
+    assert title == app.HeadcountReport.TITLE
+    assert by_department == database_counts(system.db_path, "SELECT department, COUNT(*) FROM employees GROUP BY department")
+    assert by_status == database_counts(system.db_path, "SELECT status, COUNT(*) FROM employees GROUP BY status")
+    assert sum(count for _, count in sections[2]['rows']) == 200
+    assert progress == [64, 128, 192, 200]
+
+
+def test_attrition_and_performance_totals(system):
+    _, attrition = app.collect_report(system.db_path, 'attrition')
+    _, performance = app.collect_report(system.db_path, 'performance')
+
+    terminated = database_counts(system.db_path, '''
+        SELECT department, SUM(status = 'Terminated') FROM employees GROUP BY department''')
+    assert {row[0]: row[2] for row in attrition[0]['rows']} == terminated
+    assert sum(row[1] for row in attrition[1]['rows']) == 200
+    assert sum(count for _, count, _ in performance[0]['rows']) == 200
+    assert sum(row[1] for row in performance[1]['rows']) == 200
+
+
+def test_compensation_counts_every_salaried_employee(system):
+    _, sections = app.collect_report(system.db_path, 'compensation')
+
+    for section in sections:
+        assert sum(row[1] for row in section['rows']) == 200
+
+
+def test_cancelled_report_stops_after_the_current_chunk(system, monkeypatch):
+    monkeypatch.setattr(app, 'REPORT_CHUNK_SIZE', 50)
+    progress = []
+
+    with pytest.raises(app.ReportCancelled):
+        app.collect_report(system.db_path, 'headcount', progress=lambda done, total: progress.append((done, total)),
+                           cancelled=lambda: len(progress) == 2)
+
+    assert progress == [(50, 200), (100, 200)]
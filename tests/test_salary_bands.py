@@ -0,0 +1,100 @@
+import random
+
+import numpy as np
+import pytest
+
+import app
+from conftest import INSERT_SQL
+
+
+class FakeText:
+    """tk.Text stand-in collecting inserted text"""
+
+    def __init__(self):
+        self.parts = []
+
+    def delete(self, *args):
+        self.parts = []
+
+    def insert(self, index, text):
+        self.parts.append(text)
+
+    def text(self):
+        return ''.join(self.parts)
+
+
+def rank_error(values, estimate, fraction):
+    return abs(np.searchsorted(values, estimate) / len(values) - fraction)
+
+
+@pytest.mark.parametrize('distribution', ['uniform', 'lognormal'])
+def test_sketch_quantiles_within_rank_error(distribution):
+    random.seed(3)
+    rng = np.random.default_rng(3)
+    values = rng.uniform(30000, 150000, 50000) if distribution == 'uniform' else rng.lognormal(11, 0.4, 50000)
+    sketch = app.QuantileSketch(k=200)
+    for value in values:
+        sketch.update(float(value))
+
+    fractions = [0.1, 0.25, 0.5, 0.75, 0.9]
+    estimates = sketch.quantiles(fractions)
+
+    ordered = np.sort(values)
+    assert sketch.n == len(values)
+    assert sum(len(items) for items in sketch.levels) < 1000
+    for fraction, estimate in zip(fractions, estimates):
+        assert rank_error(ordered, estimate, fraction) < 0.02
+
+
+def test_merged_sketches_match_single_sketch():
+    random.seed(5)
+    rng = np.random.default_rng(5)
+    parts = [rng.normal(70000, 15000, 20000) for _ in range(4)]
+    merged = app.QuantileSketch()
+    for part in parts:
+        sketch = app.QuantileSketch()
+        for value in part:
+            sketch.update(float(value))
+        merged.merge(sketch)
+
+    ordered = np.sort(np.concatenate(parts))
+    assert merged.n == len(ordered)
+    for fraction, estimate in zip([0.1, 0.5, 0.9], merged.quantiles([0.1, 0.5, 0.9])):
+        assert rank_error(ordered, estimate, fraction) < 0.02
+
+
+def test_empty_sketch():
+    assert app.QuantileSketch().quantiles([0.5]) == [None]
+
+
+def test_exact_percentiles_match_numpy():
+    values = np.random.default_rng(1).normal(size=1001)
+    assert app.exact_percentiles(values, [10, 50, 90]) == pytest.approx(np.percentile(values, [10, 50, 90]))
+    assert app.exact_percentiles([], [50]) == [None]
+
+
+def test_band_engine_rebuilds_dirty_segments(system):
+    system.load_salary_bands()
+    before = system.current_salary_bands()['IT'][50]
+    system.cursor.execute("UPDATE employees SET salary = salary * 3 WHERE department = 'IT'")
+    system.connection.commit()
+    system.salary_bands.invalidate('IT', 'Analyst', '2020-01-01')
+
+    after = system.current_salary_bands()['IT'][50]
+
+    assert after == pytest.approx(before * 3, rel=0.05)
+    assert not system.salary_bands.dirty
+
+
+def test_band_audit_handles_zero_bands(system):
+    system.predictive_analytics = FakeText()
+    system.cursor.executemany(INSERT_SQL, [(f"Intern {i}", 20, 'Interns', 'Intern', 0.0, '2025-06-01',
+                                            f"intern{i}@example.com", '', '', 0.0, '', 'Active') for i in range(3)])
+    system.connection.commit()
+    system.load_salary_bands()
+
+    system.salary_band_audit()
+
+    report = system.predictive_analytics.text()
+    assert "Interns" in report
+    assert "sketch deviation: 0.00%" in report
@@ -0,0 +1,66 @@
+import app
+from conftest import employee_rows
+
+
+def build_index():
+    index = app.SkillIndex()
+    index.set_employee(1, ['Python', 'SQL', 'Docker'], 'IT')
+    index.set_employee(2, ['python', 'AWS', 'Docker'], 'IT')
+    index.set_employee(3, ['Excel', 'SQL'], 'Finance')
+    index.set_employee(4, [], 'HR')
+    return index
+
+
+def test_parse_skills_dedupes_case_insensitively():
+    assert app.parse_skills(" Python, SQL;python\nMachine   Learning,, ") == ['Python', 'SQL', 'Machine Learning']
+    assert app.parse_skills(None) == []
+
+
+def test_match_all_and_any():
+    index = build_index()
+    assert index.match_all(['PYTHON', 'docker']) == {1, 2}
+    assert index.match_all(['Python', 'Excel']) == set()
+    assert index.match_all([]) == {1, 2, 3, 4}
+    assert index.match_any(['AWS', 'Excel']) == {2, 3}
+
+
+def test_boolean_query():
+    index = build_index()
+    assert index.query("Docker AND AWS OR Excel") == {2, 3}
+    assert index.query("SQL AND NOT Excel") == {1}
+    assert index.query("Python, -AWS | Excel") == {1, 3}
+
+
+def test_set_employee_replaces_postings():
+    index = build_index()
+    index.set_employee(1, ['Rust'], 'IT')
+    assert index.match_all(['Python']) == {2}
+    assert index.match_all(['Rust']) == {1}
+    index.remove_employee(1)
+    assert 'rust' not in index.postings
+    assert 1 not in index.departments
+
+
+def test_closest_matches_rank_by_coverage_then_fewest_extras():
+    index = build_index()
+    ranked = index.closest_matches(['Python', 'Docker', 'Kubernetes'], k=2)
+    assert [emp_id for emp_id, _, _ in ranked] == [1, 2]
+    emp_id, coverage, missing = ranked[0]
+    assert coverage == 2 / 3 and missing == ['Kubernetes']
+
+
+def test_top_skills_and_department_coverage():
+    index = build_index()
+    assert set(index.top_skills(3)) == {'Python', 'SQL', 'Docker'}
+    coverage = index.coverage_by_department(['Python', 'Excel'])
+    assert coverage['IT'] == (2, ['Python'], ['Excel'])
+    assert coverage['HR'] == (1, [], ['Python', 'Excel'])
+
+
+def test_index_loaded_from_database(system):
+    system.load_skill_index()
+    rows = employee_rows(200)
+    expected = {i + 1 for i, row in enumerate(rows) if 'docker' in row[10].lower() and 'aws' in row[10].lower()}
+    assert expected
+    assert system.skill_index.query("Docker AND AWS") == expected
+    assert system.skill_index.departments[1] == rows[0][2]